@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['tab_logs', 'tab_approvals', 'tab_stats', 'tab_users', 'tab_settings'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
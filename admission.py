@@ -0,0 +1,166 @@
+# Manager_Console/admission.py
+import math
+import re
+import threading
+import time
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+import codec
+
+# ====================================================================
+# 🌟 [신규] 에이전트 요청 수락 제어 (요청 수 제한 + 과부하 시 우선순위 차단)
+#  - 요청 종류(생존 신고 / 정책·상태 조회 / 인쇄 기록)마다 UUID별, 접속 IP별 토큰 버킷을 따로 둡니다.
+#    예산을 다 쓴 에이전트는 429 + Retry-After 를 받고, DB 에는 닿지 않습니다. (재시도 폭주 에이전트 격리)
+#    IP 예산은 한 PC(또는 NAT 뒤 여러 PC)에서 UUID 를 바꿔 가며 보내는 경우까지 막도록 UUID 예산보다 넉넉하게 둡니다.
+#  - 처리 중인 요청 수와 인쇄 기록 응답 시간을 보고, 밀리기 시작하면 생존 신고 -> 조회 순으로 먼저 503 으로 돌려보냅니다.
+#    인쇄 기록은 최대 동시 처리 수에 닿기 전까지는 항상 받습니다.
+#  - 요청 수 제한은 본문을 풀기 전에 적용합니다. (한도를 넘은 에이전트는 본문 검증 비용 없이 429)
+#    에이전트 UUID 는 X-Agent-UUID 헤더(또는 uuid 쿼리)로 받고, 보내지 않는 구버전 에이전트는 IP 예산만 먼저 적용한 뒤
+#    본문 검증 후 본문의 uuid 예산을 적용합니다.
+#  - 한도는 워커 프로세스마다 따로 적용됩니다.
+# ====================================================================
+HEARTBEAT, POLICY, INGEST = "heartbeat", "policy", "ingest"
+
+# 종류 -> (초당 보충 토큰, 버킷 크기). IP 예산은 IP_BUDGET_FACTOR 배
+BUDGETS = {
+    HEARTBEAT: (0.2, 5),    # 평소 1분에 한 번 남짓 - 5초에 한 번꼴까지 허용
+    POLICY: (1.0, 20),
+    INGEST: (5.0, 100),     # 대량 인쇄(여러 문서 연속 출력)도 한 번에 받을 수 있도록 넉넉히
+}
+IP_BUDGET_FACTOR = 10
+IDLE_BUCKET_SEC = 600   # 이 시간 동안 쓰지 않은 버킷은 정리
+
+MAX_IN_FLIGHT = 64              # 이 이상 처리 중이면 인쇄 기록 외 요청은 차단
+HARD_MAX_IN_FLIGHT = 256        # 인쇄 기록까지 차단하는 최대 동시 처리 수
+INGEST_SLOW_MS = 500            # 인쇄 기록 평균 응답이 이보다 느리면 생존 신고부터 차단
+SHED_RETRY_SEC = 5
+LATENCY_WEIGHT = 0.2            # 인쇄 기록 응답 시간 이동평균 가중치
+LATENCY_STALE_SEC = 30          # 이 시간 동안 인쇄 기록이 없으면 느렸던 평균은 잊음 (생존 신고 차단 해제)
+
+# (메서드, 경로) -> 종류
+ROUTES = [
+    ("POST", re.compile(r"^/api/(heartbeat|agent/sync)$"), HEARTBEAT),
+    ("GET", re.compile(r"^/api/(policy/control|print-log/\d+/status)$"), POLICY),
+    ("POST", re.compile(r"^/api/(print-log|print-job/submit)$"), INGEST),
+]
+
+def classify(method: str, path: str):
+    for route_method, pattern, kind in ROUTES:
+        if method == route_method and pattern.match(path): return kind
+    return None
+
+AGENT_UUID_HEADER = "X-Agent-UUID"
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def request_uuid(request: Request):
+    """본문을 풀지 않고 알 수 있는 에이전트 UUID (헤더 또는 쿼리, 없으면 None)"""
+    return request.headers.get(AGENT_UUID_HEADER) or request.query_params.get("uuid")
+
+class RateLimiter:
+    """(종류, 키) -> [남은 토큰, 마지막 보충 시각] 토큰 버킷"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._pruned_at = time.monotonic()
+
+    def take(self, kind: str, key: str, factor: int = 1) -> float:
+        """토큰을 하나 쓰고 0, 남은 토큰이 없으면 다음 토큰까지 기다려야 할 초"""
+        rate, burst = BUDGETS[kind]
+        rate, burst = rate * factor, burst * factor
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((kind, key))
+            if bucket is None:
+                bucket = self._buckets[(kind, key)] = [burst, now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                wait = 0.0
+            else:
+                wait = (1 - bucket[0]) / rate
+            if now - self._pruned_at > IDLE_BUCKET_SEC:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float):
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b[1] < IDLE_BUCKET_SEC}
+        self._pruned_at = now
+
+    def admit(self, kind: str, uuid: str = None, ip: str = None):
+        """UUID, IP 예산(주어진 것만)을 모두 통과하면 그대로 반환, 아니면 429"""
+        wait = self.take(kind, f"uuid:{uuid}") if uuid else 0.0
+        if not wait and ip: wait = self.take(kind, f"ip:{ip}", IP_BUDGET_FACTOR)  # 이미 거절된 요청은 IP 예산을 쓰지 않음
+        if wait > 0:
+            raise HTTPException(
+                status_code=429, detail="요청이 너무 잦습니다. 잠시 후 다시 시도하세요.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+limiter = RateLimiter()
+
+class LoadShedder:
+    """처리 중인 에이전트 요청 수와 인쇄 기록 응답 시간(이동평균)으로 과부하를 판단"""
+    def __init__(self):
+        self.in_flight = 0          # 이벤트 루프 스레드에서만 바뀌므로 잠금 불필요
+        self.ingest_ms = 0.0
+        self.ingest_at = 0.0        # 마지막 인쇄 기록 완료 시각 (monotonic)
+
+    def ingest_slow(self) -> bool:
+        return self.ingest_ms > INGEST_SLOW_MS and time.monotonic() - self.ingest_at < LATENCY_STALE_SEC
+
+    def should_shed(self, kind: str) -> bool:
+        if kind == INGEST: return self.in_flight >= HARD_MAX_IN_FLIGHT
+        if self.in_flight >= MAX_IN_FLIGHT: return True
+        return kind == HEARTBEAT and self.ingest_slow()
+
+    def record_ingest(self, elapsed_ms: float):
+        self.ingest_ms += (elapsed_ms - self.ingest_ms) * LATENCY_WEIGHT
+        self.ingest_at = time.monotonic()
+
+shedder = LoadShedder()
+
+async def admission_middleware(request: Request, call_next):
+    kind = classify(request.method, request.url.path)
+    if kind is None:
+        return await call_next(request)
+    if shedder.should_shed(kind):
+        return JSONResponse(
+            {"detail": "서버가 혼잡하여 요청을 잠시 미룹니다."}, status_code=503,
+            headers={"Retry-After": str(SHED_RETRY_SEC)}
+        )
+    shedder.in_flight += 1
+    started = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        shedder.in_flight -= 1
+        if kind == INGEST: shedder.record_ingest((time.perf_counter() - started) * 1000)
+
+def admitted_body(kind: str, schema):
+    """
+    요청 수 제한(헤더/쿼리의 uuid + 접속 IP)을 먼저 적용하고, 통과한 요청만 본문을 풀어 검증(codec.body)하는 FastAPI 의존성.
+    uuid 를 헤더로 보내지 않은 요청은 검증 후 본문의 uuid 예산을 이어서 적용합니다.
+    """
+    body = codec.body(schema)
+    async def dependency(request: Request):
+        uuid = request_uuid(request)
+        limiter.admit(kind, uuid, client_ip(request))
+        payload = await body(request)
+        if not uuid: limiter.admit(kind, payload.uuid)
+        return payload
+    dependency.__name__ = f"admitted_{schema.__name__}"
+    return dependency
+
+def admitted_query(kind: str):
+    """본문이 없는 조회 요청용 - 쿼리의 uuid(있으면)와 접속 IP 로 요청 수 제한"""
+    async def dependency(request: Request):
+        limiter.admit(kind, request_uuid(request), client_ip(request))
+    return dependency
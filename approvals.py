@@ -0,0 +1,128 @@
+# Manager_Console/approvals.py
+import threading
+from database import sql, plain_rows
+from lookups import VIEW
+import audit
+import cache_sync
+import ledger
+import timeutil
+from models import ApprovalRequest, PrintLog
+
+# ====================================================================
+# 🌟 [신규] 승인 대기열 (ApprovalRequests)
+#  - 한도 초과로 "승인 대기" 상태가 된 로그는 같은 트랜잭션에서 대기열에 한 줄 추가됩니다.
+#  - 서버는 대기 중인 항목만 메모리에 들고 있어, 결재 화면 조회와 에이전트의 상태 확인에 로그 테이블을 뒤지지 않습니다.
+#    (다른 워커/콘솔이 바꾸면 캐시 동기화(approvals)로 비워지고, 다음 조회 때 status 색인으로 다시 읽음)
+#  - 결재는 "대기중인 경우에만 바꾼다"는 조건부 UPDATE(compare-and-set) 한 번으로 처리하므로,
+#    두 관리자가 동시에 눌러도 한 명만 성공하고 나머지는 이미 처리된 항목으로 안내받습니다.
+# ====================================================================
+PENDING, APPROVED, REJECTED = "대기중", "승인", "반려"
+WAITING_STATUS = "승인 대기"                                   # 대기 중인 로그의 print_status
+LOG_STATUSES = {APPROVED: "승인 완료", REJECTED: "반려됨"}     # 결재 결과 -> 로그 상태
+
+MAX_WAITING = 200   # 에이전트 한 번의 동기화에서 결과를 물을 수 있는 최대 건수
+
+ITEM_COLUMNS = ("log_id", "request_time", "uuid", "os_user", "file_name", "printer_name",
+                "total_pages", "copies", "color_mode", "paper_size", "calculated_price", "remark")
+# 요청 정보(a)는 대기열에서, 문서 정보(p)는 로그에서 읽음
+_SELECT_COLUMNS = ", ".join(("a." if c in ("log_id", "request_time", "uuid") else "p.") + c for c in ITEM_COLUMNS)
+
+class AlreadyDecided(Exception):
+    """다른 관리자(또는 다른 요청)가 먼저 결재한 항목"""
+    def __init__(self, status: str):
+        super().__init__(f"이미 [{status}] 처리된 항목입니다.")
+        self.status = status
+
+class PendingApprovals:
+    """대기 중인 승인 요청 (log_id -> 목록 표시용 정보). 처음 조회할 때 한 번 읽고 이후로는 추가/제거만 반영"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = None
+
+    def _ensure(self, db) -> dict:
+        items = self._items
+        if items is None:
+            with self._lock:
+                if self._items is None:
+                    rows = plain_rows(db.execute(sql(f"""
+                        SELECT {_SELECT_COLUMNS} FROM ApprovalRequests a JOIN {VIEW} p ON p.id = a.log_id
+                        WHERE a.status = :pending ORDER BY a.request_time, a.log_id
+                    """), {"pending": PENDING}))
+                    self._items = {row[0]: dict(zip(ITEM_COLUMNS, row)) for row in rows}
+                items = self._items
+        return items
+
+    def items(self, db) -> list:
+        return list(self._ensure(db).values())
+
+    def count(self, db) -> int:
+        return len(self._ensure(db))
+
+    def contains(self, db, log_id: int) -> bool:
+        return log_id in self._ensure(db)
+
+    def add(self, log: PrintLog, request_time: int, os_user: str = None, printer_name: str = None):
+        # request_time 은 DB 에서 읽은 항목과 같은 epoch 밀리초 (표시 형식은 API/화면에서 변환)
+        with self._lock:
+            if self._items is None: return  # 아직 읽지 않았으면 다음 조회 때 함께 읽힘
+            values = {c: getattr(log, c, None) for c in ITEM_COLUMNS}
+            values.update(log_id=log.id, request_time=request_time, uuid=log.uuid, os_user=os_user, printer_name=printer_name)
+            self._items[log.id] = values
+
+    def discard(self, log_id: int):
+        with self._lock:
+            if self._items is not None: self._items.pop(log_id, None)
+
+    def clear(self):
+        self._items = None
+
+pending = PendingApprovals()
+
+def open_request(db, log: PrintLog) -> ApprovalRequest:
+    """승인 대기 로그를 대기열에 올립니다. (호출 측 트랜잭션 안에서, commit 은 호출 측이 수행)"""
+    request = ApprovalRequest(log_id=log.id, uuid=log.uuid, request_time=log.log_time or timeutil.now_ms(), status=PENDING)
+    db.add(request)
+    return request
+
+def decisions(db, log_ids: list) -> list:
+    """
+    기다리는 log_id 중 결재가 끝난 건의 [{"log_id", "status"(로그 상태)}].
+    아직 대기 중인 건은 메모리 대기열로 걸러내므로, 결과가 나온 건이 있을 때만 로그를 조회합니다.
+    """
+    settled = [i for i in dict.fromkeys(log_ids) if not pending.contains(db, i)]
+    if not settled: return []
+    found = dict(db.query(PrintLog.id, PrintLog.print_status).filter(PrintLog.id.in_(settled)).all())
+    return [{"log_id": i, "status": found.get(i, "not_found")} for i in settled if found.get(i) != WAITING_STATUS]
+
+def decide(db, log_id: int, approve: bool, reason: str = "", actor: str = None) -> PrintLog:
+    """
+    대기 중인 요청을 승인/반려하고 로그 상태, 원장, 변경 이력을 같은 트랜잭션에서 반영합니다.
+    요청이 없으면 LookupError, 이미 결재된 요청이면 AlreadyDecided
+    """
+    result = APPROVED if approve else REJECTED
+    claimed = db.query(ApprovalRequest).filter(
+        ApprovalRequest.log_id == log_id, ApprovalRequest.status == PENDING
+    ).update({ApprovalRequest.status: result, ApprovalRequest.decided_at: timeutil.now_ms(), ApprovalRequest.reason: reason or None},
+             synchronize_session=False)
+    if not claimed:
+        db.rollback()
+        pending.discard(log_id)
+        current = db.query(ApprovalRequest.status).filter(ApprovalRequest.log_id == log_id).scalar()
+        if current is None: raise LookupError("승인 요청이 없는 인쇄 기록입니다.")
+        raise AlreadyDecided(current)
+
+    log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
+    if log is None:
+        db.rollback()
+        raise LookupError("해당 인쇄 기록을 찾을 수 없습니다.")
+    new_status, old_status = LOG_STATUSES[result], log.print_status
+    was_billable = ledger.is_billable(old_status)
+    log.print_status = new_status
+    audit.record(db, log_id, audit.APPROVE if approve else audit.REJECT, actor, reason,
+                 old_status, new_status, log.calculated_price, log.calculated_price)
+    if was_billable != ledger.is_billable(new_status):
+        ledger.apply(db, log, sign=-1 if was_billable else 1)
+        cache_sync.bump(db, "usage")
+    db.commit()
+    pending.discard(log_id)
+    return log
@@ -0,0 +1,31 @@
+# Manager_Console/audit.py
+from models import PrintLogEvent
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 변경 이력 (PrintLogEvents)
+#  - 결재, 상태 변경, 단가 조정, 삭제를 (시각, 처리자, 작업, 전/후 상태·요금, 사유) 한 줄로 기록합니다.
+#    로그를 바꾸는 것과 같은 트랜잭션에 추가되므로 함께 확정되거나 함께 취소됩니다.
+#  - 비고(remark)에는 에이전트가 보낸 원래 내용만 남습니다. 조정할 때마다 사유를 덧붙이던 방식과 달리 행이 커지지 않습니다.
+#  - 이력은 log_id 색인으로, 콘솔에서 로그를 열 때만 읽습니다.
+# ====================================================================
+APPROVE, REJECT, STATUS, PRICE, DELETE = "approve", "reject", "status", "price", "delete"
+ACTIONS = {APPROVE: "승인", REJECT: "반려", STATUS: "상태 변경", PRICE: "단가 조정", DELETE: "삭제"}
+DEFAULT_ACTOR = "관리자"
+
+EVENT_COLUMNS = ("id", "event_time", "actor", "action", "old_status", "new_status", "old_price", "new_price", "reason")
+
+def record(db, log_id: int, action: str, actor: str = None, reason: str = None,
+           old_status: str = None, new_status: str = None, old_price: int = None, new_price: int = None) -> PrintLogEvent:
+    """변경 이력 한 줄을 추가합니다. (호출 측 트랜잭션 안에서, commit 은 호출 측이 수행)"""
+    event = PrintLogEvent(
+        log_id=log_id, event_time=timeutil.now_ms(), actor=actor or DEFAULT_ACTOR, action=action,
+        old_status=old_status, new_status=new_status, old_price=old_price, new_price=new_price, reason=reason or None
+    )
+    db.add(event)
+    return event
+
+def history(db, log_id: int) -> list:
+    """로그 한 건의 변경 이력 (오래된 순)"""
+    events = db.query(PrintLogEvent).filter(PrintLogEvent.log_id == log_id).order_by(PrintLogEvent.id).all()
+    return [{c: getattr(e, c) for c in EVENT_COLUMNS} for e in events]
@@ -0,0 +1,119 @@
+# Manager_Console/cache_sync.py
+import threading
+from models import SessionLocal
+from database import sql, IS_SQLITE, IS_POSTGRES
+
+# ====================================================================
+# 🌟 [신규] 다중 워커 간 메모리 캐시 동기화
+#  - 캐시 원본 테이블이 바뀌면 DB 트리거가 CacheVersions 의 해당 항목 버전을 1 올립니다.
+#    (서버 워커든 관리자 콘솔의 직접 쓰기든 같은 DB 파일을 쓰는 모든 경로에 적용됨)
+#  - 각 워커는 POLL_SEC 마다 버전 표만 읽어, 다른 프로세스가 바꾼 항목의 캐시를 비웁니다.
+#  - 과금 원장(usage)은 인쇄 수신마다 바뀌므로 트리거를 두지 않습니다. (모든 수신이 버전 한 줄에 몰리고 모든 워커의 카운터가 비워짐)
+#    수신한 워커는 자기 카운터만 비우고, 관리자 결재·조정·재계산처럼 드문 변경만 bump() 로 다른 워커에 알립니다.
+# ====================================================================
+POLL_SEC = 1.0
+
+# 항목 -> [(테이블, 이벤트, 트리거 조건)]
+TOPICS = {
+    "pricing": [("PricingPolicyVersions", "INSERT", None)],
+    "policy": [("PrintControlPolicy", "INSERT", None), ("PrintControlPolicy", "UPDATE", None)],
+    "usage": [],  # 트리거 없음 - bump() 로 직접 알림
+    # 작업 키가 있는 로그가 지워지면 같은 키로 다시 기록할 수 있어야 함
+    # (키 없는 로그는 제외 / 아카이브 이동은 retention 이 삭제하는 동안 이 트리거를 빼 두므로 제외)
+    "job_keys": [("PrintLogs", "DELETE", "OLD.job_key IS NOT NULL")],
+    # 예외 한도가 바뀐 경우만 (생존 신고 시각 기록 등 다른 컬럼 변경은 제외)
+    "user_limits": [
+        ("Users", "UPDATE", "COALESCE(OLD.color_limit, -1) <> COALESCE(NEW.color_limit, -1) OR COALESCE(OLD.mono_limit, -1) <> COALESCE(NEW.mono_limit, -1)"),
+        ("Users", "DELETE", None),
+    ],
+    "approvals": [("ApprovalRequests", "INSERT", None), ("ApprovalRequests", "UPDATE", None), ("ApprovalRequests", "DELETE", None)],
+}
+
+def install_triggers(db):
+    """버전 표와 트리거를 만듭니다. (이미 있으면 건너뜀 / SQLite, PostgreSQL 지원)"""
+    db.execute(sql("CREATE TABLE IF NOT EXISTS CacheVersions (name VARCHAR PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"))
+    for topic in TOPICS:
+        db.execute(sql("INSERT INTO CacheVersions (name, version) VALUES (:name, 0) ON CONFLICT (name) DO NOTHING"), {"name": topic})
+
+    if IS_POSTGRES:
+        db.execute(sql("""
+            CREATE OR REPLACE FUNCTION bump_cache_version() RETURNS trigger AS $$
+            BEGIN UPDATE CacheVersions SET version = version + 1 WHERE name = TG_ARGV[0]; RETURN NULL; END;
+            $$ LANGUAGE plpgsql
+        """))
+    elif not IS_SQLITE:
+        return False  # 그 밖의 DB는 트리거 없이 각 캐시의 자체 갱신 주기에만 의존
+
+    for topic, triggers in TOPICS.items():
+        for table, event, condition in triggers:
+            name = trigger_name(topic, table, event)
+            if IS_POSTGRES:
+                when = f"WHEN ({condition}) " if condition else ""
+                db.execute(sql(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+                db.execute(sql(f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW {when}EXECUTE FUNCTION bump_cache_version('{topic}')"))
+            else:
+                when = f"WHEN {condition} " if condition else ""
+                db.execute(sql(f"""
+                    CREATE TRIGGER IF NOT EXISTS {name}
+                    AFTER {event} ON {table} FOR EACH ROW {when}
+                    BEGIN UPDATE CacheVersions SET version = version + 1 WHERE name = '{topic}'; END
+                """))
+    return True
+
+# 이전 버전이 만들던 원장 트리거 (마이그레이션에서 제거)
+OBSOLETE_TRIGGERS = [("usage", "UsageLedger", event) for event in ("INSERT", "UPDATE", "DELETE")]
+
+def trigger_name(topic: str, table: str, event: str) -> str:
+    return f"trg_cache_{topic}_{table}_{event.lower()}"
+
+def drop_obsolete_triggers(db):
+    for topic, table, event in OBSOLETE_TRIGGERS:
+        name = trigger_name(topic, table, event)
+        db.execute(sql(f"DROP TRIGGER IF EXISTS {name} ON {table}" if IS_POSTGRES else f"DROP TRIGGER IF EXISTS {name}"))
+
+def bump(db, topic: str):
+    """트리거가 없는 항목의 버전을 직접 올립니다. (호출 측 트랜잭션에서 함께 확정)"""
+    db.execute(sql("UPDATE CacheVersions SET version = version + 1 WHERE name = :name"), {"name": topic})
+
+class SharedVersions:
+    def __init__(self):
+        self._callbacks = {}   # 항목 -> [콜백]
+        self._seen = None      # 마지막으로 읽은 {항목: 버전}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, topic: str, callback):
+        self._callbacks.setdefault(topic, []).append(callback)
+
+    def poll(self):
+        db = SessionLocal()
+        try:
+            current = dict(db.execute(sql("SELECT name, version FROM CacheVersions")).fetchall())
+        finally:
+            db.close()
+        previous, self._seen = self._seen, current
+        if previous is None: return []  # 첫 조회는 기준점만 잡음
+        changed = [topic for topic, version in current.items() if previous.get(topic) != version]
+        for topic in changed:
+            for callback in self._callbacks.get(topic, []):
+                callback()
+        return changed
+
+    def _run(self, logger):
+        while not self._stop.wait(POLL_SEC):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"🔄 [캐시 동기화 오류] {e}")
+
+    def start(self, logger):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self.poll()
+        self._thread = threading.Thread(target=self._run, args=(logger,), name="CacheSync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+shared_versions = SharedVersions()
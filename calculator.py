@@ -1,36 +1,116 @@
 # Manager_Console/calculator.py
-from models import SessionLocal, PricingPolicy
+import json
+import threading
+import time
+from bisect import bisect_right
+from sqlalchemy import func
+from models import SessionLocal, PricingPolicy, PricingPolicyVersion
+from constants import DEFAULT_PAPER_SIZE
+import timeutil
 
-def calculate_price(paper_size: int, color_mode: int, total_pages: int, copies: int) -> int:
+# 단가표에 해당 용지도, 기본 행(0)도 없을 때의 최후 안전망 단가 (흑백, 컬러) 및 A3(8) 가중치
+FALLBACK_MONO_PRICE, FALLBACK_COLOR_PRICE = 50, 150
+
+# 요금 정책 버전 목록을 다시 확인하는 주기 (에이전트 통신 주기와 동일)
+RELOAD_SEC = 10
+
+RATE_FIELDS = ("paper_size", "base_mono_price", "base_color_price", "multiplier", "color_multiplier", "duplex_percent")
+
+def fallback_unit_price(paper_size: int, color_mode: int) -> int:
+    base_price = FALLBACK_COLOR_PRICE if color_mode == 2 else FALLBACK_MONO_PRICE
+    return base_price * (2 if paper_size == 8 else 1)
+
+def is_duplex(duplex) -> bool:
+    return (duplex or 1) > 1
+
+def snapshot_rates(db) -> str:
+    """현재 PricingPolicy 전체를 버전 스냅샷(JSON)으로 직렬화합니다."""
+    return json.dumps([{f: getattr(p, f) for f in RATE_FIELDS} for p in db.query(PricingPolicy).all()])
+
+def matrix_from_rates(rates: list) -> dict:
+    """
+    정책 스냅샷을 {용지코드: (흑백 1장 단가, 컬러 1장 단가, 양면 비율%)} 형태로 미리 계산합니다.
+    (1장 단가 = 기본단가 * 가중치배수) - 요금 계산 시 행마다 정책을 조회하지 않기 위함
+    """
+    matrix = {}
+    for r in rates:
+        color_multiplier = r["color_multiplier"] if r.get("color_multiplier") is not None else r["multiplier"]
+        duplex_percent = r["duplex_percent"] if r.get("duplex_percent") is not None else 100
+        matrix[r["paper_size"]] = (r["base_mono_price"] * r["multiplier"], r["base_color_price"] * color_multiplier, duplex_percent)
+    return matrix
+
+# ====================================================================
+# 🌟 [신규] 버전별 요금표 (적용 시작 시각 기준 이진 탐색)
+#  - 정책 버전은 한 번 저장되면 바뀌지 않으므로, 최신 버전 ID가 달라졌을 때만 다시 읽습니다.
+# ====================================================================
+class PriceBook:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = ([], [], None)  # (적용 시작 시각 목록, [(버전 ID, 단가표)], 최신 버전 ID)
+        self._checked_at = 0.0
+
+    def reload(self, db=None):
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            latest = db.query(func.max(PricingPolicyVersion.id)).scalar()
+            if latest != self._state[2]:
+                versions = db.query(PricingPolicyVersion).order_by(PricingPolicyVersion.effective_from, PricingPolicyVersion.id).all()
+                self._state = (
+                    [v.effective_from for v in versions],
+                    [(v.id, matrix_from_rates(json.loads(v.rates_json))) for v in versions],
+                    latest
+                )
+            self._checked_at = time.monotonic()
+        finally:
+            if own_session: db.close()
+
+    def _current_state(self):
+        if time.monotonic() - self._checked_at > RELOAD_SEC:
+            with self._lock:
+                if time.monotonic() - self._checked_at > RELOAD_SEC:
+                    self.reload()
+        return self._state
+
+    def resolve(self, log_time: int = None):
+        """log_time(epoch 밀리초) 시점에 유효했던 (버전 ID, 단가표). 첫 버전 이전 시각은 첫 버전으로 간주합니다."""
+        starts, entries, _ = self._current_state()
+        if not entries: return None, {}
+        idx = bisect_right(starts, log_time or timeutil.now_ms()) - 1
+        return entries[max(idx, 0)]
+
+    def intervals(self):
+        """[(적용 시작, 다음 버전 시작 또는 None, 버전 ID, 단가표)] - 일괄 재계산용"""
+        starts, entries, _ = self._current_state()
+        return [
+            (starts[i], starts[i + 1] if i + 1 < len(starts) else None, vid, matrix)
+            for i, (vid, matrix) in enumerate(entries)
+        ]
+
+price_book = PriceBook()
+
+def price_job(paper_size: int, color_mode: int, total_pages: int, copies: int, log_time: int = None, duplex: int = 1):
+    """(최종 과금액, 적용된 요금 정책 버전 ID)"""
+    version_id, matrix = price_book.resolve(log_time)
+    # 용지 코드 행 -> 기본 행(0) -> 하드코딩 안전망 순서로 단가 결정
+    units = matrix.get(paper_size) or matrix.get(DEFAULT_PAPER_SIZE)
+    if units:
+        # 색상 모드에 따른 1장 단가 적용 (1: 흑백, 2: 컬러)
+        unit_price, duplex_percent = (units[1] if color_mode == 2 else units[0]), units[2]
+    else:
+        unit_price, duplex_percent = fallback_unit_price(paper_size, color_mode), 100
+    # 최종 금액 계산: (기본단가 * 가중치배수) * 출력페이지수 * 인쇄매수 (양면이면 비율 적용)
+    total_price = unit_price * total_pages * copies
+    if is_duplex(duplex):
+        total_price = total_price * duplex_percent // 100
+    return total_price, version_id
+
+def calculate_price(paper_size: int, color_mode: int, total_pages: int, copies: int, log_time: int = None, duplex: int = 1) -> int:
     """
-    용지 크기(A4, A3 등)와 색상 모드(흑백/컬러)를 기반으로 DB의 요금 정책을 조회하여 최종 과금액을 계산합니다.
+    용지 코드(DEVMODE)·색상 모드(흑백/컬러)·양면 여부를 기반으로, 인쇄 시점에 유효했던 요금 정책으로 최종 과금액을 계산합니다.
     """
-    db = SessionLocal()
     try:
-        # 1. 과금 정책 DB에서 안전하게 가져오기
-        policy = db.query(PricingPolicy).filter(PricingPolicy.paper_size == paper_size).first()
-        
-        # 2. 정책이 없을 경우를 대비한 안전망 (Fallback)
-        if not policy:
-            # DB에 정책이 없을 경우의 기본 하드코딩 값 (A4 기준)
-            base_price = 150 if color_mode == 2 else 50
-            multiplier = 2 if paper_size == 8 else 1 # 8은 A3
-        else:
-            # 3. 색상 모드에 따른 단가 및 배수 적용 (1: 흑백, 2: 컬러)
-            if color_mode == 2:
-                base_price = policy.base_color_price
-                multiplier = policy.color_multiplier
-            else:
-                base_price = policy.base_mono_price
-                multiplier = policy.multiplier
-
-        # 4. 최종 금액 계산: (기본단가 * 가중치배수) * 출력페이지수 * 인쇄매수
-        total_price = (base_price * multiplier) * total_pages * copies
-        return total_price
-        
+        return price_job(paper_size, color_mode, total_pages, copies, log_time, duplex)[0]
     except Exception as e:
         print(f"⚠️ [계산기 오류] 과금액 산출 중 문제 발생: {e}")
         return 0
-    finally:
-        # 작업이 끝나면 반드시 세션을 반납하여 메모리 누수 방지
-        db.close()
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Manager_Console/codec.py
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# ====================================================================
+# 🌟 [신규] 에이전트 요청/응답 빠른 직렬화
+#  - 요청 본문은 Content-Type 으로 형식을 고릅니다. JSON 은 pydantic 의 컴파일된 검증기로 바이트에서 바로 검증하고
+#    (json.loads 후 다시 검증하는 기본 경로 생략), application/msgpack 이면 MessagePack 으로 풀어서 검증합니다.
+#  - 응답은 orjson 으로 직렬화하며, 엔드포인트가 응답 객체를 직접 돌려주므로 jsonable_encoder 변환도 거치지 않습니다.
+#  - orjson / msgpack 은 선택 설치입니다. 없으면 표준 JSON 응답을 쓰고, MessagePack 요청은 415 로 거절합니다.
+# ====================================================================
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is None: return super().render(content)
+        # datetime 은 jsonable_encoder 와 같은 ISO 형식으로 기록됨
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def respond(content, status_code: int = 200) -> FastJSONResponse:
+    return FastJSONResponse(content, status_code=status_code)
+
+def _validation_error(e: ValidationError) -> RequestValidationError:
+    # FastAPI 기본 검증 오류(422)와 같은 모양이 되도록 위치 앞에 "body" 를 붙임
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+
+def body(schema):
+    """
+    요청 본문을 Content-Type 에 맞게 풀어 schema 로 검증하는 FastAPI 의존성.
+    사용 예) def handler(log: PrintLogSchema = Depends(codec.body(PrintLogSchema)))
+    """
+    async def dependency(request: Request):
+        raw = await request.body()
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        try:
+            if content_type in MSGPACK_TYPES:
+                if msgpack is None:
+                    raise HTTPException(status_code=415, detail="서버에 msgpack 이 설치되어 있지 않아 MessagePack 요청을 처리할 수 없습니다.")
+                try:
+                    data = msgpack.unpackb(raw, raw=False)
+                except (ValueError, msgpack.UnpackException) as e:
+                    raise HTTPException(status_code=400, detail=f"MessagePack 본문을 해석할 수 없습니다. ({type(e).__name__})")
+                return schema.model_validate(data)
+            return schema.model_validate_json(raw)
+        except ValidationError as e:
+            raise _validation_error(e)
+    dependency.__name__ = f"{schema.__name__}_body"
+    return dependency
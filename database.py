@@ -0,0 +1,75 @@
+# Manager_Console/database.py
+import os
+import re
+from datetime import datetime
+from contextlib import contextmanager
+from sqlalchemy import text, inspect
+from models import engine, Base
+
+# ====================================================================
+# 🌟 [신규] DB 종류(SQLite / PostgreSQL 등)에 무관한 SQL 실행 계층
+#  - 관리자 콘솔 탭과 서버의 직접 SQL은 모두 이 모듈을 거쳐 models.engine 으로 실행됩니다.
+#  - SQL은 :이름 형식 파라미터로 작성하고, 대소문자가 섞인 테이블 이름은 자동으로 따옴표 처리됩니다.
+#    (PostgreSQL은 따옴표 없는 이름을 소문자로 바꾸므로 ORM이 만든 "PrintLogs"를 찾지 못함)
+# ====================================================================
+IS_SQLITE = engine.dialect.name == "sqlite"
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+_TABLE_NAMES = sorted(Base.metadata.tables.keys(), key=len, reverse=True) + ["CacheVersions", "PrintLogsView"]
+_TABLE_RE = re.compile(r'(?<![\w"])(' + "|".join(_TABLE_NAMES) + r')(?![\w"])')
+
+def quote_tables(statement: str) -> str:
+    return _TABLE_RE.sub(r'"\1"', statement)
+
+def sql(statement: str):
+    """text() 와 같지만 테이블 이름을 모든 DB에서 동일하게 해석되도록 따옴표로 감쌉니다."""
+    return text(quote_tables(statement))
+
+def _plain(value):
+    # SQLite는 일시를 문자열로 돌려주므로, 다른 DB의 datetime 값도 같은 문자열 형식으로 맞춤
+    return str(value) if isinstance(value, datetime) else value
+
+def is_available() -> bool:
+    """SQLite라면 DB 파일이 이미 만들어졌는지 확인 (서버 DB는 항상 True, 연결 실패는 조회 시 예외로 처리)"""
+    return os.path.exists(engine.url.database) if IS_SQLITE else True
+
+def plain_rows(result) -> list:
+    return [tuple(_plain(v) for v in row) for row in result]
+
+def fetch_all(statement: str, params: dict = None) -> list:
+    with engine.connect() as conn:
+        return plain_rows(conn.execute(sql(statement), params or {}))
+
+def fetch_one(statement: str, params: dict = None):
+    rows = fetch_all(statement, params)
+    return rows[0] if rows else None
+
+def fetch_dicts(statement: str, params: dict = None) -> list:
+    with engine.connect() as conn:
+        return [{k: _plain(v) for k, v in row._mapping.items()} for row in conn.execute(sql(statement), params or {})]
+
+def execute(statement: str, params=None) -> int:
+    """단일 문장을 자체 트랜잭션으로 실행합니다. params 에 dict 목록을 주면 일괄(executemany) 실행"""
+    with transaction() as conn:
+        return conn.execute(sql(statement), params or {}).rowcount
+
+@contextmanager
+def transaction():
+    """여러 문장을 한 트랜잭션으로 묶습니다. (블록을 정상 종료하면 커밋, 예외 시 롤백)"""
+    with engine.begin() as conn:
+        yield conn
+
+@contextmanager
+def connect():
+    with engine.connect() as conn:
+        yield conn
+
+def column_names(conn, table: str) -> list:
+    return [c["name"] for c in inspect(conn).get_columns(table)]
+
+def has_column(conn, table: str, column: str) -> bool:
+    # SQLite 컬럼명은 대소문자를 구분하지 않음 (구버전 DB의 "Remark" == "remark")
+    return column.lower() in {c.lower() for c in column_names(conn, table)}
+
+def has_table(conn, table: str) -> bool:
+    return inspect(conn).has_table(table)
@@ -0,0 +1,124 @@
+# Manager_Console/exporter.py
+import csv
+import io
+import json
+import zlib
+from database import sql
+from retention import attach_archives, detach_archives, union_logs
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 재무 정산용 인쇄 로그 스트리밍 내보내기
+#  - 서버 측 커서로 CHUNK_SIZE 행씩 읽어 바로 전송하므로 기간이 길어도 메모리 사용량이 일정합니다.
+#  - 보관 기간이 지나 아카이브로 옮겨진 연도도 ATTACH 하여 운영 테이블과 함께 내보냅니다. (통계 탭과 같은 방식)
+#    아카이브 행은 이름 사전 id 로 저장되어 있으므로 이름은 운영 DB 의 사전에서 붙입니다.
+# ====================================================================
+CHUNK_SIZE = 5000
+
+EXPORT_COLUMNS = [
+    "id", "log_time", "uuid", "department", "os_user", "printer_name", "file_name",
+    "total_pages", "copies", "color_mode", "paper_size", "calculated_price", "print_status", "remark"
+]
+
+LOG_COLUMNS = ("id, log_time, uuid, os_user_id, printer_id, file_name, "
+               "total_pages, copies, color_mode, paper_size, calculated_price, print_status, remark")
+
+def export_query(schemas: list) -> str:
+    return f"""
+        SELECT p.id, p.log_time, p.uuid, u.department, o.name, r.name, p.file_name,
+               p.total_pages, p.copies, p.color_mode, p.paper_size, p.calculated_price, p.print_status, p.remark
+        FROM ({union_logs(schemas, LOG_COLUMNS, "log_time >= :start AND log_time < :end")}) p
+        LEFT JOIN Users u ON p.uuid = u.uuid
+        LEFT JOIN OsUsers o ON o.id = p.os_user_id
+        LEFT JOIN Printers r ON r.id = p.printer_id
+        ORDER BY p.log_time, p.id
+    """
+
+# format -> (Content-Type, 파일 확장자)
+FORMATS = {
+    "csv": ("application/gzip", "csv.gz"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+def _iter_chunks(engine, start: int, end: int):
+    with engine.connect() as conn:
+        schemas = attach_archives(conn, start, end - 1)
+        result = None
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=CHUNK_SIZE).execute(
+                sql(export_query(schemas)), {"start": start, "end": end}
+            )
+            for rows in result.partitions(CHUNK_SIZE):
+                # 정산 파일의 시각은 사람이 읽는 현지 시각 문자열로 기록
+                yield [[timeutil.format_ms(v) if i == 1 and v is not None else v for i, v in enumerate(row)] for row in rows]
+        finally:
+            # 다운로드가 중간에 끊겨도 커서를 닫은 뒤 아카이브를 떼어냄 (열린 커서가 있으면 DETACH 불가)
+            if result is not None: result.close()
+            detach_archives(conn, schemas)
+
+def stream_csv_gzip(engine, start: int, end: int):
+    # 엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 포함
+    gz = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+
+    for rows in _iter_chunks(engine, start, end):
+        writer.writerows(rows)
+        yield gz.compress(buf.getvalue().encode("utf-8"))
+        buf.seek(0); buf.truncate(0)
+    yield gz.compress(buf.getvalue().encode("utf-8")) + gz.flush()
+
+def stream_jsonl(engine, start: int, end: int):
+    for rows in _iter_chunks(engine, start, end):
+        yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+class _DrainSink(io.RawIOBase):
+    """Parquet 푸터의 오프셋 계산을 위해 누적 위치(tell)는 유지하면서, 기록된 바이트는 꺼내 가면 비워지는 버퍼"""
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self): return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self): return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_parquet(engine, start: int, end: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("log_time", pa.string()), ("uuid", pa.string()), ("department", pa.string()),
+        ("os_user", pa.string()), ("printer_name", pa.string()), ("file_name", pa.string()),
+        ("total_pages", pa.int64()), ("copies", pa.int64()), ("color_mode", pa.int64()), ("paper_size", pa.int64()),
+        ("calculated_price", pa.int64()), ("print_status", pa.string()), ("remark", pa.string()),
+    ])
+    sink = _DrainSink()
+    # 청크 하나 = Row Group 하나로 기록하고, 기록된 바이트는 즉시 내보냄
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd") as writer:
+        for rows in _iter_chunks(engine, start, end):
+            writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, row)) for row in rows], schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+STREAMERS = {"csv": stream_csv_gzip, "jsonl": stream_jsonl, "parquet": stream_parquet}
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
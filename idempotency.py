@@ -0,0 +1,42 @@
+# Manager_Console/idempotency.py
+import threading
+from collections import OrderedDict
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 중복 수신 방지 (에이전트 재전송 대비)
+#  - 에이전트가 타임아웃 후 같은 작업을 다시 보내면, 처음 기록된 log_id와 과금액을 그대로 돌려줍니다.
+#  - 최근 작업 키는 메모리(LRU)에서 먼저 확인하고, 없으면 DB의 고유 인덱스(uuid, job_key)로 확인합니다.
+# ====================================================================
+CAPACITY = 10000
+
+class RecentJobKeys:
+    def __init__(self, capacity: int = CAPACITY):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._entries = OrderedDict()  # (uuid, job_key) -> (log_id, 과금액, 처리 결과)
+
+    def get(self, uuid: str, job_key: str):
+        with self._lock:
+            entry = self._entries.get((uuid, job_key))
+            if entry is not None:
+                self._entries.move_to_end((uuid, job_key))
+            return entry
+
+    def remember(self, uuid: str, job_key: str, log_id: int, price: int, decision: str):
+        with self._lock:
+            self._entries[(uuid, job_key)] = (log_id, price, decision)
+            self._entries.move_to_end((uuid, job_key))
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+
+    def forget_log(self, log_id: int):
+        """로그가 삭제되면 같은 키로 다시 기록할 수 있도록 캐시에서도 지웁니다."""
+        with self._lock:
+            for k in [k for k, v in self._entries.items() if v[0] == log_id]:
+                del self._entries[k]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+recent_jobs = RecentJobKeys()
@@ -0,0 +1,245 @@
+# Manager_Console/journal.py
+import os
+import glob
+import json
+import threading
+import time
+import zlib
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from constants import JOURNAL_DIR
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 수신 저널 (추가 전용 파일)
+#  - 수신한 로그를 한 줄("crc32 JSON")씩 저널 파일에 덧붙이고 fsync 로 디스크에 확정된 뒤에 응답합니다.
+#    동시에 들어온 요청들은 한 번의 fsync 로 함께 확정합니다. (앞 요청이 fsync 중이면 뒤 요청들은 다음 fsync 에 묶임)
+#  - 백그라운드 반영기가 APPLY_SEC 마다 저널을 읽어 PrintLogs 에 모아서 기록하므로,
+#    콘솔의 긴 조회나 백업으로 DB 가 잠겨 있어도 수신 응답은 기다리지 않습니다.
+#  - 서버가 비정상 종료되면 다음 기동 때 남은 저널을 모두 다시 반영합니다. 이미 반영된 항목은 작업 키로 걸러집니다.
+#  - 체크섬이 맞지 않는 줄(기록 도중 전원 차단 등)은 반영하지 않고 REJECTED_FILE 에 따로 보관합니다.
+#  - 반영에 실패한 묶음은 DB 잠김·연결 끊김이면 그대로 다시 시도하고, 그 밖의 오류이거나 MAX_BATCH_ATTEMPTS 번 실패하면
+#    한 건씩 반영해 혼자서도 실패하는 레코드만 REJECTED_FILE 로 옮기고 다음으로 넘어갑니다. (한 건 때문에 뒤 레코드가 멈추지 않도록)
+#    이미 반영된 레코드를 다시 넘겨도 반영 함수가 작업 키로 걸러내므로 안전합니다.
+#  - 아직 반영되지 않은 레코드의 키(key_fields)를 메모리에 들고 있어, 반영 전에 같은 작업이 다시 들어오면 중복으로 알려 줍니다.
+#  - 파일 이름에 프로세스 번호가 들어가며, 각 워커는 자기 파일만 반영합니다. (남은 파일 전체 복구는 기동 시 상위 프로세스가 수행)
+# ====================================================================
+SEGMENT_BYTES = 4 * 1024 * 1024  # 이 크기를 넘고 모두 반영되면 새 파일로 교체
+APPLY_SEC = 0.5
+RETRY_SEC = 2.0                  # DB 반영 실패(잠김 등) 시 다시 시도하기까지 대기
+BATCH_SIZE = 500
+REJECTED_FILE = "ingest-rejected.log"
+MAX_BATCH_ATTEMPTS = 5           # 일시적 오류로 같은 묶음이 이만큼 실패하면 한 건씩 나눠 반영
+TRANSIENT_ERRORS = (OperationalError, PoolTimeoutError, OSError)  # DB 잠김·연결 문제 (레코드 내용과 무관)
+
+def encode(record: dict) -> bytes:
+    data = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    return b"%08x " % zlib.crc32(data) + data + b"\n"
+
+def decode(line: bytes):
+    """체크섬이 맞으면 레코드, 아니면 None"""
+    if len(line) < 10 or line[8:9] != b" ": return None
+    data = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(data): return None
+        return json.loads(data)
+    except ValueError:
+        return None
+
+def _segment_order(path: str) -> int:
+    # ingest-<pid>-<생성 시각 ns>.log
+    return int(os.path.basename(path)[:-4].rsplit("-", 1)[1])
+
+class Journal:
+    def __init__(self, directory: str = JOURNAL_DIR, key_fields: tuple = None):
+        self.directory = directory
+        self.key_fields = key_fields
+        self._cond = threading.Condition()
+        self._fd = None
+        self._path = None
+        self._size = 0
+        self._written = 0    # 지금까지 기록한 레코드 번호
+        self._durable = 0    # fsync 로 확정된 레코드 번호
+        self._syncing = False
+        self._offsets = {}   # 세그먼트 경로 -> 반영을 마친 바이트 위치
+        self._pending = {}   # 반영 전 레코드의 키 -> 레코드
+        self._attempts = {}  # (세그먼트 경로, 위치) -> 연속 실패 횟수
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- 기록 (요청 처리 스레드) ---
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"ingest-{os.getpid()}-{time.time_ns()}.log")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self._path, flags, 0o644)
+        self._size = 0
+
+    def _key(self, record: dict):
+        return tuple(record.get(f) for f in self.key_fields) if self.key_fields else None
+
+    def append(self, record: dict) -> dict:
+        """
+        레코드를 덧붙이고 디스크에 확정될 때까지 기다린 뒤 그 레코드를 반환합니다.
+        같은 키의 레코드가 아직 반영 전이면 기록하지 않고 먼저 들어온 레코드를 반환합니다.
+        """
+        line = encode(record)
+        key = self._key(record)
+        with self._cond:
+            if key is not None:
+                if key in self._pending: return self._pending[key]
+                self._pending[key] = record
+            if self._fd is None: self._open()
+            os.write(self._fd, line)
+            self._size += len(line)
+            self._written += 1
+            seq = self._written
+            while self._durable < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                # 이 요청이 fsync 를 맡음 - 그동안 뒤따라 기록된 레코드도 이번 fsync 에 함께 확정됨
+                self._syncing, target, fd = True, self._written, self._fd
+                self._cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._durable = max(self._durable, target)
+        return record
+
+    def _close_active(self):
+        """현재 파일을 닫습니다. (잠금을 잡은 상태에서 호출)"""
+        while self._syncing: self._cond.wait()
+        if self._fd is None: return
+        if self._durable < self._written:
+            os.fsync(self._fd)
+            self._durable = self._written
+        os.close(self._fd)
+        self._fd, self._path = None, None
+
+    # --- 반영 (백그라운드 스레드 / 기동 시 복구) ---
+    def _segments(self, own_only: bool) -> list:
+        pattern = f"ingest-{os.getpid()}-*.log" if own_only else "ingest-*-*.log"
+        return sorted(glob.glob(os.path.join(self.directory, pattern)), key=_segment_order)
+
+    def _reject(self, lines: list, logger, reason: str = None):
+        with open(os.path.join(self.directory, REJECTED_FILE), "ab") as f:
+            for line in lines: f.write(line + b"\n")
+        if reason:
+            logger.error(f"🧾 [저널 반영 불가] 반영할 수 없는 {len(lines)}건을 {REJECTED_FILE} 에 보관했습니다: {reason}")
+        else:
+            logger.error(f"🧾 [저널 손상] 체크섬이 맞지 않는 {len(lines)}건을 {REJECTED_FILE} 에 보관했습니다.")
+
+    def _forget(self, records: list):
+        if not self.key_fields: return
+        with self._cond:
+            for record in records: self._pending.pop(self._key(record), None)
+
+    def _apply_each(self, apply_batch, entries: list, exhausted: bool) -> list:
+        """
+        레코드를 한 건씩 반영하고 실패한 (레코드, 줄, 오류) 목록을 반환합니다.
+        일시적 오류가 섞여 있으면 DB 문제일 수 있으므로 예외를 올려 다시 시도합니다.
+        (재시도 한도를 넘었고 다른 레코드는 반영된 경우만 그 레코드의 문제로 봄)
+        """
+        failed, succeeded = [], 0
+        for record, line in entries:
+            try:
+                apply_batch([record])
+                succeeded += 1
+            except Exception as e:
+                failed.append((record, line, e))
+        transient = [e for _, _, e in failed if isinstance(e, TRANSIENT_ERRORS)]
+        if transient and not (exhausted and succeeded): raise transient[0]
+        return failed
+
+    def _apply_chunk(self, apply_batch, entries: list, position: tuple, logger):
+        records = [record for record, _ in entries]
+        try:
+            apply_batch(records)
+        except Exception as e:
+            attempts = self._attempts.get(position, 0) + 1
+            self._attempts[position] = attempts
+            if isinstance(e, TRANSIENT_ERRORS) and attempts < MAX_BATCH_ATTEMPTS: raise
+            failed = self._apply_each(apply_batch, entries, attempts >= MAX_BATCH_ATTEMPTS)
+            for _, line, error in failed:
+                self._reject([line], logger, f"{type(error).__name__}: {error}")
+        self._attempts.pop(position, None)
+        self._forget(records)
+
+    def apply_pending(self, apply_batch, logger, own_only: bool = True) -> int:
+        """
+        아직 반영하지 않은 레코드를 BATCH_SIZE 줄씩 apply_batch(레코드 목록)로 넘깁니다.
+        일시적 오류(TRANSIENT_ERRORS)로 실패하면 그 지점에서 멈추고 예외를 그대로 올리며, 다음 호출 때 이어서 반영합니다.
+        그 밖의 오류는 한 건씩 다시 반영해 실패한 레코드만 REJECTED_FILE 로 옮깁니다. (_apply_chunk)
+        반환값: 넘긴 레코드 수
+        """
+        applied = 0
+        for path in self._segments(own_only):
+            offset = self._offsets.get(path, 0)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # 아직 쓰는 중인 마지막 줄(줄바꿈 없음)은 다음 차례에 읽음
+            complete = data[:data.rfind(b"\n") + 1]
+            lines = complete.splitlines(keepends=True)
+            for i in range(0, len(lines), BATCH_SIZE):
+                chunk = lines[i:i + BATCH_SIZE]
+                entries, bad = [], []
+                for line in chunk:
+                    record = decode(line.rstrip(b"\n"))
+                    if record is None: bad.append(line.rstrip(b"\n"))
+                    else: entries.append((record, line.rstrip(b"\n")))
+                if entries: self._apply_chunk(apply_batch, entries, (path, offset), logger)
+                if bad: self._reject(bad, logger)
+                offset += sum(len(line) for line in chunk)
+                self._offsets[path] = offset
+                applied += len(entries)
+
+            with self._cond:
+                if path == self._path:
+                    # 다 반영된 큰 파일은 닫고 지움 (다음 기록부터 새 파일)
+                    if offset < self._size or self._size < SEGMENT_BYTES: continue
+                    self._close_active()
+            if len(complete) != len(data):
+                # 닫힌 파일 끝의 줄바꿈 없는 조각 = 기록 도중 중단된 줄
+                self._reject([data[len(complete):]], logger)
+            os.remove(path)
+            self._offsets.pop(path, None)
+        return applied
+
+    def replay(self, apply_batch, logger) -> int:
+        """기동 시 남아 있는 모든 저널(이전 프로세스 포함)을 반영합니다."""
+        if not os.path.isdir(self.directory): return 0
+        count = self.apply_pending(apply_batch, logger, own_only=False)
+        if count: logger.info(f"🧾 [저널 복구] 반영되지 않았던 인쇄 로그 {count}건을 다시 반영했습니다.")
+        return count
+
+    def _run(self, apply_batch, logger):
+        wait = APPLY_SEC
+        while not self._stop.wait(wait):
+            try:
+                self.apply_pending(apply_batch, logger)
+                wait = APPLY_SEC
+            except Exception as e:
+                logger.error(f"🧾 [저널 반영 지연] DB 반영에 실패하여 {RETRY_SEC}초 후 다시 시도합니다: {e}")
+                wait = RETRY_SEC
+
+    def start(self, apply_batch, logger):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(apply_batch, logger), name="JournalApplier", daemon=True)
+        self._thread.start()
+
+    def stop(self, apply_batch, logger):
+        """종료 시 남은 레코드를 반영하고 파일을 닫습니다. (실패하면 다음 기동 때 복구)"""
+        self._stop.set()
+        if self._thread: self._thread.join(timeout=10)
+        with self._cond:
+            self._close_active()
+        try:
+            self.apply_pending(apply_batch, logger)
+        except Exception as e:
+            logger.error(f"🧾 [저널 반영 보류] 남은 로그는 다음 기동 때 반영됩니다: {e}")
+
+ingest_journal = Journal(key_fields=("uuid", "job_key"))
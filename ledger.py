@@ -0,0 +1,103 @@
+# Manager_Console/ledger.py
+from database import sql
+from models import User, UsageLedger
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 사용자/부서별 과금 원장 (기간별 누적 페이지·금액)
+#  - 인쇄 수신, 상태 변경, 단가 조정 시 같은 트랜잭션 안에서 증감만 반영합니다.
+#  - 한도 점검이나 통계에서 PrintLogs 전체를 다시 집계하지 않고 원장 한 줄만 읽으면 됩니다.
+# ====================================================================
+NON_BILLABLE_STATUSES = ("반려됨", "과금취소")
+
+def is_billable(status: str) -> bool:
+    return (status or "완료") not in NON_BILLABLE_STATUSES
+
+def periods_of(log_time) -> tuple:
+    """로그 시각(epoch 밀리초)이 속하는 (월, 일) 원장 기간 키"""
+    days = timeutil.day_number(log_time)
+    return timeutil.month_key(days), timeutil.day_key(days)
+
+def actual_pages(total_pages, copies) -> int:
+    # 통계 탭과 동일한 규칙: 매수가 비어 있으면 1부로 간주
+    return (total_pages or 0) * (copies or 1)
+
+def _bump(db, scope: str, key: str, period: str, mono: int, color: int, price: int, jobs: int):
+    # 기간의 첫 기록이 여러 워커에서 동시에 들어와도 기본 키 충돌 없이 한 줄로 합쳐지도록 ON CONFLICT 로 증감
+    db.execute(sql("""
+        INSERT INTO UsageLedger (scope, key, period, mono_pages, color_pages, total_price, job_count)
+        VALUES (:scope, :key, :period, :mono, :color, :price, :jobs)
+        ON CONFLICT (scope, key, period) DO UPDATE SET
+            mono_pages = UsageLedger.mono_pages + excluded.mono_pages,
+            color_pages = UsageLedger.color_pages + excluded.color_pages,
+            total_price = UsageLedger.total_price + excluded.total_price,
+            job_count = UsageLedger.job_count + excluded.job_count
+    """), {"scope": scope, "key": key, "period": period, "mono": mono, "color": color, "price": price, "jobs": jobs})
+
+def apply(db, log, sign: int = 1, price_delta: int = None):
+    """
+    로그 한 건을 원장에 더하거나(sign=1) 뺍니다(sign=-1).
+    price_delta를 주면 페이지 수는 그대로 두고 금액만 조정합니다. (수동 단가 조정)
+    커밋은 호출한 쪽의 트랜잭션에서 함께 이루어집니다.
+    """
+    if price_delta is not None:
+        mono = color = jobs = 0
+        price = price_delta
+    else:
+        pages = actual_pages(log.total_pages, log.copies)
+        mono = sign * pages if log.color_mode == 1 else 0
+        color = sign * pages if log.color_mode == 2 else 0
+        price = sign * (log.calculated_price or 0)
+        jobs = sign
+
+    user = db.query(User.department).filter(User.uuid == log.uuid).first()
+    department = user.department if user and user.department else "미배정"
+
+    for period in periods_of(log.log_time):
+        _bump(db, "user", log.uuid, period, mono, color, price, jobs)
+        _bump(db, "dept", department, period, mono, color, price, jobs)
+
+def apply_price_deltas(db, rows):
+    """
+    (uuid, 부서, 일 번호, 금액 증감) 묶음을 원장에 반영합니다. (일괄 재계산)
+    같은 기간 키로 접은 뒤 한 줄씩 증감하므로, 묶음에 없는 기간(보관 연도 포함)의 원장은 그대로 남습니다.
+    """
+    totals = {}
+    for uuid, department, days, delta in rows:
+        if not delta: continue
+        for period in (timeutil.month_key(days), timeutil.day_key(days)):
+            for scope, key in (("user", uuid), ("dept", department)):
+                totals[(scope, key, period)] = totals.get((scope, key, period), 0) + delta
+    for (scope, key, period), delta in totals.items():
+        if delta: _bump(db, scope, key, period, 0, 0, delta, 0)
+    return len(totals)
+
+def rebuild(db):
+    """
+    PrintLogs 전체로부터 원장을 다시 만듭니다. (최초 도입 시 / 일괄 재계산 후)
+    DB 에서는 (키, 일 번호) 정수 묶음으로만 집계하고, 일/월 기간 키는 그 결과를 접어서 만듭니다.
+    """
+    db.query(UsageLedger).delete(synchronize_session=False)
+    excluded = ", ".join(f"'{s}'" for s in NON_BILLABLE_STATUSES)
+    for scope, key_expr in (("user", "p.uuid"), ("dept", "COALESCE(NULLIF(u.department, ''), '미배정')")):
+        rows = db.execute(sql(f"""
+            SELECT {key_expr}, {timeutil.day_expr('p.log_time')},
+                   SUM(CASE WHEN p.color_mode = 1 THEN COALESCE(p.total_pages, 0) * COALESCE(NULLIF(p.copies, 0), 1) ELSE 0 END),
+                   SUM(CASE WHEN p.color_mode = 2 THEN COALESCE(p.total_pages, 0) * COALESCE(NULLIF(p.copies, 0), 1) ELSE 0 END),
+                   SUM(COALESCE(p.calculated_price, 0)),
+                   COUNT(*)
+            FROM PrintLogs p LEFT JOIN Users u ON p.uuid = u.uuid
+            WHERE COALESCE(p.print_status, '완료') NOT IN ({excluded}) AND p.log_time IS NOT NULL
+            GROUP BY 1, 2
+        """)).all()
+        totals = {}
+        for key, days, mono, color, price, jobs in rows:
+            for period in (timeutil.month_key(days), timeutil.day_key(days)):
+                total = totals.setdefault((key, period), [0, 0, 0, 0])
+                total[0] += mono or 0; total[1] += color or 0; total[2] += price or 0; total[3] += jobs
+        if totals:
+            db.execute(sql("""
+                INSERT INTO UsageLedger (scope, key, period, mono_pages, color_pages, total_price, job_count)
+                VALUES (:scope, :key, :period, :mono, :color, :price, :jobs)
+            """), [{"scope": scope, "key": key, "period": period, "mono": t[0], "color": t[1], "price": t[2], "jobs": t[3]}
+                   for (key, period), t in totals.items()])
@@ -0,0 +1,90 @@
+# Manager_Console/log_query.py
+import base64
+import hashlib
+import json
+from database import sql, plain_rows
+from lookups import VIEW
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 조건 조회 (필터 + 정렬 + 키셋 페이지네이션)
+#  - OFFSET 대신 "마지막으로 본 (정렬값, id)" 다음부터 읽으므로, 뒤쪽 페이지도 첫 페이지와 같은 비용입니다.
+#  - 커서는 정렬 기준·필터 지문을 함께 담은 불투명 문자열이며, 조건이 바뀐 채로 재사용하면 거부합니다.
+#  - 선택도가 높은 필터(uuid, 프린터, 상태)는 (필터 컬럼, log_time) 복합 색인을 타고,
+#    값 종류가 적은 필터(색상, 용지)와 부서(uuid 목록으로 변환)는 시간 색인 범위 안에서 걸러냅니다.
+# ====================================================================
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+SORT_KEYS = ("log_time", "calculated_price", "total_pages")
+FILTER_COLUMNS = ("uuid", "printer_name", "print_status", "color_mode", "paper_size")
+# 이름 필터 -> (로그의 id 컬럼, 이름 사전) : 사전에서 id 를 찾아 (id, log_time) 색인으로 조회
+NAME_FILTERS = {"printer_name": ("printer_id", "Printers")}
+
+RESULT_COLUMNS = ("id", "log_time", "uuid", "os_user", "file_name", "printer_name", "total_pages", "remark",
+                  "color_mode", "paper_size", "calculated_price", "print_status", "duplex")
+
+def _filters_digest(filters: dict) -> str:
+    return hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+def encode_cursor(sort: str, order: str, filters: dict, value, log_id: int) -> str:
+    payload = json.dumps({"s": sort, "o": order, "f": _filters_digest(filters), "v": value, "id": log_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str, filters: dict):
+    """(정렬값, id). 형식이 틀리거나 다른 조건으로 만든 커서면 ValueError"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, log_id = payload["v"], int(payload["id"])
+        same_query = (payload["s"], payload["o"], payload["f"]) == (sort, order, _filters_digest(filters))
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("잘못된 커서입니다.")
+    if not same_query:
+        raise ValueError("커서가 현재 조회 조건과 맞지 않습니다. 첫 페이지부터 다시 조회하세요.")
+    return value, log_id
+
+def query_logs(conn, filters: dict, sort: str = "log_time", order: str = "desc", cursor: str = None, limit: int = PAGE_SIZE) -> dict:
+    """
+    filters: date_from/date_to(epoch 밀리초, to 미포함), department, FILTER_COLUMNS 의 값 (None 이면 조건 없음)
+    반환: {"items": [...], "next_cursor": 다음 페이지 커서 또는 None}
+    """
+    if sort not in SORT_KEYS: raise ValueError(f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다.")
+    if order not in ("asc", "desc"): raise ValueError("정렬 방향은 asc 또는 desc 여야 합니다.")
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    filters = {k: v for k, v in filters.items() if v is not None and v != ""}
+
+    conditions, params = [], {"limit": limit + 1}
+    if "date_from" in filters:
+        conditions.append("log_time >= :date_from"); params["date_from"] = filters["date_from"]
+    if "date_to" in filters:
+        conditions.append("log_time < :date_to"); params["date_to"] = filters["date_to"]
+    for column in FILTER_COLUMNS:
+        if column not in filters: continue
+        if column in NAME_FILTERS:
+            id_column, table = NAME_FILTERS[column]
+            conditions.append(f"{id_column} = (SELECT id FROM {table} WHERE name = :{column})")
+        else:
+            conditions.append(f"{column} = :{column}")
+        params[column] = filters[column]
+    if "department" in filters:
+        conditions.append("uuid IN (SELECT uuid FROM Users WHERE department = :department)"); params["department"] = filters["department"]
+
+    # 키셋 조건: (정렬값, id) 가 커서보다 뒤인 행. 앞 조건(<=, >=)이 색인 범위 탐색을 가능하게 함
+    cmp, cmp_eq = ("<", "<=") if order == "desc" else (">", ">=")
+    if cursor:
+        value, log_id = decode_cursor(cursor, sort, order, filters)
+        conditions.append(f"{sort} {cmp_eq} :cursor_value AND ({sort} {cmp} :cursor_value OR id {cmp} :cursor_id)")
+        params.update(cursor_value=value, cursor_id=log_id)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    direction = order.upper()
+    rows = plain_rows(conn.execute(sql(f"""
+        SELECT {', '.join(RESULT_COLUMNS)} FROM {VIEW} {where}
+        ORDER BY {sort} {direction}, id {direction} LIMIT :limit
+    """), params))
+
+    items = [dict(zip(RESULT_COLUMNS, row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, order, filters, last[sort], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,70 @@
+# Manager_Console/lookups.py
+from database import sql
+from models import engine, PrintLog
+
+# ====================================================================
+# 🌟 [신규] 프린터 / OS 사용자 이름 사전 (Printers, OsUsers)
+#  - PrintLogs 는 같은 이름 문자열을 행마다 반복하지 않고 사전의 정수 id 만 저장합니다.
+#    행과 색인이 작아지고, 프린터별 조회·집계도 정수 비교로 처리됩니다.
+#  - 이름 -> id 는 프로세스 메모리에 캐시합니다. 사전의 이름은 바뀌거나 지워지지 않으므로 캐시를 비울 필요가 없고,
+#    처음 보는 이름만 DB 에 등록합니다.
+#  - 등록은 호출 측 트랜잭션과 별도로 바로 확정합니다. (로그 기록이 실패해 되돌려져도 캐시에 없는 id 가 남지 않음)
+#    다른 워커가 같은 이름을 동시에 등록해도 고유 제약 + ON CONFLICT 로 한 줄만 남습니다.
+#  - 조회 쪽은 이름을 다시 붙인 뷰(PrintLogsView)를 읽으므로 API·콘솔에는 전과 같이 문자열이 나갑니다.
+# ====================================================================
+VIEW = "PrintLogsView"
+
+class NameDictionary:
+    def __init__(self, table: str):
+        self.table = table
+        self._ids = {}     # 이름 -> id
+        self._names = {}   # id -> 이름
+
+    def _remember(self, entry_id: int, name: str):
+        self._ids[name] = entry_id
+        self._names[entry_id] = name
+
+    def id_of(self, name: str):
+        """이름의 id (없으면 등록). 이름이 없으면 None"""
+        if name is None: return None
+        entry_id = self._ids.get(name)
+        if entry_id is not None: return entry_id
+        select = sql(f"SELECT id FROM {self.table} WHERE name = :name")
+        with engine.connect() as conn:
+            entry_id = conn.execute(select, {"name": name}).scalar()
+        if entry_id is None:
+            with engine.begin() as conn:
+                conn.execute(sql(f"INSERT INTO {self.table} (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"), {"name": name})
+                entry_id = conn.execute(select, {"name": name}).scalar()
+        self._remember(entry_id, name)
+        return entry_id
+
+    def name_of(self, entry_id: int):
+        if entry_id is None: return None
+        name = self._names.get(entry_id)
+        if name is None:
+            with engine.connect() as conn:
+                name = conn.execute(sql(f"SELECT name FROM {self.table} WHERE id = :id"), {"id": entry_id}).scalar()
+            if name is not None: self._remember(entry_id, name)
+        return name
+
+    def clear(self):
+        self._ids, self._names = {}, {}
+
+printers = NameDictionary("Printers")
+os_users = NameDictionary("OsUsers")
+
+def install_view(conn):
+    """
+    PrintLogs 에 이름(os_user, printer_name)을 다시 붙인 조회용 뷰를 (다시) 만듭니다.
+    컬럼 목록을 만들 때 고정하는 DB(PostgreSQL)가 있으므로, PrintLogs 에 컬럼이 추가되면 마이그레이션에서 다시 호출합니다.
+    """
+    columns = ", ".join(f"p.{c.name}" for c in PrintLog.__table__.columns)
+    conn.execute(sql(f"DROP VIEW IF EXISTS {VIEW}"))
+    conn.execute(sql(f"""
+        CREATE VIEW {VIEW} AS
+        SELECT {columns}, o.name AS os_user, r.name AS printer_name
+        FROM PrintLogs p
+        LEFT JOIN OsUsers o ON o.id = p.os_user_id
+        LEFT JOIN Printers r ON r.id = p.printer_id
+    """))
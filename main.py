@@ -1,54 +1,124 @@
 # Manager_Console/main.py
+import time
+STARTED_AT = time.perf_counter()  # 기동 시간 측정 기준점 (다른 import 보다 먼저)
+
+import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget
-from models import Base, engine
+import importlib
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel
+from PySide6.QtCore import Qt, QTimer
+from constants import PROGRAM_DATA_DIR
+
+# ====================================================================
+# 🌟 [신규] 콘솔 빠른 기동 (탭 지연 생성)
+#  - 창은 빈 자리표시 탭으로 먼저 띄우고, 각 탭은 처음 선택될 때 모듈을 import 하여 생성합니다.
+#    (탭 모듈이 SQLAlchemy 등 무거운 라이브러리를 끌어오므로, 창 표시 전에는 아무 탭도 import 하지 않음)
+#  - 탭은 생성 시 스스로 첫 조회를 하므로, 열어보지 않은 통계/기기 탭의 전체 조회는 실행되지 않습니다.
+#  - DB 테이블 생성/변경은 서버 기동 시 마이그레이션이 담당하므로 콘솔에서는 하지 않습니다.
+#  - --startup-report (또는 PRINT_MONITOR_STARTUP_REPORT=1) 로 실행하면 단계별 기동 시간을 기록합니다.
+# ====================================================================
+STARTUP_REPORT_ENV = "PRINT_MONITOR_STARTUP_REPORT"
+STARTUP_LOG = os.path.join(PROGRAM_DATA_DIR, "logs", "console-startup.log")
+
+# (모듈, 클래스, 탭 제목)
+TAB_SPECS = [
+    ("tab_logs", "TabLogs", "📊 실시간 로그 및 결재 관리"),
+    ("tab_approvals", "ApprovalsTab", "📝 결재 대기함"),
+    ("tab_stats", "StatsTab", "📈 통계 분석 (일/월/년)"),
+    ("tab_users", "UsersTab", "👥 기기 현황 및 예외 설정"),
+    ("tab_settings", "SettingsTab", "⚙️ 과금 단가 및 전사 정책 설정"),
+]
+
+class StartupTimer:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.marks = []  # (단계, 기동 후 경과 초)
+        self.reported = False
 
-from tab_logs import TabLogs
-from tab_stats import StatsTab
-from tab_users import UsersTab
-from tab_settings import SettingsTab
+    def mark(self, label: str):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - STARTED_AT))
+
+    def report(self):
+        if not self.enabled or self.reported: return
+        self.reported = True
+        lines = [f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] 관리자 콘솔 기동 시간"]
+        previous = 0.0
+        for label, elapsed in self.marks:
+            lines.append(f"  {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:7.1f} ms)  {label}")
+            previous = elapsed
+        text = "\n".join(lines)
+        print(text, file=sys.stderr)
+        try:
+            os.makedirs(os.path.dirname(STARTUP_LOG), exist_ok=True)
+            with open(STARTUP_LOG, "a", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except OSError:
+            pass
 
 class ManagerWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, timer: StartupTimer = None):
         super().__init__()
         self.setWindowTitle("엔터프라이즈 프린트 과금 관리 대시보드 (v1.1 Secure Final)")
         self.resize(1200, 800)
-        
+        self.timer = timer or StartupTimer(False)
+
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
-        
-        # 1. 탭 객체 생성
-        self.tab_logs = TabLogs()
-        self.tab_stats = StatsTab()
-        self.tab_users = UsersTab()
-        self.tab_settings = SettingsTab()
-        
-        # 2. 탭 부착
-        self.tabs.addTab(self.tab_logs, "📊 실시간 로그 및 결재 관리")
-        self.tabs.addTab(self.tab_stats, "📈 통계 분석 (일/월/년)")
-        self.tabs.addTab(self.tab_users, "👥 기기 현황 및 예외 설정")
-        self.tabs.addTab(self.tab_settings, "⚙️ 과금 단가 및 전사 정책 설정")
-        
-        # 🌟 [복구] 3. 원클릭 전체 새로고침(Global Refresh) 시그널 통합 라우팅
-        self.tab_logs.refresh_requested.connect(self.load_all_data)
-        self.tab_stats.refresh_requested.connect(self.load_all_data)
-        self.tab_users.refresh_requested.connect(self.load_all_data)
-        self.tab_settings.refresh_requested.connect(self.load_all_data)
-
-    # 🌟 [복구] 모든 탭의 데이터를 한 번에 최신화하는 중앙 컨트롤 로직
+
+        # 1. 자리표시 탭 부착 (실제 탭 객체는 처음 선택될 때 생성)
+        self.loaded_tabs = {}  # 탭 번호 -> 생성된 탭 객체
+        for _, _, title in TAB_SPECS:
+            self.tabs.addTab(self._placeholder(), title)
+        self.tabs.currentChanged.connect(self.ensure_tab)
+
+    def _placeholder(self) -> QWidget:
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        label = QLabel("⏳ 불러오는 중...")
+        label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(label)
+        return widget
+
+    def ensure_tab(self, index: int):
+        """index 탭이 아직 자리표시 상태라면 모듈을 import 하여 실제 탭으로 교체합니다."""
+        if index < 0 or index in self.loaded_tabs: return self.loaded_tabs.get(index)
+        module_name, class_name, title = TAB_SPECS[index]
+        tab = getattr(importlib.import_module(module_name), class_name)()  # 생성자에서 첫 조회 수행
+        self.loaded_tabs[index] = tab
+        # 🌟 [복구] 원클릭 전체 새로고침(Global Refresh) 시그널 통합 라우팅
+        tab.refresh_requested.connect(self.load_all_data)
+
+        placeholder = self.tabs.widget(index)
+        self.tabs.blockSignals(True)  # 교체 중 currentChanged 재진입 방지
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, tab, title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        self.timer.mark(f"탭 생성 및 첫 조회: {title}")
+        return tab
+
+    # 🌟 [복구] 모든 탭의 데이터를 한 번에 최신화하는 중앙 컨트롤 로직 (아직 열지 않은 탭은 처음 열 때 조회)
     def load_all_data(self):
-        self.tab_logs.load_data()
-        self.tab_stats.load_data()
-        self.tab_users.load_data()
-        self.tab_settings.load_data()
+        for tab in self.loaded_tabs.values():
+            tab.load_data()
+
+    def load_first_tab(self):
+        self.ensure_tab(self.tabs.currentIndex())
+        self.timer.report()
 
 if __name__ == "__main__":
-    # ORM 엔진 초기화 및 테이블 안전 점검
-    Base.metadata.create_all(bind=engine)
-    
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion") 
-    
-    window = ManagerWindow()
+    report = "--startup-report" in sys.argv or os.environ.get(STARTUP_REPORT_ENV) == "1"
+    timer = StartupTimer(report)
+    timer.mark("Python/PySide6 모듈 로드")
+
+    app = QApplication([a for a in sys.argv if a != "--startup-report"])
+    app.setStyle("Fusion")
+
+    window = ManagerWindow(timer)
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    timer.mark("창 표시")
+    # 창이 먼저 그려지도록 이벤트 루프가 돈 뒤에 첫 탭을 생성
+    QTimer.singleShot(0, window.load_first_tab)
+    sys.exit(app.exec())
@@ -0,0 +1,492 @@
+# Manager_Console/migrations.py
+import glob
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from sqlalchemy import Integer, inspect
+from sqlalchemy.exc import OperationalError
+from models import Base, SessionLocal, PricingPolicy, PricingPolicyVersion, PrintControlPolicy
+from constants import DEFAULT_PAPER_SIZE
+from database import sql, has_column, has_table, column_names
+from cache_sync import install_triggers, drop_obsolete_triggers, TOPICS
+import calculator
+import search
+import ledger
+import lookups
+import retention
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 버전 기반 DB 스키마 마이그레이션
+#  - schema_version 표에 적용된 버전을 기록하고, 서버 기동 시 아직 적용되지 않은 단계만 한 번씩 실행합니다.
+#  - 이미 최신이면 버전 한 줄만 읽고 끝나므로, 매 기동마다 실패하는 ALTER 를 반복하지 않습니다.
+#  - 도입 이전에 컬럼이 일부 추가된 DB도 있으므로 각 단계는 "없으면 추가" 방식으로 작성합니다.
+#  - 모델/마이그레이션/트리거 정의의 지문(fingerprint)을 DB에 저장해 두고, 지문이 같으면 DDL 점검(create_all 포함)을 통째로 건너뜁니다.
+# ====================================================================
+BACKFILL_BATCH = 5000
+
+# 초기 버전(PascalCase) DB의 컬럼명 -> 현재 이름
+LEGACY_COLUMNS = {
+    "PrintLogs": {
+        "LogID": "id", "PrintTime": "log_time", "User_UUID": "uuid", "UserName": "os_user",
+        "PrinterName": "printer_name", "FileName": "file_name", "TotalPages": "total_pages",
+        "ColorType": "color_mode", "PaperSize": "paper_size", "CalculatedPrice": "calculated_price",
+        "PrintStatus": "print_status",
+    },
+    "Users": {
+        "UserName": "os_user", "LastHeartbeat": "last_heartbeat", "PCName": "pc_name", "IPAddress": "ip_address",
+        "ColorLimit": "color_limit", "MonoLimit": "mono_limit", "UsePopup": "use_popup",
+    },
+    "PricingPolicy": {
+        "PaperSize": "paper_size", "BaseMonoPrice": "base_mono_price", "BaseColorPrice": "base_color_price",
+        "ColorMultiplier": "color_multiplier",
+    },
+}
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    if not has_column(conn, table, column):
+        conn.execute(sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def _backfill(engine, progress, label: str, table: str, assignment: str, condition: str):
+    """condition 에 해당하는 행을 BACKFILL_BATCH 개씩 나눠 갱신합니다. (배치마다 커밋하므로 큰 DB도 잠금을 오래 잡지 않음)"""
+    with engine.connect() as conn:
+        total = conn.execute(sql(f"SELECT COUNT(*) FROM {table} WHERE {condition}")).scalar() or 0
+    if not total: return
+    done = 0
+    while True:
+        with engine.begin() as conn:
+            count = conn.execute(sql(f"""
+                UPDATE {table} SET {assignment}
+                WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT {BACKFILL_BATCH})
+            """)).rowcount
+        if count <= 0: break
+        done += count
+        progress(f"{label}: {done:,} / {total:,}건 ({done * 100 // total}%)")
+
+# --------------------------------------------------------------------
+# 마이그레이션 단계 (번호는 한 번 배포되면 바꾸지 않고, 새 단계는 끝에 추가)
+# --------------------------------------------------------------------
+def m001_rename_legacy_columns(engine, progress):
+    with engine.begin() as conn:
+        for table, renames in LEGACY_COLUMNS.items():
+            if not has_table(conn, table): continue
+            model_columns = {c.name for c in Base.metadata.tables[table].columns}
+            for old in column_names(conn, table):
+                new = renames.get(old)
+                if new and has_column(conn, table, new): continue
+                # 대소문자만 다른 컬럼(Copies, UUID)은 SQLite에서 같은 컬럼이지만, 조회 결과의 이름은 선언된 대로 나오므로 함께 정리
+                new = new or (old.lower() if old != old.lower() and old.lower() in model_columns else None)
+                if new:
+                    conn.execute(sql(f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}"))
+                    progress(f"{table}.{old} → {new}")
+
+def m002_add_feature_columns(engine, progress):
+    with engine.begin() as conn:
+        for table, column, ddl in (
+            ("PrintLogs", "calculated_price", "INTEGER DEFAULT 0"),
+            ("PrintLogs", "remark", "VARCHAR DEFAULT ''"),
+            ("PrintLogs", "print_status", "VARCHAR DEFAULT '완료'"),
+            ("Users", "color_limit", "INTEGER"),
+            ("Users", "mono_limit", "INTEGER"),
+            ("PrintControlPolicy", "log_retention_days", "INTEGER DEFAULT 730"),
+            ("PrintLogs", "pricing_version", "INTEGER"),
+            ("PrintLogs", "duplex", "INTEGER DEFAULT 1"),
+            ("PricingPolicy", "color_multiplier", "INTEGER DEFAULT 1"),
+            ("PricingPolicy", "duplex_percent", "INTEGER DEFAULT 100"),
+            ("PrintControlPolicy", "quota_period", "VARCHAR DEFAULT 'job'"),
+            ("PrintControlPolicy", "over_quota_action", "VARCHAR DEFAULT 'approval'"),
+            ("PrintLogs", "job_key", "VARCHAR"),
+        ):
+            _add_column(conn, table, column, ddl)
+
+def m003_print_log_indexes(engine, progress):
+    with engine.begin() as conn:
+        conn.execute(sql('CREATE INDEX IF NOT EXISTS "ix_PrintLogs_log_time" ON PrintLogs (log_time)'))
+        conn.execute(sql('CREATE INDEX IF NOT EXISTS "ix_PrintLogs_uuid" ON PrintLogs (uuid)'))
+        conn.execute(sql('CREATE UNIQUE INDEX IF NOT EXISTS "ux_PrintLogs_job_key" ON PrintLogs (uuid, job_key)'))
+
+def m004_backfill_print_log_flags(engine, progress):
+    # 값이 비어 있던 구버전 로그를 기본값으로 채워, 조회 쪽에서 NULL/구버전 분기를 하지 않도록 함
+    _backfill(engine, progress, "인쇄 상태 기본값", "PrintLogs", "print_status = '완료'", "print_status IS NULL")
+    _backfill(engine, progress, "양면 여부 기본값", "PrintLogs", "duplex = 1", "duplex IS NULL")
+    _backfill(engine, progress, "비고 기본값", "PrintLogs", "remark = ''", "remark IS NULL")
+    _backfill(engine, progress, "과금액 기본값", "PrintLogs", "calculated_price = 0", "calculated_price IS NULL")
+
+def m005_cache_triggers(engine, progress):
+    with engine.begin() as conn:
+        install_triggers(conn)
+
+def _integer_log_times(conn) -> bool:
+    """로그 시각이 이미 epoch 밀리초 정수인지 (m014 이전 DB는 일시 문자열/타입)"""
+    if conn.dialect.name == "sqlite":
+        return conn.execute(sql("SELECT 1 FROM PrintLogs WHERE typeof(log_time) = 'text' LIMIT 1")).first() is None
+    return _column_is_integer(conn, "PrintLogs", "log_time")
+
+def m006_initial_ledger(engine, progress):
+    # 원장 도입 이전 DB라면 기존 로그로부터 한 번만 원장을 채움
+    db = SessionLocal()
+    try:
+        # 원장 기간 키는 정수 시각으로 계산하므로, 시각 변환(m014) 전인 DB는 m017 에서 채움
+        if not _integer_log_times(db.connection()):
+            db.commit()
+            return
+        if db.execute(sql("SELECT 1 FROM PrintLogs LIMIT 1")).first() and not db.execute(sql("SELECT 1 FROM UsageLedger LIMIT 1")).first():
+            ledger.rebuild(db)
+            progress("기존 인쇄 로그로부터 사용자/부서별 과금 원장을 생성했습니다.")
+        db.commit()
+    finally:
+        db.close()
+
+def m007_seed_defaults(engine, progress):
+    db = SessionLocal()
+    try:
+        if not db.query(PricingPolicy).first():
+            db.add(PricingPolicy(paper_size=9, base_mono_price=50, base_color_price=150, multiplier=1, color_multiplier=1))
+            db.add(PricingPolicy(paper_size=8, base_mono_price=50, base_color_price=150, multiplier=2, color_multiplier=2))
+        # 단가표에 없는 용지(Letter, B4 등)에 적용되는 기본 행
+        if not db.query(PricingPolicy).filter(PricingPolicy.paper_size == DEFAULT_PAPER_SIZE).first():
+            db.add(PricingPolicy(paper_size=DEFAULT_PAPER_SIZE, base_mono_price=50, base_color_price=150, multiplier=1, color_multiplier=1, duplex_percent=100))
+
+        if not db.query(PrintControlPolicy).first():
+            db.add(PrintControlPolicy(id=1, color_limit=999999, mono_limit=999999))
+
+        # 요금 정책 버전 도입 이전 DB라면 현재 정책을 최초 버전으로 등록 (과거 로그 전체에 적용되도록 시작 시각은 충분히 과거로)
+        db.flush()
+        if not db.query(PricingPolicyVersion).first():
+            db.add(PricingPolicyVersion(effective_from=timeutil.to_ms(datetime(2000, 1, 1)), rates_json=calculator.snapshot_rates(db)))
+        db.commit()
+    finally:
+        db.close()
+
+def m008_policy_cache_trigger(engine, progress):
+    # 통제 정책 캐시(policy) 항목 추가 - 기존 트리거는 그대로 두고 없는 것만 생성
+    with engine.begin() as conn:
+        install_triggers(conn)
+
+def m009_add_missing_model_columns(engine, progress):
+    # 초기 버전 PrintLogs 처럼 모델에는 있지만 DB에는 없는 컬럼(os_user 등)을 모두 추가 (기본 키 제외)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not has_table(conn, table.name): continue
+            for column in table.columns:
+                if column.primary_key or has_column(conn, table.name, column.name): continue
+                _add_column(conn, table.name, column.name, column.type.compile(dialect=engine.dialect))
+                progress(f"{table.name}.{column.name} 추가")
+
+# m010 이 만들던 첫 전문 검색 색인 (PrintLogs 의 이름 문자열 컬럼이 원본) - 배포된 단계이므로 정의를 고정해 둠
+_V1_SEARCH_VALUES = ("new.id, new.file_name, new.os_user, new.printer_name",
+                     "'delete', old.id, old.file_name, old.os_user, old.printer_name")
+_V1_SEARCH_TRIGGERS = {
+    "trg_fts_PrintLogs_insert": f"AFTER INSERT ON PrintLogs BEGIN INSERT INTO {search.FTS_TABLE}(rowid, file_name, os_user, printer_name) VALUES ({_V1_SEARCH_VALUES[0]}); END",
+    "trg_fts_PrintLogs_delete": f"AFTER DELETE ON PrintLogs BEGIN INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}, rowid, file_name, os_user, printer_name) VALUES ({_V1_SEARCH_VALUES[1]}); END",
+    "trg_fts_PrintLogs_update": (
+        f"AFTER UPDATE OF file_name, os_user, printer_name ON PrintLogs BEGIN "
+        f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}, rowid, file_name, os_user, printer_name) VALUES ({_V1_SEARCH_VALUES[1]}); "
+        f"INSERT INTO {search.FTS_TABLE}(rowid, file_name, os_user, printer_name) VALUES ({_V1_SEARCH_VALUES[0]}); END"
+    ),
+}
+
+def m010_print_log_search_index(engine, progress):
+    # 이름 문자열 컬럼이 없는 DB(이름 사전 도입 후 새로 만든 DB)는 색인을 m018 에서 뷰 기준으로 만듦
+    if engine.dialect.name != "sqlite": return
+    with engine.begin() as conn:
+        if not has_column(conn, "PrintLogs", "os_user") or not has_column(conn, "PrintLogs", "printer_name"): return
+        if not has_table(conn, search.FTS_TABLE):
+            try:
+                conn.exec_driver_sql(f"""
+                    CREATE VIRTUAL TABLE {search.FTS_TABLE} USING fts5(
+                        file_name, os_user, printer_name, content='PrintLogs', content_rowid='id', tokenize='trigram'
+                    )
+                """)
+            except OperationalError as e:
+                # FTS5/trigram 이 없는 SQLite 빌드 - 색인 없이 진행 (검색은 LIKE 로 처리)
+                progress(f"전문 검색 색인을 만들 수 없어 LIKE 검색으로 대체합니다. ({e.orig})")
+                return
+            try:
+                conn.exec_driver_sql(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES('rebuild')")
+            except Exception:
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {search.FTS_TABLE}")
+                raise
+        for name, body in _V1_SEARCH_TRIGGERS.items():
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        progress("문서명/사용자/프린터 전문 검색 색인을 만들었습니다.")
+
+def m011_log_query_indexes(engine, progress):
+    # 키셋 커서의 정렬값이 NULL 이면 다음 페이지를 찾을 수 없으므로 먼저 채움
+    _backfill(engine, progress, "페이지 수 기본값", "PrintLogs", "total_pages = 0", "total_pages IS NULL")
+    with engine.begin() as conn:
+        for index in Base.metadata.tables["PrintLogs"].indexes:
+            if index.name.startswith("ix_"):
+                columns = ", ".join(c.name for c in index.columns)
+                conn.execute(sql(f'CREATE INDEX IF NOT EXISTS "{index.name}" ON PrintLogs ({columns})'))
+        # (uuid, log_time) 색인이 대신하므로 단독 uuid 색인은 제거 (기록 시 색인 갱신 비용 절감)
+        conn.execute(sql('DROP INDEX IF EXISTS "ix_PrintLogs_uuid"'))
+    progress("필터별 조회 색인을 만들었습니다.")
+
+def m012_approval_queue(engine, progress):
+    # 승인 대기열 도입 - 새 컬럼 추가 후, 로그 상태(print_status)로만 표시되던 기존 승인 대기 건을 대기열로 옮김
+    m009_add_missing_model_columns(engine, progress)
+    with engine.begin() as conn:
+        # 쓰이지 않던 테이블이지만 같은 로그에 여러 줄이 있으면 고유 색인을 만들 수 없으므로 첫 줄만 남김
+        conn.execute(sql("DELETE FROM ApprovalRequests WHERE id NOT IN (SELECT MIN(id) FROM ApprovalRequests GROUP BY log_id)"))
+        conn.execute(sql('CREATE UNIQUE INDEX IF NOT EXISTS "ux_ApprovalRequests_log_id" ON ApprovalRequests (log_id)'))
+        conn.execute(sql('CREATE INDEX IF NOT EXISTS "ix_ApprovalRequests_status" ON ApprovalRequests (status, request_time)'))
+        moved = conn.execute(sql("""
+            INSERT INTO ApprovalRequests (log_id, request_time, status, uuid)
+            SELECT p.id, p.log_time, '대기중', p.uuid FROM PrintLogs p
+            WHERE p.print_status = '승인 대기' AND NOT EXISTS (SELECT 1 FROM ApprovalRequests a WHERE a.log_id = p.id)
+        """)).rowcount
+        install_triggers(conn)
+    if moved: progress(f"기존 승인 대기 {moved:,}건을 대기열에 등록했습니다.")
+
+def m013_user_limits_cache_trigger(engine, progress):
+    # 사용자별 예외 한도 캐시(user_limits) 항목 추가
+    with engine.begin() as conn:
+        install_triggers(conn)
+
+def _epoch_ms_sql(column: str) -> str:
+    """SQLite 일시 문자열(현지 시각) -> epoch 밀리초 (timeutil 과 같은 현지 시각 오프셋 사용)"""
+    return (f"(CAST(strftime('%s', {column}) AS INTEGER) * 1000 + CAST(substr(strftime('%f', {column}), 4) AS INTEGER)"
+            f" - {timeutil.LOCAL_OFFSET_MS})")
+
+def _column_is_integer(conn, table: str, column: str) -> bool:
+    for c in inspect(conn).get_columns(table):
+        if c["name"] == column: return isinstance(c["type"], Integer)
+    return True
+
+def _convert_archive_times(progress):
+    # 연도별 아카이브 파일도 운영 테이블과 같은 형식이어야 UNION ALL 조회의 기간 조건이 맞음
+    for path in sorted(glob.glob(retention.archive_path("*"))):
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            with conn:
+                count = conn.execute(f"UPDATE PrintLogs SET log_time = {_epoch_ms_sql('log_time')} WHERE typeof(log_time) = 'text'").rowcount
+        finally:
+            conn.close()
+        if count > 0: progress(f"{os.path.basename(path)}: {count:,}건 변환")
+
+def m014_integer_timestamps(engine, progress):
+    # 로그 시각 / 생존 신고 시각을 일시 문자열에서 epoch 밀리초 정수로 변환 (행·색인 크기 축소, 정수 비교)
+    if engine.dialect.name == "sqlite":
+        _backfill(engine, progress, "로그 시각 변환", "PrintLogs", f"log_time = {_epoch_ms_sql('log_time')}", "typeof(log_time) = 'text'")
+        with engine.begin() as conn:
+            conn.execute(sql(f"UPDATE Users SET last_heartbeat = {_epoch_ms_sql('last_heartbeat')} WHERE typeof(last_heartbeat) = 'text'"))
+        _convert_archive_times(progress)
+    else:
+        with engine.begin() as conn:
+            for table, column in (("PrintLogs", "log_time"), ("Users", "last_heartbeat")):
+                if _column_is_integer(conn, table, column): continue
+                conn.execute(sql(f"""
+                    ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT
+                    USING (EXTRACT(EPOCH FROM {column}) * 1000)::BIGINT - {timeutil.LOCAL_OFFSET_MS}
+                """))
+                progress(f"{table}.{column} 를 정수 시각으로 변경")
+
+def m015_name_dictionaries(engine, progress):
+    # 로그의 사용자/프린터 이름을 사전(OsUsers, Printers) id 로 바꾸고 문자열 컬럼은 제거 (조회는 PrintLogsView)
+    m009_add_missing_model_columns(engine, progress)
+    with engine.begin() as conn:
+        legacy = [c for c in ("os_user", "printer_name") if has_column(conn, "PrintLogs", c)]
+        # 전문 검색 색인은 문자열 컬럼을 원본으로 삼던 구조이므로 지우고 마지막에 뷰 기준으로 다시 만듦
+        search.drop_index(conn)
+        conn.execute(sql('DROP INDEX IF EXISTS "ix_PrintLogs_printer_time"'))
+        for column, table in (("os_user", "OsUsers"), ("printer_name", "Printers")):
+            if column not in legacy: continue
+            added = conn.execute(sql(f"""
+                INSERT INTO {table} (name)
+                SELECT DISTINCT {column} FROM PrintLogs
+                WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT name FROM {table})
+            """)).rowcount
+            progress(f"{table}: 이름 {added:,}개 등록")
+    if "os_user" in legacy:
+        _backfill(engine, progress, "사용자 id 변환", "PrintLogs",
+                  "os_user_id = (SELECT id FROM OsUsers WHERE name = PrintLogs.os_user)", "os_user_id IS NULL AND os_user IS NOT NULL")
+    if "printer_name" in legacy:
+        _backfill(engine, progress, "프린터 id 변환", "PrintLogs",
+                  "printer_id = (SELECT id FROM Printers WHERE name = PrintLogs.printer_name)", "printer_id IS NULL AND printer_name IS NOT NULL")
+    with engine.begin() as conn:
+        # 컬럼 제거 시 SQLite 는 테이블을 새로 써서 빈 공간 없이 작아짐 (DROP COLUMN 미지원 구버전은 값만 비움)
+        for column in legacy:
+            try:
+                with conn.begin_nested():
+                    conn.execute(sql(f"ALTER TABLE PrintLogs DROP COLUMN {column}"))
+            except Exception:
+                conn.execute(sql(f"UPDATE PrintLogs SET {column} = NULL"))
+            progress(f"PrintLogs.{column} 제거")
+        conn.execute(sql('CREATE INDEX IF NOT EXISTS "ix_PrintLogs_printer_time" ON PrintLogs (printer_id, log_time)'))
+        lookups.install_view(conn)
+        if search.install_index(conn, progress):
+            progress("문서명/사용자/프린터 전문 검색 색인을 만들었습니다.")
+    progress("이름 사전과 조회용 뷰(PrintLogsView)를 만들었습니다.")
+
+def m016_drop_usage_triggers(engine, progress):
+    # 원장 변경마다 버전을 올리던 트리거 제거 (수신마다 모든 워커의 한도 카운터가 비워지고 버전 한 줄에 쓰기가 몰림)
+    with engine.begin() as conn:
+        drop_obsolete_triggers(conn)
+        install_triggers(conn)
+
+def m017_ledger_after_integer_timestamps(engine, progress):
+    # 시각 변환 전이라 m006 에서 원장을 만들지 못한 DB 는 여기서 채움 (이미 원장이 있으면 건너뜀)
+    m006_initial_ledger(engine, progress)
+
+def _search_index_source(conn):
+    ddl = conn.execute(sql("SELECT sql FROM sqlite_master WHERE name = :name"), {"name": search.FTS_TABLE}).scalar()
+    return ddl and ddl.split("content='", 1)[-1].split("'", 1)[0]
+
+def _intern_archive_names(engine, progress):
+    # 아카이브의 로그도 운영 DB 사전(OsUsers, Printers)의 id 로 바꾸고 이름 문자열 컬럼은 제거
+    conn = sqlite3.connect(engine.url.database, timeout=30)
+    try:
+        for path in sorted(glob.glob(retention.archive_path("*"))):
+            conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            try:
+                columns = {row[1] for row in conn.execute("PRAGMA archive.table_info(PrintLogs)")}
+                legacy = [(c, i, t) for c, i, t in (("os_user", "os_user_id", "OsUsers"), ("printer_name", "printer_id", "Printers")) if c in columns]
+                if not legacy: continue
+                with conn:
+                    for column, id_column, table in legacy:
+                        if id_column not in columns:
+                            conn.execute(f"ALTER TABLE archive.PrintLogs ADD COLUMN {id_column} INTEGER")
+                        conn.execute(f"""
+                            INSERT INTO main.{table} (name)
+                            SELECT DISTINCT {column} FROM archive.PrintLogs
+                            WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT name FROM main.{table})
+                        """)
+                        conn.execute(f"""
+                            UPDATE archive.PrintLogs SET {id_column} = (SELECT id FROM main.{table} WHERE name = archive.PrintLogs.{column})
+                            WHERE {id_column} IS NULL AND {column} IS NOT NULL
+                        """)
+                for column, _, _ in legacy:
+                    try:
+                        with conn:
+                            conn.execute(f"ALTER TABLE archive.PrintLogs DROP COLUMN {column}")
+                    except sqlite3.OperationalError:
+                        with conn:
+                            conn.execute(f"UPDATE archive.PrintLogs SET {column} = NULL")
+                progress(f"{os.path.basename(path)}: 이름을 사전 id 로 변환")
+            finally:
+                conn.execute("DETACH DATABASE archive")
+    finally:
+        conn.close()
+
+def m018_search_index_on_view(engine, progress):
+    # m010 이 PrintLogs 기준으로 만든 색인이 남아 있으면 이름 사전 뷰(PrintLogsView) 기준으로 다시 만듦
+    if engine.dialect.name != "sqlite": return
+    with engine.begin() as conn:
+        source = _search_index_source(conn)
+        if source and source != lookups.VIEW:
+            search.drop_index(conn)
+        if source != lookups.VIEW and search.install_index(conn, progress):
+            progress("문서명/사용자/프린터 전문 검색 색인을 뷰 기준으로 다시 만들었습니다.")
+    _intern_archive_names(engine, progress)
+
+def m019_integer_approval_times(engine, progress):
+    # 승인 요청 시각도 로그 시각과 같은 epoch 밀리초로 (대기열 메모리 항목과 DB 에서 읽은 항목의 형식 통일)
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            count = conn.execute(sql(f"""
+                UPDATE ApprovalRequests SET request_time = {_epoch_ms_sql('request_time')} WHERE typeof(request_time) = 'text'
+            """)).rowcount
+            if count > 0: progress(f"{count:,}건 변환")
+        elif not _column_is_integer(conn, "ApprovalRequests", "request_time"):
+            conn.execute(sql(f"""
+                ALTER TABLE ApprovalRequests ALTER COLUMN request_time TYPE BIGINT
+                USING (EXTRACT(EPOCH FROM request_time) * 1000)::BIGINT - {timeutil.LOCAL_OFFSET_MS}
+            """))
+            progress("ApprovalRequests.request_time 를 정수 시각으로 변경")
+
+# 요금 정책 버전 / 결재 시각 (m014, m019 에서 빠졌던 나머지 일시 컬럼)
+POLICY_TIME_COLUMNS = [("PricingPolicyVersions", "effective_from"), ("PricingPolicyVersions", "created_at"), ("ApprovalRequests", "decided_at")]
+
+def m020_integer_policy_times(engine, progress):
+    # 요금 정책 적용 시각과 결재 시각도 epoch 밀리초로 (단가 버전 조회·과금 시점 비교를 정수로)
+    with engine.begin() as conn:
+        for table, column in POLICY_TIME_COLUMNS:
+            if engine.dialect.name == "sqlite":
+                count = conn.execute(sql(f"""
+                    UPDATE {table} SET {column} = {_epoch_ms_sql(column)} WHERE typeof({column}) = 'text'
+                """)).rowcount
+                if count > 0: progress(f"{table}.{column}: {count:,}건 변환")
+            elif not _column_is_integer(conn, table, column):
+                conn.execute(sql(f"""
+                    ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT
+                    USING (EXTRACT(EPOCH FROM {column}) * 1000)::BIGINT - {timeutil.LOCAL_OFFSET_MS}
+                """))
+                progress(f"{table}.{column} 를 정수 시각으로 변경")
+
+MIGRATIONS = [
+    (1, "구버전 컬럼명 변경", m001_rename_legacy_columns),
+    (2, "기능별 추가 컬럼", m002_add_feature_columns),
+    (3, "인쇄 로그 인덱스", m003_print_log_indexes),
+    (4, "인쇄 로그 기본값 채우기", m004_backfill_print_log_flags),
+    (5, "캐시 동기화 트리거", m005_cache_triggers),
+    (6, "과금 원장 최초 생성", m006_initial_ledger),
+    (7, "기본 단가/정책 등록", m007_seed_defaults),
+    (8, "통제 정책 캐시 트리거", m008_policy_cache_trigger),
+    (9, "누락 컬럼 보완", m009_add_missing_model_columns),
+    (10, "인쇄 로그 전문 검색 색인", m010_print_log_search_index),
+    (11, "로그 조회 색인", m011_log_query_indexes),
+    (12, "승인 대기열", m012_approval_queue),
+    (13, "예외 한도 캐시 트리거", m013_user_limits_cache_trigger),
+    (14, "정수 시각(epoch 밀리초) 변환", m014_integer_timestamps),
+    (15, "프린터/사용자 이름 사전", m015_name_dictionaries),
+    (16, "원장 캐시 트리거 제거", m016_drop_usage_triggers),
+    (17, "과금 원장 최초 생성 (정수 시각)", m017_ledger_after_integer_timestamps),
+    (18, "검색 색인 뷰 기준 재생성 / 아카이브 이름 사전 변환", m018_search_index_on_view),
+    (19, "승인 요청 시각 정수 변환", m019_integer_approval_times),
+    (20, "요금 정책 / 결재 시각 정수 변환", m020_integer_policy_times),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(engine) -> int:
+    with engine.connect() as conn:
+        if not has_table(conn, "schema_version"): return 0
+        return conn.execute(sql("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+def schema_fingerprint() -> str:
+    """모델 테이블/컬럼/인덱스, 마이그레이션 번호, 캐시 트리거 정의로 만든 지문 (코드가 바뀌지 않으면 항상 같음)"""
+    parts = [f"migrations:{LATEST_VERSION}", f"triggers:{sorted((t, repr(v)) for t, v in TOPICS.items())}"]
+    for name in sorted(Base.metadata.tables):
+        table = Base.metadata.tables[name]
+        parts.append(name + ":" + ",".join(f"{c.name} {c.type} {c.nullable} {c.primary_key}" for c in table.columns))
+        parts.extend(f"{name}.{i.name}:{','.join(c.name for c in i.columns)}:{i.unique}" for i in sorted(table.indexes, key=lambda i: i.name))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def stored_fingerprint(engine):
+    with engine.connect() as conn:
+        if not has_table(conn, "schema_meta"): return None
+        return conn.execute(sql("SELECT value FROM schema_meta WHERE name = 'fingerprint'")).scalar()
+
+def run(engine, progress=print) -> list:
+    """
+    테이블을 만들고 아직 적용되지 않은 마이그레이션을 순서대로 실행합니다.
+    각 단계가 끝날 때마다 버전을 기록하므로, 중간에 멈춰도 다음 기동 때 그 단계부터 이어서 진행합니다.
+    저장된 지문이 현재 코드의 지문과 같으면 아무 DDL도 실행하지 않습니다.
+    반환값: 이번에 적용한 버전 목록
+    """
+    fingerprint = schema_fingerprint()
+    if stored_fingerprint(engine) == fingerprint: return []
+
+    with engine.begin() as conn:
+        conn.execute(sql("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, description VARCHAR, applied_at VARCHAR)"))
+        conn.execute(sql("CREATE TABLE IF NOT EXISTS schema_meta (name VARCHAR PRIMARY KEY, value VARCHAR)"))
+    # 새로 추가된 테이블만 생성 (기존 테이블의 컬럼 변경은 아래 단계들이 담당)
+    Base.metadata.create_all(bind=engine)
+
+    version = current_version(engine)
+    applied = []
+    for number, description, step in [m for m in MIGRATIONS if m[0] > version]:
+        progress(f"[{number}/{LATEST_VERSION}] {description}")
+        step(engine, lambda message, d=description: progress(f"  {d} - {message}"))
+        with engine.begin() as conn:
+            conn.execute(
+                sql("INSERT INTO schema_version (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                {"version": number, "description": description, "applied_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            )
+        applied.append(number)
+
+    with engine.begin() as conn:
+        conn.execute(sql("DELETE FROM schema_meta WHERE name = 'fingerprint'"))
+        conn.execute(sql("INSERT INTO schema_meta (name, value) VALUES ('fingerprint', :value)"), {"value": fingerprint})
+    return applied
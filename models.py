@@ -1,20 +1,24 @@
 # Manager_Console/models.py
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Boolean, Index
 from sqlalchemy.orm import declarative_base, sessionmaker
-from datetime import datetime
+from sqlalchemy.pool import QueuePool
+from timeutil import now_ms
 
 # 🌟 [경로 수정 완료] UI(constants.py)와 완벽하게 동일한 경로 사용
-PROGRAM_DATA_DIR = r"C:\ProgramData\MyPrintMonitor"
+from constants import PROGRAM_DATA_DIR, DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
 if not os.path.exists(PROGRAM_DATA_DIR):
     os.makedirs(PROGRAM_DATA_DIR)
 
-DB_PATH = os.path.join(PROGRAM_DATA_DIR, "print_monitor.db")
-# SQLAlchemy 용 SQLite 절대경로 지정 포맷 (sqlite:///C:\...)
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
+# 🌟 [신규] SQLite 파일 / 서버 DB(PostgreSQL 등) 공통 커넥션 풀
+#  - pre_ping: 풀에서 꺼낼 때 끊긴 연결을 걸러냄 / recycle: 오래된 연결을 주기적으로 교체
+connect_args = {"check_same_thread": False, "timeout": 30} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args, poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=True
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -29,17 +33,17 @@ class User(Base):
     department = Column(String, default="미지정")
     role = Column(String, default="User")           
     use_popup = Column(Boolean, default=True)       
-    last_heartbeat = Column(DateTime, default=datetime.now)
+    last_heartbeat = Column(BigInteger, default=now_ms)  # epoch 밀리초 (timeutil)
     color_limit = Column(Integer, nullable=True) 
     mono_limit = Column(Integer, nullable=True)
 
 class PrintLog(Base):
     __tablename__ = "PrintLogs"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    log_time = Column(DateTime, default=datetime.now)
-    uuid = Column(String, index=True)
-    os_user = Column(String)
-    printer_name = Column(String)
+    log_time = Column(BigInteger, default=now_ms, index=True)  # epoch 밀리초 (timeutil)
+    uuid = Column(String)
+    os_user_id = Column(Integer)   # 🌟 [변경] OsUsers.id (이름 문자열은 사전 테이블에 한 번만 저장)
+    printer_id = Column(Integer)   # 🌟 [변경] Printers.id
     file_name = Column(String)
     total_pages = Column(Integer)
     color_mode = Column(Integer)  
@@ -48,6 +52,31 @@ class PrintLog(Base):
     calculated_price = Column(Integer, default=0) 
     remark = Column(String, default="")
     print_status = Column(String, default="완료") 
+    pricing_version = Column(Integer, nullable=True)  # 과금 당시 적용된 PricingPolicyVersions.id
+    duplex = Column(Integer, default=1)  # DEVMODE dmDuplex (1: 단면, 2/3: 양면)
+    job_key = Column(String, nullable=True)  # 에이전트가 보낸 중복 방지 키 (스풀러 작업 ID 등, 재전송 시 동일)
+
+    # 같은 에이전트(uuid)가 같은 작업 키로 두 번 기록되지 않도록 보장 (키가 없는 구버전 에이전트 로그는 NULL 이라 제약 없음)
+    # 🌟 [신규] 로그 조회 API(필터 + 시간순 키셋 페이지)용 복합 색인 - uuid 단독 조회도 (uuid, log_time) 색인이 담당
+    __table_args__ = (
+        Index("ux_PrintLogs_job_key", "uuid", "job_key", unique=True),
+        Index("ix_PrintLogs_uuid_time", "uuid", "log_time"),
+        Index("ix_PrintLogs_printer_time", "printer_id", "log_time"),
+        Index("ix_PrintLogs_status_time", "print_status", "log_time"),
+        Index("ix_PrintLogs_price", "calculated_price"),
+        Index("ix_PrintLogs_pages", "total_pages"),
+    )
+
+# 🌟 [신규] 이름 사전: 인쇄 로그의 프린터/OS 사용자 이름을 정수 id 로 바꿔 저장 (조회는 PrintLogsView, lookups.py 참고)
+class Printer(Base):
+    __tablename__ = "Printers"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+
+class OsUser(Base):
+    __tablename__ = "OsUsers"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
 
 class PricingPolicy(Base):
     __tablename__ = "PricingPolicy"
@@ -56,16 +85,66 @@ class PricingPolicy(Base):
     base_color_price = Column(Integer, default=150)
     multiplier = Column(Integer, default=1)        
     color_multiplier = Column(Integer, default=1)  
+    duplex_percent = Column(Integer, default=100)  # 양면 인쇄 시 단면 요금 대비 비율(%)
+
+class PricingPolicyVersion(Base):
+    # 🌟 [신규] 요금 정책 이력: 저장할 때마다 PricingPolicy 전체를 스냅샷으로 남김 (수정/삭제 없음)
+    __tablename__ = "PricingPolicyVersions"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    effective_from = Column(BigInteger, index=True)    # 이 시각(epoch 밀리초) 이후의 인쇄부터 적용
+    created_at = Column(BigInteger, default=now_ms)
+    rates_json = Column(String)                        # [{"paper_size": 9, "base_mono_price": 50, ...}, ...]
 
 class PrintControlPolicy(Base):
     __tablename__ = "PrintControlPolicy"
     id = Column(Integer, primary_key=True, default=1)
     color_limit = Column(Integer, default=999999)
     mono_limit = Column(Integer, default=999999)
+    log_retention_days = Column(Integer, default=730)  # 이 기간이 지난 로그는 연도별 아카이브로 이동
+    quota_period = Column(String, default="job")        # 한도 적용 단위: job(건당) / day(일 누적) / month(월 누적)
+    over_quota_action = Column(String, default="approval")  # 한도 초과 시: approval(승인 요청) / deny(차단)
+
+class UsageLedger(Base):
+    # 🌟 [신규] 사용자/부서별 기간 누적 사용량 (월: "2026-10", 일: "2026-10-19")
+    __tablename__ = "UsageLedger"
+    scope = Column(String, primary_key=True)   # "user" 또는 "dept"
+    key = Column(String, primary_key=True)     # uuid 또는 부서명
+    period = Column(String, primary_key=True)
+    mono_pages = Column(Integer, default=0)
+    color_pages = Column(Integer, default=0)
+    total_price = Column(Integer, default=0)
+    job_count = Column(Integer, default=0)
 
 class ApprovalRequest(Base):
+    # 🌟 [변경] 승인 대기열: 한도 초과로 "승인 대기" 상태가 된 로그마다 한 줄 (결재 후에도 이력으로 남김)
     __tablename__ = "ApprovalRequests"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     log_id = Column(Integer) 
-    request_time = Column(DateTime, default=datetime.now)
-    status = Column(String, default="대기중")
\ No newline at end of file
+    request_time = Column(BigInteger, default=now_ms)   # epoch 밀리초 (timeutil) - 로그 시각과 같은 형식
+    status = Column(String, default="대기중")   # 대기중 / 승인 / 반려
+    uuid = Column(String)
+    decided_at = Column(BigInteger)   # epoch 밀리초 (timeutil)
+    reason = Column(String)
+
+    __table_args__ = (
+        Index("ux_ApprovalRequests_log_id", "log_id", unique=True),
+        Index("ix_ApprovalRequests_status", "status", "request_time"),
+    )
+
+class PrintLogEvent(Base):
+    # 🌟 [신규] 인쇄 로그 변경 이력: 관리자의 결재/상태 변경/단가 조정/삭제마다 한 줄 (비고에 사유를 덧붙이지 않음)
+    __tablename__ = "PrintLogEvents"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    log_id = Column(Integer, nullable=False)
+    event_time = Column(BigInteger, default=now_ms)  # epoch 밀리초 (timeutil)
+    actor = Column(String)                           # 처리한 관리자 (콘솔 PC 의 Windows 계정 등)
+    action = Column(String)                          # audit.ACTIONS
+    old_status = Column(String)
+    new_status = Column(String)
+    old_price = Column(Integer)
+    new_price = Column(Integer)
+    reason = Column(String)
+
+    __table_args__ = (
+        Index("ix_PrintLogEvents_log_id", "log_id", "id"),
+    )
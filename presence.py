@@ -0,0 +1,152 @@
+# Manager_Console/presence.py
+import threading
+import time
+from sqlalchemy import update, bindparam
+from models import SessionLocal, User
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 에이전트 접속 현황 레지스트리 (메모리)
+#  - UUID -> 작은 레코드(__slots__)로, 마지막 생존 신고 시각을 단조 시계(monotonic) 값으로 보관합니다.
+#  - 생존 신고는 레코드 시각만 바꾸고(O(1)), DB의 last_heartbeat 는 FLUSH_SEC 마다 모아서 한 번에 기록합니다.
+#  - 다중 워커 모드에서는 다른 워커가 기록한 최신 신고 시각을 같은 주기로 DB에서 읽어 합칩니다.
+# ====================================================================
+ONLINE_SEC = 300   # 이 시간 안에 신고가 있으면 온라인 (콘솔 기존 기준: 5분)
+FLUSH_SEC = 5.0
+
+class AgentRecord:
+    __slots__ = ("uuid", "last_seen", "dirty")
+
+    def __init__(self, uuid: str, last_seen: float = None):
+        self.uuid = uuid
+        self.last_seen = last_seen  # time.monotonic() 기준 (신고 이력 없으면 None)
+        self.dirty = False          # DB에 아직 기록하지 않은 신고가 있음
+
+# 벽시계 시각은 DB 와 같은 epoch 밀리초(정수)로 다룸
+def _to_monotonic(when_ms: int, now_mono: float, now_wall: int) -> float:
+    return now_mono - (now_wall - when_ms) / 1000
+
+def _to_wall(last_seen: float, now_mono: float, now_wall: int) -> int:
+    return now_wall - round((now_mono - last_seen) * 1000)
+
+class AgentRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents = {}       # uuid -> AgentRecord
+        self._synced_at = None  # 마지막으로 DB에서 읽어온 신고 시각의 최댓값
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._agents)
+
+    def load(self, db):
+        """서버 기동 시 Users 전체를 한 번 읽어 레지스트리를 채웁니다."""
+        now_mono, now_wall = time.monotonic(), timeutil.now_ms()
+        agents = {}
+        for uuid, last_heartbeat in db.query(User.uuid, User.last_heartbeat).all():
+            agents[uuid] = AgentRecord(uuid, _to_monotonic(last_heartbeat, now_mono, now_wall) if last_heartbeat else None)
+        with self._lock:
+            self._agents = agents
+            self._synced_at = now_wall
+
+    def touch(self, uuid: str) -> bool:
+        """등록된 에이전트면 신고 시각을 갱신하고 True, 처음 보는 UUID면 False (호출 측이 Users 에 등록)"""
+        with self._lock:
+            record = self._agents.get(uuid)
+            if record is None: return False
+            record.last_seen = time.monotonic()
+            record.dirty = True
+            return True
+
+    def register(self, uuid: str):
+        """Users 에 새로 등록(또는 DB에서 확인)된 에이전트를 추가합니다. 신고 시각은 이미 DB에 기록된 상태"""
+        with self._lock:
+            self._agents[uuid] = AgentRecord(uuid, time.monotonic())
+
+    def flush(self, db) -> int:
+        """아직 DB에 기록하지 않은 신고 시각을 한 번의 일괄 UPDATE 로 기록합니다."""
+        now_mono, now_wall = time.monotonic(), timeutil.now_ms()
+        with self._lock:
+            pending = [r for r in self._agents.values() if r.dirty]
+            params = [{"b_uuid": r.uuid, "b_seen": _to_wall(r.last_seen, now_mono, now_wall)} for r in pending]
+            for r in pending: r.dirty = False
+        if not params: return 0
+        users = User.__table__
+        try:
+            updated = db.execute(
+                update(users).where(users.c.uuid == bindparam("b_uuid")).values(last_heartbeat=bindparam("b_seen")), params
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for r in pending: r.dirty = True
+            raise
+        if updated < len(params):
+            # 콘솔 등에서 Users 행이 삭제된 에이전트는 잊어서, 다음 신고 때 다시 등록되도록 함
+            existing = {uuid for (uuid,) in db.query(User.uuid).filter(User.uuid.in_([r.uuid for r in pending])).all()}
+            with self._lock:
+                for r in pending:
+                    if r.uuid not in existing: self._agents.pop(r.uuid, None)
+        return len(params)
+
+    def sync(self, db):
+        """다른 워커(프로세스)가 기록한 신고 시각 중 지난 확인 이후 바뀐 것만 읽어 합칩니다."""
+        since = self._synced_at
+        query = db.query(User.uuid, User.last_heartbeat).filter(User.last_heartbeat.isnot(None))
+        if since: query = query.filter(User.last_heartbeat > since)
+        rows = query.all()
+        if not rows: return
+        now_mono, now_wall = time.monotonic(), timeutil.now_ms()
+        with self._lock:
+            for uuid, last_heartbeat in rows:
+                seen = _to_monotonic(last_heartbeat, now_mono, now_wall)
+                record = self._agents.get(uuid)
+                if record is None:
+                    self._agents[uuid] = AgentRecord(uuid, seen)
+                elif record.last_seen is None or seen > record.last_seen:
+                    record.last_seen = seen
+            latest = max(hb for _, hb in rows)
+            self._synced_at = max(since, latest) if since else latest
+
+    def snapshot(self, limit: int = None, online_sec: int = ONLINE_SEC) -> dict:
+        """온라인/오프라인 수와 최근 신고 순 목록 [(uuid, 경과 초 또는 None)]"""
+        now = time.monotonic()
+        with self._lock:
+            seen = [(r.uuid, now - r.last_seen) for r in self._agents.values() if r.last_seen is not None]
+            never = [r.uuid for r in self._agents.values() if r.last_seen is None]
+        seen.sort(key=lambda item: item[1])
+        online = sum(1 for _, ago in seen if ago < online_sec)
+        recent = seen + [(uuid, None) for uuid in never]
+        return {
+            "online_sec": online_sec, "total": len(recent), "online": online, "offline": len(recent) - online,
+            "agents": recent[:limit] if limit else recent,
+        }
+
+    def _run(self, logger):
+        while not self._stop.wait(FLUSH_SEC):
+            self.flush_and_sync(logger)
+
+    def flush_and_sync(self, logger):
+        db = SessionLocal()
+        try:
+            self.flush(db)
+            self.sync(db)
+        except Exception as e:
+            logger.error(f"💓 [접속 현황 기록 오류] {e}")
+        finally:
+            db.close()
+
+    def start(self, logger):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(logger,), name="PresenceFlush", daemon=True)
+        self._thread.start()
+
+    def stop(self, logger):
+        """종료 시 남은 신고 시각을 기록합니다."""
+        self._stop.set()
+        self.flush_and_sync(logger)
+
+registry = AgentRegistry()
@@ -0,0 +1,101 @@
+# Manager_Console/profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# ====================================================================
+# 🌟 [신규] 무중단 성능 진단용 샘플링 프로파일러
+#  - 서버 재시작 없이 N초 동안만 켜지고, 끝나면 자동으로 꺼집니다.
+#  - 결과는 collapsed-stack 형식(flamegraph.pl / speedscope 호환)으로 LOG_DIR에 저장됩니다.
+# ====================================================================
+
+# 현재 처리 중인 API 경로 (미들웨어가 설정, 스레드풀로도 자동 전파됨)
+current_route: ContextVar[str] = ContextVar("current_route", default="-")
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.active = False
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._spans = {}  # "경로 › 구간명" -> [호출 수, 누적 초, 최대 초]
+
+    def start(self, seconds: int, out_dir: str) -> bool:
+        """프로파일링을 시작합니다. 이미 실행 중이면 False를 반환합니다."""
+        with self._lock:
+            if self.active: return False
+            self.active = True
+
+        worker = threading.Thread(target=self._run, args=(seconds, out_dir), name="SamplingProfiler", daemon=True)
+        worker.start()
+        return True
+
+    def record_span(self, name: str, elapsed: float):
+        key = f"{current_route.get()} › {name}"
+        with self._lock:
+            stat = self._spans.get(key)
+            if stat is None:
+                self._spans[key] = [1, elapsed, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]: stat[2] = elapsed
+
+    def _run(self, seconds: int, out_dir: str):
+        my_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == my_id: continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self._stacks[";".join(reversed(stack))] += 1
+                time.sleep(self.interval)
+        finally:
+            with self._lock:
+                self.active = False
+                stacks, spans = self._stacks, self._spans
+                self._stacks, self._spans = Counter(), {}
+            self._dump(out_dir, stacks, spans)
+
+    def _dump(self, out_dir: str, stacks: Counter, spans: dict):
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        with open(os.path.join(out_dir, f"profile_{stamp}.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        # 구간별 소요 시간 요약 (누적 시간이 큰 순서)
+        with open(os.path.join(out_dir, f"profile_{stamp}_spans.txt"), "w", encoding="utf-8") as f:
+            f.write(f"{'구간':<60} {'호출 수':>8} {'누적(ms)':>12} {'평균(ms)':>10} {'최대(ms)':>10}\n")
+            for key, (count, total, peak) in sorted(spans.items(), key=lambda kv: kv[1][1], reverse=True):
+                f.write(f"{key:<60} {count:>8} {total * 1000:>12.1f} {total / count * 1000:>10.2f} {peak * 1000:>10.2f}\n")
+
+
+profiler = SamplingProfiler()
+
+
+@contextmanager
+def span(name: str):
+    """프로파일링 중일 때만 구간 소요 시간을 기록합니다. 평상시에는 플래그 확인 한 번의 비용만 듭니다."""
+    if not profiler.active:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_span(name, time.perf_counter() - started)
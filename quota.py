@@ -0,0 +1,155 @@
+# Manager_Console/quota.py
+import threading
+import time
+import hashlib
+from datetime import datetime
+from models import UsageLedger, PrintControlPolicy, User
+from database import sql, IS_POSTGRES
+
+# ====================================================================
+# 🌟 [신규] 서버 측 인쇄 한도 판정 (점검 + 예약을 한 번에)
+#  - 사용자별 기간 사용량을 메모리 카운터로 들고 있으며, 최초 조회 시 과금 원장(UsageLedger)에서 채웁니다.
+#  - 원장은 인쇄 수신 트랜잭션에서 이미 영구 저장되므로, 카운터는 RESYNC_SEC 마다 원장 값으로 다시 맞춥니다.
+#  - 여러 워커 프로세스로 실행 중이면(shared) 메모리 카운터는 워커마다 따로이므로 쓰지 않고,
+#    판정할 때마다 원장 행을 잠그고 읽습니다. 잠금은 로그 기록이 커밋될 때까지 유지되므로
+#    다른 워커의 같은 사용자 판정은 그동안 기다렸다가 늘어난 사용량으로 판정합니다. (워커 수만큼 한도를 넘지 않음)
+# ====================================================================
+UNLIMITED = 999999
+RESYNC_SEC = 60
+
+ALLOW, DENY, NEEDS_APPROVAL = "allow", "deny", "needs_approval"
+QUOTA_PERIODS = ("job", "day", "month")     # 건당 / 일 누적 / 월 누적
+OVER_QUOTA_ACTIONS = ("approval", "deny")   # 한도 초과 시 관리자 승인 요청 / 즉시 차단
+
+def period_key(period: str, when: datetime = None) -> str:
+    when = when or datetime.now()
+    return when.strftime("%Y-%m-%d") if period == "day" else when.strftime("%Y-%m")
+
+class UsageCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage = {}  # (uuid, 기간 키) -> [흑백 페이지, 컬러 페이지, 원장에서 읽어온 시각]
+        self.shared = False  # 여러 워커 프로세스가 같은 원장으로 판정하는지 (서버가 기동 방식에 따라 설정)
+
+    def _load(self, db, uuid: str, key: str) -> list:
+        entry = self._usage.get((uuid, key))
+        if entry is None or time.monotonic() - entry[2] > RESYNC_SEC:
+            row = db.query(UsageLedger).filter(
+                UsageLedger.scope == "user", UsageLedger.key == uuid, UsageLedger.period == key
+            ).first()
+            entry = [row.mono_pages if row else 0, row.color_pages if row else 0, time.monotonic()]
+            self._usage[(uuid, key)] = entry
+        return entry
+
+    def _locked_usage(self, db, uuid: str, key: str) -> tuple:
+        """
+        원장 행을 (없으면 0 으로 만들어) 호출 측 트랜잭션 안에서 잠그고 (흑백, 컬러) 사용량을 읽습니다.
+        SQLite 는 INSERT 가 DB 쓰기 잠금을, PostgreSQL 은 FOR UPDATE 가 행 잠금을 커밋/롤백까지 잡아 둡니다.
+        """
+        params = {"key": uuid, "period": key}
+        db.execute(sql("""
+            INSERT INTO UsageLedger (scope, key, period, mono_pages, color_pages, total_price, job_count)
+            VALUES ('user', :key, :period, 0, 0, 0, 0)
+            ON CONFLICT (scope, key, period) DO NOTHING
+        """), params)
+        row = db.execute(sql(f"""
+            SELECT mono_pages, color_pages FROM UsageLedger
+            WHERE scope = 'user' AND key = :key AND period = :period{" FOR UPDATE" if IS_POSTGRES else ""}
+        """), params).first()
+        return row[0] or 0, row[1] or 0
+
+    def reserve(self, db, uuid: str, period: str, is_color: bool, pages: int, limit: int):
+        """
+        한도 안이면 사용량을 즉시 예약(증가)하고 (True, 예약 전 사용량)을 반환합니다.
+        같은 사용자의 동시 요청이 함께 한도를 넘지 않도록 점검과 예약을 한 잠금 안에서 처리합니다.
+        shared 이면 원장 행 잠금이 예약을 대신하므로, 호출 측은 같은 트랜잭션에서 로그 기록까지 커밋해야 합니다.
+        """
+        idx = 1 if is_color else 0
+        if period == "job":
+            return pages <= limit, 0
+        key = period_key(period)
+        if self.shared:
+            used = self._locked_usage(db, uuid, key)[idx]
+            return limit >= UNLIMITED or used + pages <= limit, used
+        with self._lock:
+            entry = self._load(db, uuid, key)
+            used = entry[idx]
+            if limit < UNLIMITED and used + pages > limit:
+                return False, used
+            entry[idx] += pages
+            return True, used
+
+    def release(self, uuid: str, period: str, is_color: bool, pages: int):
+        """예약 후 기록에 실패했을 때 예약분을 되돌립니다."""
+        if period == "job": return
+        with self._lock:
+            entry = self._usage.get((uuid, period_key(period)))
+            if entry: entry[1 if is_color else 0] -= pages
+
+    def invalidate(self, uuid: str):
+        """반려·환불 등으로 원장이 바뀐 사용자는 다음 판정 때 원장에서 다시 읽도록 비웁니다."""
+        with self._lock:
+            for k in [k for k in self._usage if k[0] == uuid]:
+                del self._usage[k]
+
+    def clear(self):
+        """다른 워커 프로세스가 원장을 바꿨을 때 모든 사용자를 원장에서 다시 읽도록 비웁니다."""
+        with self._lock:
+            self._usage.clear()
+
+counters = UsageCounters()
+
+class GlobalPolicy:
+    """전사 공통 통제 정책(PrintControlPolicy id=1) 캐시. 콘솔에서 정책을 저장하면 캐시 동기화(policy)로 비워집니다."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._policy = None
+
+    def get(self, db) -> dict:
+        policy = self._policy
+        if policy is None:
+            with self._lock:
+                row = db.query(PrintControlPolicy).filter(PrintControlPolicy.id == 1).first()
+                policy = self._policy = {
+                    "color_limit": row.color_limit if row else UNLIMITED,
+                    "mono_limit": row.mono_limit if row else UNLIMITED,
+                    "quota_period": row.quota_period if row and row.quota_period in QUOTA_PERIODS else "job",
+                    "over_quota_action": row.over_quota_action if row and row.over_quota_action in OVER_QUOTA_ACTIONS else "approval",
+                }
+        return policy
+
+    def clear(self):
+        self._policy = None
+
+global_policy = GlobalPolicy()
+
+class UserLimits:
+    """
+    사용자별 예외 한도 캐시 (uuid -> (컬러 한도, 흑백 한도)). 예외가 지정된 사용자만 한 번에 읽어 둡니다.
+    콘솔에서 예외 한도를 바꾸면 캐시 동기화(user_limits)로 비워집니다.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limits = None
+
+    def get(self, db, uuid: str):
+        limits = self._limits
+        if limits is None:
+            with self._lock:
+                if self._limits is None:
+                    rows = db.query(User.uuid, User.color_limit, User.mono_limit).filter(
+                        (User.color_limit.isnot(None)) | (User.mono_limit.isnot(None))
+                    ).all()
+                    self._limits = {uuid: (color, mono) for uuid, color, mono in rows}
+                limits = self._limits
+        return limits.get(uuid, (None, None))
+
+    def clear(self):
+        self._limits = None
+
+user_limits = UserLimits()
+
+def policy_version(policy: dict) -> str:
+    """에이전트가 받은 정책과 현재 정책이 같은지 비교하기 위한 짧은 지문"""
+    text = "|".join(f"{k}={policy[k]}" for k in sorted(policy))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
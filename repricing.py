@@ -0,0 +1,137 @@
+# Manager_Console/repricing.py
+from database import sql
+import calculator
+import ledger
+import timeutil
+from constants import DEFAULT_PAPER_SIZE
+
+# ====================================================================
+# 🌟 [신규] 기간 일괄 요금 재계산 엔진
+#  - 요금 정책 버전마다 단가표를 CASE 식으로 만들어, 버전 적용 구간별로 한 번의 집합 연산 SQL로 재계산합니다.
+#  - 각 로그는 인쇄 시점에 유효했던 버전으로 계산되고, 그 버전 ID가 함께 기록됩니다.
+#  - 미리보기(dry-run)는 부서별 변경 전/후 합계만 보여 주고 아무것도 바꾸지 않습니다.
+# ====================================================================
+
+# 관리자가 수동으로 금액을 정한 로그는 재계산 대상에서 제외
+MANUALLY_ADJUSTED_STATUSES = ("환불/조정됨", "단가 조정됨")
+
+def unit_price_sql(matrix: dict, alias: str = "p.") -> str:
+    """단가표를 SQL CASE 식으로 변환 (미등록 용지는 calculator와 동일하게 기본 행(0) -> 하드코딩 안전망 순서로 처리)"""
+    default = matrix.get(DEFAULT_PAPER_SIZE)
+    if default:
+        fallback = f"(CASE WHEN {alias}color_mode = 2 THEN {int(default[1])} ELSE {int(default[0])} END)"
+    else:
+        fallback = (
+            f"(CASE WHEN {alias}color_mode = 2 THEN {calculator.FALLBACK_COLOR_PRICE} ELSE {calculator.FALLBACK_MONO_PRICE} END)"
+            f" * (CASE WHEN {alias}paper_size = 8 THEN 2 ELSE 1 END)"
+        )
+    branches = " ".join(
+        f"WHEN {alias}paper_size = {int(size)} THEN (CASE WHEN {alias}color_mode = 2 THEN {int(color)} ELSE {int(mono)} END)"
+        for size, (mono, color, _) in matrix.items() if size != DEFAULT_PAPER_SIZE
+    )
+    return f"(CASE {branches} ELSE {fallback} END)" if branches else fallback
+
+def duplex_percent_sql(matrix: dict, alias: str = "p.") -> str:
+    """양면 인쇄(dmDuplex 2/3)인 로그에 적용할 비율(%) CASE 식"""
+    default = matrix.get(DEFAULT_PAPER_SIZE)
+    fallback = int(default[2]) if default else 100
+    branches = " ".join(
+        f"WHEN {alias}paper_size = {int(size)} THEN {int(pct)}"
+        for size, (_, _, pct) in matrix.items() if size != DEFAULT_PAPER_SIZE and pct != fallback
+    )
+    percent = f"(CASE {branches} ELSE {fallback} END)" if branches else str(fallback)
+    return f"(CASE WHEN COALESCE({alias}duplex, 1) > 1 THEN {percent} ELSE 100 END)"
+
+def new_price_sql(matrix: dict, alias: str = "p.") -> str:
+    # 정수 나눗셈으로 calculator.price_job 의 (금액 * 비율 // 100)과 동일한 결과를 냄
+    return (
+        f"({unit_price_sql(matrix, alias)} * COALESCE({alias}total_pages, 0) * COALESCE({alias}copies, 1)"
+        f" * {duplex_percent_sql(matrix, alias)} / 100)"
+    )
+
+def _range_filter(alias: str = "p.") -> str:
+    excluded = ", ".join(f"'{s}'" for s in MANUALLY_ADJUSTED_STATUSES)
+    return f"{alias}log_time >= :start AND {alias}log_time < :end AND COALESCE({alias}print_status, '완료') NOT IN ({excluded})"
+
+def _version_ranges(db, start: int, end: int):
+    """조회 기간을 요금 정책 버전 적용 구간으로 나눕니다. [(구간 시작, 구간 끝, 버전 ID, 단가표)]"""
+    calculator.price_book.reload(db)
+    intervals = calculator.price_book.intervals()
+    if not intervals:
+        return [(start, end, None, {})]
+
+    ranges = []
+    for i, (v_start, v_end, version_id, matrix) in enumerate(intervals):
+        # 첫 버전 이전의 로그는 첫 버전으로 계산 (calculator.price_book.resolve 와 동일한 규칙)
+        lo = start if i == 0 else max(start, v_start)
+        hi = end if v_end is None else min(end, v_end)
+        if lo < hi:
+            ranges.append((lo, hi, version_id, matrix))
+    return ranges
+
+def _billable_sql(alias: str = "p.") -> str:
+    # 원장·청구와 같은 기준 (반려/과금취소 로그는 금액이 바뀌어도 청구액에 영향 없음)
+    excluded = ", ".join(f"'{s}'" for s in ledger.NON_BILLABLE_STATUSES)
+    return f"COALESCE({alias}print_status, '완료') NOT IN ({excluded})"
+
+def preview(db, start: int, end: int) -> list:
+    """
+    부서별 (대상 건수, 변경될 건수, 그중 과금 제외 건수, 기존 합계, 재계산 합계) 미리보기
+    합계와 차액은 과금 대상 로그만 더하므로 적용 후 원장·청구액이 바뀌는 만큼과 같습니다.
+    """
+    merged = {}
+    for lo, hi, version_id, matrix in _version_ranges(db, start, end):
+        new_price = new_price_sql(matrix)
+        changes = f"COALESCE(p.calculated_price, 0) != {new_price}"
+        billable = _billable_sql()
+        rows = db.execute(sql(f"""
+            SELECT COALESCE(NULLIF(u.department, ''), '미배정') AS department,
+                   COUNT(*),
+                   SUM(CASE WHEN {changes} THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN {changes} AND NOT {billable} THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN {billable} THEN COALESCE(p.calculated_price, 0) ELSE 0 END),
+                   SUM(CASE WHEN {billable} THEN {new_price} ELSE 0 END)
+            FROM PrintLogs p LEFT JOIN Users u ON p.uuid = u.uuid
+            WHERE {_range_filter()}
+            GROUP BY 1
+        """), {"start": lo, "end": hi}).fetchall()
+        for dept, total, changed, non_billable, old, new in rows:
+            acc = merged.setdefault(dept, {"department": dept, "rows": 0, "changed": 0, "non_billable": 0, "old_total": 0, "new_total": 0})
+            acc["rows"] += total; acc["changed"] += changed or 0; acc["non_billable"] += non_billable or 0
+            acc["old_total"] += old or 0; acc["new_total"] += new or 0
+
+    for acc in merged.values():
+        acc["delta"] = acc["new_total"] - acc["old_total"]
+    return [merged[k] for k in sorted(merged)]
+
+def _ledger_deltas(db, lo: int, hi: int, matrix: dict) -> list:
+    """재계산으로 바뀔 금액을 (uuid, 부서, 일 번호) 단위로 미리 합산 (과금 대상 로그만, ledger.apply 와 같은 부서 규칙)"""
+    new_price = new_price_sql(matrix)
+    return db.execute(sql(f"""
+        SELECT p.uuid, COALESCE(NULLIF(u.department, ''), '미배정'), {timeutil.day_expr('p.log_time')},
+               SUM({new_price} - COALESCE(p.calculated_price, 0))
+        FROM PrintLogs p LEFT JOIN Users u ON p.uuid = u.uuid
+        WHERE {_range_filter()} AND {_billable_sql()}
+          AND COALESCE(p.calculated_price, 0) != {new_price}
+        GROUP BY 1, 2, 3
+    """), {"start": lo, "end": hi}).all()
+
+def apply(db, start: int, end: int) -> int:
+    """
+    기간 내 로그 금액을 일괄 갱신하고, 바뀐 금액만큼 해당 기간의 원장을 증감합니다.
+    변경된 행 수를 반환하며, 커밋은 호출한 쪽에서 합니다.
+    """
+    updated = 0
+    for lo, hi, version_id, matrix in _version_ranges(db, start, end):
+        # 원장 증감분은 금액을 바꾸기 전에 집계
+        deltas = _ledger_deltas(db, lo, hi, matrix)
+        # UPDATE 문에는 테이블 별칭을 쓸 수 없으므로 접두어 없이 생성
+        new_price = new_price_sql(matrix, alias="")
+        result = db.execute(sql(f"""
+            UPDATE PrintLogs SET calculated_price = {new_price}, pricing_version = :version_id
+            WHERE {_range_filter(alias="")}
+              AND (COALESCE(calculated_price, 0) != {new_price} OR pricing_version IS NULL OR pricing_version != :version_id)
+        """), {"start": lo, "end": hi, "version_id": version_id})
+        updated += result.rowcount
+        ledger.apply_price_deltas(db, deltas)
+    return updated
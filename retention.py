@@ -0,0 +1,129 @@
+# Manager_Console/retention.py
+import os
+import sqlite3
+from constants import PROGRAM_DATA_DIR
+from models import engine
+from cache_sync import trigger_name
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 보관(아카이브) 정책
+#  - 보관 기간이 지난 PrintLogs 행을 연도별 아카이브 DB 파일로 이동하여 운영 테이블을 작게 유지합니다.
+#  - 과거 기간 통계는 필요할 때만 ATTACH 하여 운영 테이블과 UNION ALL로 조회합니다.
+#  - 아카이브 행의 사용자/프린터는 운영 DB 이름 사전(OsUsers, Printers)의 id 로 저장됩니다. (사전 항목은 지워지지 않음)
+#    아카이브 조회에서 이름이 필요하면 운영 DB 의 사전과 JOIN 합니다.
+#  - ATTACH 를 쓰는 SQLite 전용 기능입니다. 서버 DB(PostgreSQL 등)는 DB 자체의 파티션/백업 정책으로 관리합니다.
+# ====================================================================
+ARCHIVE_DIR = os.path.join(PROGRAM_DATA_DIR, "archive")
+DEFAULT_RETENTION_DAYS = 730
+MAX_ATTACHED_ARCHIVES = 8  # SQLite 기본 ATTACH 한도(10) 안에서 여유를 둠
+JOB_KEYS_TRIGGER = trigger_name("job_keys", "PrintLogs", "DELETE")
+
+def archive_path(year) -> str:
+    return os.path.join(ARCHIVE_DIR, f"print_logs_{year}.db")
+
+def _columns(conn, schema: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(PrintLogs)")]
+
+def _prepare_archive(conn, schema: str):
+    """아카이브 DB에 PrintLogs 테이블을 만들고, 운영 DB에 새로 생긴 컬럼이 있으면 따라서 추가합니다."""
+    if not _columns(conn, schema):
+        ddl = conn.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name='PrintLogs'").fetchone()[0]
+        conn.execute(ddl.replace("CREATE TABLE ", f"CREATE TABLE {schema}.", 1))
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.ix_PrintLogs_log_time ON PrintLogs (log_time)")
+        return
+
+    archived = set(_columns(conn, schema))
+    for row in conn.execute("PRAGMA main.table_info(PrintLogs)").fetchall():
+        name, col_type = row[1], row[2]
+        if name not in archived:
+            conn.execute(f"ALTER TABLE {schema}.PrintLogs ADD COLUMN {name} {col_type}")
+
+def archive_old_logs(retention_days: int = DEFAULT_RETENTION_DAYS, batch_size: int = 5000, db_path: str = None) -> dict:
+    """
+    보관 기간이 지난 로그를 연도별 아카이브 파일로 옮깁니다.
+    배치 단위로 커밋하므로, 오래 쌓인 DB를 처음 정리할 때도 에이전트 수신을 오래 막지 않습니다.
+    반환값: {연도: 이동한 행 수}
+    """
+    cutoff = timeutil.day_start_ms(timeutil.day_number(timeutil.now_ms()) - retention_days)
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    moved = {}
+
+    conn = sqlite3.connect(db_path or engine.url.database, timeout=30)
+    try:
+        # 가장 오래된 로그부터 기준일까지의 연도 중 로그가 있는 연도 (연 경계는 정수 시각으로 계산, log_time 색인으로 확인)
+        oldest = conn.execute("SELECT MIN(log_time) FROM PrintLogs WHERE log_time < ?", (cutoff,)).fetchone()[0]
+        years = [
+            y for y in (range(timeutil.year_of(oldest), timeutil.year_of(cutoff - 1) + 1) if oldest is not None else [])
+            if conn.execute("SELECT 1 FROM PrintLogs WHERE log_time >= ? AND log_time < ? LIMIT 1",
+                            (timeutil.year_start_ms(y), timeutil.year_start_ms(y + 1))).fetchone()
+        ]
+
+        for year in years:
+            conn.execute("ATTACH DATABASE ? AS archive", (archive_path(year),))
+            try:
+                _prepare_archive(conn, "archive")
+                cols = ", ".join(_columns(conn, "main"))
+                year_end = min(timeutil.year_start_ms(year + 1), cutoff)
+                batch_filter = f"""
+                    id IN (SELECT id FROM main.PrintLogs
+                           WHERE log_time >= ? AND log_time < ? ORDER BY id LIMIT {int(batch_size)})
+                """
+                params = (timeutil.year_start_ms(year), year_end)
+                moved[year] = 0
+
+                while True:
+                    with conn:  # 배치 하나 = 트랜잭션 하나 (복사와 삭제가 함께 성공/실패)
+                        cur = conn.execute(f"INSERT OR REPLACE INTO archive.PrintLogs ({cols}) SELECT {cols} FROM main.PrintLogs WHERE {batch_filter}", params)
+                        if cur.rowcount <= 0: break
+                        # 아카이브 이동은 로그 삭제가 아니므로 모든 워커의 작업 키 캐시를 비우지 않도록 삭제하는 동안만 트리거를 뺌
+                        # (INSERT 로 이미 시작된 트랜잭션 안의 DDL 이라 다른 연결에는 트리거가 빠진 상태가 보이지 않음)
+                        trigger = conn.execute("SELECT name, sql FROM main.sqlite_master WHERE type = 'trigger' AND name = ?", (JOB_KEYS_TRIGGER,)).fetchone()
+                        if trigger: conn.execute(f"DROP TRIGGER main.{trigger[0]}")
+                        conn.execute(f"DELETE FROM main.PrintLogs WHERE {batch_filter}", params)
+                        if trigger: conn.execute(trigger[1])
+                    moved[year] += cur.rowcount
+            finally:
+                conn.execute("DETACH DATABASE archive")
+    finally:
+        conn.close()
+
+    return moved
+
+def _existing_years(start_ms: int, end_ms: int) -> list:
+    years = range(timeutil.year_of(start_ms), timeutil.year_of(end_ms) + 1)
+    return [y for y in years if os.path.exists(archive_path(y))]
+
+def archived_years(start_ms: int, end_ms: int) -> list:
+    """조회 기간(epoch 밀리초)에 걸쳐 있고 실제로 파일이 존재하는 아카이브 연도 목록 (최근 MAX_ATTACHED_ARCHIVES 개까지)"""
+    return _existing_years(start_ms, end_ms)[-MAX_ATTACHED_ARCHIVES:]
+
+def exceeds_attach_limit(start_ms: int, end_ms: int) -> bool:
+    """기간에 걸친 아카이브가 한 번에 ATTACH 할 수 있는 수보다 많은지 (빠짐없이 읽어야 하는 정산 내보내기용)"""
+    return len(_existing_years(start_ms, end_ms)) > MAX_ATTACHED_ARCHIVES
+
+def attach_archives(conn, start_ms: int, end_ms: int) -> list:
+    """
+    조회 기간에 해당하는 아카이브를 ATTACH 하고, 조회 가능한 스키마 이름 목록을 반환합니다. (SQLAlchemy 연결)
+    SQLite가 아니면 아카이브가 없으므로 [None] (= 스키마 접두어 없는 운영 테이블)만 반환합니다.
+    """
+    if conn.dialect.name != "sqlite":
+        return [None]
+    schemas = ["main"]
+    for year in archived_years(start_ms, end_ms):
+        alias = f"archive_{year}"
+        conn.exec_driver_sql("ATTACH DATABASE ? AS " + alias, (archive_path(year),))
+        schemas.append(alias)
+    return schemas
+
+def detach_archives(conn, schemas: list):
+    """풀에 돌려줄 연결이므로 조회가 끝나면 붙였던 아카이브를 반드시 떼어냅니다."""
+    for schema in schemas:
+        if schema and schema != "main":
+            conn.exec_driver_sql(f"DETACH DATABASE {schema}")
+
+def union_logs(schemas: list, columns: str, where: str) -> str:
+    """여러 스키마의 PrintLogs를 같은 조건으로 UNION ALL 하는 SQL을 만듭니다. (:이름 파라미터는 모든 스키마에 공통 적용)"""
+    return "\nUNION ALL\n".join(
+        f"SELECT {columns} FROM {schema + '.' if schema else ''}PrintLogs WHERE {where}" for schema in schemas
+    )
@@ -0,0 +1,132 @@
+# Manager_Console/search.py
+from sqlalchemy.exc import OperationalError
+from database import sql, plain_rows, IS_SQLITE, IS_POSTGRES, has_table
+from lookups import VIEW
+
+# ====================================================================
+# 🌟 [신규] 인쇄 로그 전문 검색 ("누가 X 파일을 인쇄했나")
+#  - SQLite는 PrintLogs 의 문서명/사용자/프린터명을 FTS5 색인(PrintLogsFts)으로 두고, 트리거로 자동 동기화합니다.
+#    사용자/프린터명은 이름 사전에 있으므로 색인 원본은 이름을 붙인 뷰(PrintLogsView)입니다.
+#  - trigram 토크나이저를 쓰므로 띄어쓰기 없는 한글 파일명("2026년사업보고서")도 부분 문자열로 찾을 수 있습니다.
+#  - trigram 색인은 3글자 이상 검색어만 찾을 수 있으므로, 더 짧은 검색어나 다른 DB는 LIKE 검색으로 처리합니다.
+#  - 보관(아카이브)으로 옮겨진 로그는 검색 대상이 아닙니다.
+# ====================================================================
+FTS_TABLE = "PrintLogsFts"
+MIN_TERM_LENGTH = 3
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+RESULT_COLUMNS = ("id", "log_time", "os_user", "file_name", "printer_name", "total_pages", "remark",
+                  "color_mode", "paper_size", "calculated_price", "print_status", "uuid")
+
+# 색인 항목이 원본 행과 어긋나지 않도록 추가/삭제/수정 모두 트리거로 반영 (external content 방식)
+# 사전의 이름은 바뀌지 않으므로 id 로 찾은 이름은 색인할 때와 지울 때 항상 같음
+def _names(row: str) -> str:
+    return (f"(SELECT name FROM OsUsers WHERE id = {row}.os_user_id), "
+            f"(SELECT name FROM Printers WHERE id = {row}.printer_id)")
+
+_INDEX_VALUES = f"new.id, new.file_name, {_names('new')}"
+_DELETE_VALUES = f"'delete', old.id, old.file_name, {_names('old')}"
+_TRIGGERS = {
+    "trg_fts_PrintLogs_insert": f"AFTER INSERT ON PrintLogs BEGIN INSERT INTO {FTS_TABLE}(rowid, file_name, os_user, printer_name) VALUES ({_INDEX_VALUES}); END",
+    "trg_fts_PrintLogs_delete": f"AFTER DELETE ON PrintLogs BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, file_name, os_user, printer_name) VALUES ({_DELETE_VALUES}); END",
+    "trg_fts_PrintLogs_update": (
+        f"AFTER UPDATE OF file_name, os_user_id, printer_id ON PrintLogs BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, file_name, os_user, printer_name) VALUES ({_DELETE_VALUES}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, file_name, os_user, printer_name) VALUES ({_INDEX_VALUES}); END"
+    ),
+}
+
+_fts_ready = None  # 색인 테이블 존재 여부 (프로세스당 한 번 확인)
+
+def drop_index(conn):
+    """색인과 트리거를 제거합니다. (색인 원본 구조가 바뀔 때 다시 만들기 위해)"""
+    global _fts_ready
+    if not IS_SQLITE: return
+    for name in _TRIGGERS:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _fts_ready = None
+
+def install_index(conn, progress=None) -> bool:
+    """
+    FTS5 색인·트리거를 만들고 기존 로그로 색인을 채웁니다. (SQLite 전용, 이미 있으면 건너뜀)
+    FTS5 가 빠진 빌드나 trigram 토크나이저가 없는 구버전(3.34 미만)이면 색인 없이 False 를 돌려주고, 검색은 LIKE 로 처리됩니다.
+    """
+    global _fts_ready
+    if not IS_SQLITE: return False
+    if not has_table(conn, FTS_TABLE):
+        try:
+            conn.exec_driver_sql(f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    file_name, os_user, printer_name, content='{VIEW}', content_rowid='id', tokenize='trigram'
+                )
+            """)
+        except OperationalError as e:
+            if progress: progress(f"전문 검색 색인을 만들 수 없어 LIKE 검색으로 대체합니다. ({e.orig})")
+            _fts_ready = False
+            return False
+        try:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+        except Exception:
+            # SQLite 드라이버는 DDL을 즉시 확정하므로, 채우기에 실패하면 빈 색인이 남지 않도록 직접 제거
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+            raise
+    for name, body in _TRIGGERS.items():
+        conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    _fts_ready = True
+    return True
+
+def fts_available(conn) -> bool:
+    global _fts_ready
+    if _fts_ready is None:
+        _fts_ready = IS_SQLITE and has_table(conn, FTS_TABLE)
+    return _fts_ready
+
+def _like_escape(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def search_logs(conn, query: str, page: int = 1, page_size: int = PAGE_SIZE) -> dict:
+    """
+    검색어(공백 구분, 모두 포함)로 로그를 찾습니다.
+    FTS 검색은 관련도(bm25) 순, LIKE 검색은 최신 수신순(id 역순 - 시간 색인을 따라가며 흩어 읽지 않도록)이며,
+    다음 페이지 유무는 한 행 더 읽어서 판단합니다.
+    """
+    terms = query.split()
+    page, page_size = max(page, 1), min(max(page_size, 1), MAX_PAGE_SIZE)
+    result = {"query": query, "page": page, "page_size": page_size, "mode": None, "has_more": False, "items": []}
+    if not terms: return result
+
+    params = {"limit": page_size + 1, "offset": (page - 1) * page_size}
+    columns = ", ".join(f"p.{c}" for c in RESULT_COLUMNS)
+    if all(len(t) >= MIN_TERM_LENGTH for t in terms) and fts_available(conn):
+        result["mode"] = "fts"
+        # 검색어를 각각 큰따옴표로 감싸 FTS 문법 문자(-, *, OR 등)가 연산자로 해석되지 않게 함
+        params["match"] = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        statement = f"""
+            SELECT {columns} FROM {FTS_TABLE} f JOIN {VIEW} p ON p.id = f.rowid
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY f.rank, p.id DESC LIMIT :limit OFFSET :offset
+        """
+    else:
+        result["mode"] = "like"
+        like = "ILIKE" if IS_POSTGRES else "LIKE"
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"t{i}"] = _like_escape(term)
+            # 사용자/프린터명은 작은 사전에서 먼저 찾고, 로그는 정수 id 로만 비교
+            conditions.append(
+                f"(p.file_name {like} :t{i} ESCAPE '\\'"
+                f" OR p.os_user_id IN (SELECT id FROM OsUsers WHERE name {like} :t{i} ESCAPE '\\')"
+                f" OR p.printer_id IN (SELECT id FROM Printers WHERE name {like} :t{i} ESCAPE '\\'))"
+            )
+        statement = f"""
+            SELECT {columns} FROM {VIEW} p
+            WHERE {" AND ".join(conditions)}
+            ORDER BY p.id DESC LIMIT :limit OFFSET :offset
+        """
+
+    rows = plain_rows(conn.execute(sql(statement), params))
+    result["has_more"] = len(rows) > page_size
+    result["items"] = [dict(zip(RESULT_COLUMNS, row)) for row in rows[:page_size]]
+    return result
@@ -1,28 +1,60 @@
 # Manager_Console/server.py
 import os
+import re
+import sys
+import argparse
 import threading
-import pystray
-from PIL import Image, ImageDraw
+import time
+import uuid as uuid_lib
 from datetime import datetime
 import uvicorn
 import logging
 from logging.handlers import RotatingFileHandler
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from contextlib import asynccontextmanager
 
 import calculator 
-from models import engine, Base, SessionLocal, User, PrintLog, PricingPolicy, PrintControlPolicy, ApprovalRequest
+import retention
+import exporter
+import ledger
+import quota
+import repricing
+import idempotency
+import presence
+import search
+import log_query
+import approvals
+import audit
+import codec
+import admission
+import timeutil
+import lookups
+from journal import ingest_journal
+from constants import INGEST_JOURNAL
+import cache_sync
+from cache_sync import shared_versions
+from database import IS_SQLITE
+import migrations
+from profiler import profiler, span, current_route
+from models import engine, SessionLocal, User, PrintLog, PrintControlPolicy, ApprovalRequest, UsageLedger
 
 # ====================================================================
 # 🌟 [신규] 엔터프라이즈급 서버 로깅 시스템 (파일 & 콘솔 동시 출력)
 # ====================================================================
 LOG_DIR = r"C:\ProgramData\MyPrintMonitor\logs"
 os.makedirs(LOG_DIR, exist_ok=True)
-LOG_FILE = os.path.join(LOG_DIR, "server.log")
+
+# 다중 워커 모드에서 DB 초기화·보관 작업은 상위(감독) 프로세스가 한 번만 수행하고, 워커는 요청 처리만 담당
+SUPERVISED_ENV = "PRINT_SERVER_SUPERVISED"
+IS_WORKER = os.environ.get(SUPERVISED_ENV) == "1"
+# 여러 프로세스가 한 파일을 동시에 순환(rename)하면 충돌하므로 워커는 프로세스별 로그 파일 사용
+LOG_FILE = os.path.join(LOG_DIR, f"server-worker-{os.getpid()}.log" if IS_WORKER else "server.log")
 
 logger = logging.getLogger("PrintServer")
 logger.setLevel(logging.INFO)
@@ -49,6 +81,72 @@ def get_db():
     finally:
         db.close()
 
+# ====================================================================
+# 🌟 [신규] 로그 보관(아카이브) 정책: 하루 한 번 오래된 로그를 연도별 파일로 이동
+# ====================================================================
+RETENTION_INTERVAL_SEC = 24 * 60 * 60
+retention_stop = threading.Event()
+
+def run_retention() -> dict:
+    db = SessionLocal()
+    try:
+        policy = db.query(PrintControlPolicy).filter(PrintControlPolicy.id == 1).first()
+        days = policy.log_retention_days if policy and policy.log_retention_days else retention.DEFAULT_RETENTION_DAYS
+    finally:
+        db.close()
+
+    if not IS_SQLITE:
+        # 연도별 아카이브 파일은 SQLite 전용 (서버 DB는 DB 자체의 파티션/백업 정책 사용)
+        return {"retention_days": days, "moved": {}, "skipped": "sqlite only"}
+    moved = retention.archive_old_logs(days)
+    if moved:
+        logger.info(f"🗄️ [로그 보관] {days}일 경과 로그 이동 완료: " + ", ".join(f"{y}년 {n}건" for y, n in moved.items()))
+    return {"retention_days": days, "moved": moved}
+
+def retention_loop():
+    # 서버 기동 직후의 부하를 피하기 위해 1분 뒤 첫 실행, 이후 하루 간격
+    wait = 60
+    while not retention_stop.wait(wait):
+        try:
+            run_retention()
+        except Exception as e:
+            logger.error(f"🗄️ [로그 보관 오류] {e}")
+        wait = RETENTION_INTERVAL_SEC
+
+def init_database():
+    """테이블 생성·컬럼 추가·기본값 등록. 서버 프로세스 하나에서만 실행합니다."""
+    if IS_SQLITE:
+        with engine.begin() as conn:
+            # 여러 워커 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용 (DB 파일에 영구 기록됨)
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    # 🌟 [변경] 버전 기반 마이그레이션 + 기본값 등록 (스키마 지문이 같으면 DDL 없이 바로 끝남)
+    applied = migrations.run(engine, progress=lambda message: logger.info(f"🧱 [DB 마이그레이션] {message}"))
+    if applied:
+        logger.info(f"🧱 [DB 마이그레이션] 스키마 버전 {applied[-1]} 적용 완료")
+    # 이전 실행에서 DB 에 반영하지 못한 수신 저널 복구 (저널을 끈 상태로 재기동해도 남은 건은 반영)
+    ingest_journal.replay(apply_journal_batch, logger)
+
+# ====================================================================
+# 🌟 [신규] 기동 직후 캐시 예열 및 준비 상태
+#  - 첫 요청이 캐시 적재 비용을 떠안지 않도록, 요청을 받기 전에 요금표·통제 정책·에이전트 접속 현황을 읽어 둡니다.
+#  - /healthz 는 프로세스 생존만, /readyz 는 예열 완료 + DB 응답까지 확인합니다. (로드밸런서 라우팅 판단용)
+# ====================================================================
+server_ready = threading.Event()
+
+def prewarm_caches():
+    db = SessionLocal()
+    try:
+        calculator.price_book.reload(db)
+        quota.global_policy.get(db)
+        presence.registry.load(db)
+        approvals.pending.count(db)
+    finally:
+        db.close()
+
+def start_background_jobs():
+    retention_stop.clear()
+    threading.Thread(target=retention_loop, name="RetentionWorker", daemon=True).start()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("==================================================")
@@ -56,143 +154,596 @@ async def lifespan(app: FastAPI):
     logger.info(f"📂 [로그 저장소] {LOG_FILE}")
     logger.info("==================================================")
     
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        if not db.query(PricingPolicy).first():
-            db.add(PricingPolicy(paper_size=9, base_mono_price=50, base_color_price=150, multiplier=1, color_multiplier=1)) 
-            db.add(PricingPolicy(paper_size=8, base_mono_price=50, base_color_price=150, multiplier=2, color_multiplier=2)) 
-            
-        if not db.query(PrintControlPolicy).first():
-            db.add(PrintControlPolicy(id=1, color_limit=999999, mono_limit=999999))
-            
-        try: db.execute(text("ALTER TABLE PrintLogs ADD COLUMN calculated_price INTEGER DEFAULT 0"))
-        except: pass
-        try: db.execute(text("ALTER TABLE Users ADD COLUMN color_limit INTEGER"))
-        except: pass
-        try: db.execute(text("ALTER TABLE Users ADD COLUMN mono_limit INTEGER"))
-        except: pass
-        
-        db.commit()
-    finally:
-        db.close()
-        
+    started = time.perf_counter()
+    if not IS_WORKER:
+        init_database()
+        start_background_jobs()
+    prewarm_caches()
+    shared_versions.start(logger)
+    presence.registry.start(logger)
+    if INGEST_JOURNAL: ingest_journal.start(apply_journal_batch, logger)
+    server_ready.set()
+    logger.info(f"✅ [준비 완료] 요청 수신을 시작합니다. (기동 {(time.perf_counter() - started) * 1000:.0f}ms, 등록 에이전트 {len(presence.registry)}대)")
+    
     yield 
+    server_ready.clear()
+    presence.registry.stop(logger)
+    if INGEST_JOURNAL: ingest_journal.stop(apply_journal_batch, logger)
+    shared_versions.stop()
+    retention_stop.set()
     logger.info("🛑 [서버 종료] 데이터베이스 연결을 안전하게 해제합니다.")
 
 app = FastAPI(title="Manager Print API", lifespan=lifespan)
 
+# 다른 워커(또는 관리자 콘솔)가 원본 테이블을 바꾸면 이 프로세스의 캐시를 비움
+# (usage 는 트리거 없이 관리자 결재·조정·재계산에서만 cache_sync.bump 로 알림)
+shared_versions.subscribe("pricing", lambda: calculator.price_book.reload())
+shared_versions.subscribe("policy", quota.global_policy.clear)
+shared_versions.subscribe("usage", quota.counters.clear)
+quota.counters.shared = IS_WORKER  # 다중 워커에서는 한도 판정마다 원장 행을 잠그고 읽음
+shared_versions.subscribe("job_keys", idempotency.recent_jobs.clear)
+shared_versions.subscribe("approvals", approvals.pending.clear)
+shared_versions.subscribe("user_limits", quota.user_limits.clear)
+
+# ====================================================================
+# 🌟 [신규] 성능 진단 (프로파일링 중일 때만 요청 단위 구간 측정)
+# ====================================================================
+PROFILE_SECONDS = 30
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    if not profiler.active:
+        return await call_next(request)
+    # /api/print-log/123/status 처럼 ID가 섞인 경로는 하나로 묶어서 집계
+    route = re.sub(r"/\d+", "/{id}", request.url.path)
+    token = current_route.set(f"{request.method} {route}")
+    try:
+        with span("request"):
+            return await call_next(request)
+    finally:
+        current_route.reset(token)
+
+# 🌟 [신규] 에이전트 요청 수락 제어 - 과부하 시 생존 신고부터 돌려보냄 (프로파일링보다 바깥에서 먼저 판단)
+app.middleware("http")(admission.admission_middleware)
+
+def require_local_admin(request: Request):
+    # 관리자 기능은 서버 PC 자신(127.0.0.1)에서 호출한 경우에만 허용
+    if request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+        raise HTTPException(status_code=403, detail="서버 PC에서만 사용할 수 있는 관리자 기능입니다.")
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    if not server_ready.is_set():
+        raise HTTPException(status_code=503, detail="서버 기동 중입니다.")
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 실패: {e}")
+    return {"status": "ready"}
+
 # --- 스키마 ---
 class PrintLogSchema(BaseModel):
     uuid: str; pc_name: str; ip_address: str; os_user: str
     printer_name: str; file_name: str; total_pages: int
     color_mode: int; paper_size: int; copies: int; remark: str = ""
+    duplex: int = 1  # DEVMODE dmDuplex (1: 단면, 2/3: 양면)
+    job_key: Optional[str] = None  # 중복 방지 키 (예: 스풀러 작업 ID + 제출 시각). 재전송 시 같은 값을 보내야 함
 
 class HeartbeatSchema(BaseModel):
     uuid: str
 
+class AgentSyncSchema(BaseModel):
+    uuid: str
+    policy_version: Optional[str] = None  # 에이전트가 마지막으로 받은 정책 지문 (같으면 정책 본문 생략)
+    waiting: List[int] = []               # 결재 결과를 기다리는 log_id 목록
+
+# actor: 변경 이력에 남길 처리자 (콘솔이 Windows 계정명을 보냄, 생략 시 audit.DEFAULT_ACTOR)
 class StatusUpdateSchema(BaseModel):
-    log_id: int; status: str; reason: str = ""
+    log_id: int; status: str; reason: str = ""; actor: Optional[str] = None
+
+class ApprovalDecisionSchema(BaseModel):
+    approve: bool; reason: str = ""; actor: Optional[str] = None
 
 class RefundRequestSchema(BaseModel):
-    new_price: int; reason: str
+    new_price: int; reason: str; actor: Optional[str] = None
 
-# --- API 라우터 ---
-@app.get("/api/policy/control")
-def get_control_policy(uuid: str = None, db: Session = Depends(get_db)):
-    global_policy = db.query(PrintControlPolicy).filter(PrintControlPolicy.id == 1).first()
-    final_color = global_policy.color_limit if global_policy else 999999
-    final_mono = global_policy.mono_limit if global_policy else 999999
+class RepriceRequestSchema(BaseModel):
+    date_from: str; date_to: str; dry_run: bool = True
 
+# --- 공통 처리 ---
+def resolve_control_policy(db: Session, uuid: str = None) -> dict:
+    """전사 공통 한도에 사용자별 예외 한도를 덮어쓴 최종 통제 정책"""
+    policy = dict(quota.global_policy.get(db))
     if uuid:
-        user = db.query(User).filter(User.uuid == uuid).first()
-        if user:
-            if user.color_limit is not None: final_color = user.color_limit
-            if user.mono_limit is not None: final_mono = user.mono_limit
-
-    return {"color_limit": final_color, "mono_limit": final_mono}
+        color_limit, mono_limit = quota.user_limits.get(db, uuid)
+        if color_limit is not None: policy["color_limit"] = color_limit
+        if mono_limit is not None: policy["mono_limit"] = mono_limit
+    return policy
 
-@app.get("/api/print-log/{log_id}/status")
-def get_log_status(log_id: int, db: Session = Depends(get_db)):
-    log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
-    if log: return {"status": log.print_status}
-    return {"status": "not_found"}
-
-@app.post("/api/print-log")
-def receive_print_log(log: PrintLogSchema, db: Session = Depends(get_db)):
-    price = calculator.calculate_price(log.paper_size, log.color_mode, log.total_pages, log.copies)
-    status = "승인 대기" if "승인 대기" in log.remark else "완료"
+def record_print_log(db: Session, log: PrintLogSchema, status: str, remark: str) -> PrintLog:
+    """요금을 계산해 로그를 저장하고 원장에 반영합니다."""
+    log_time = timeutil.now_ms()
+    with span("calculate_price"):
+        price, version_id = calculator.price_job(log.paper_size, log.color_mode, log.total_pages, log.copies, log_time, log.duplex)
     
     new_log = PrintLog(
-        uuid=log.uuid, os_user=log.os_user, printer_name=log.printer_name,
+        log_time=log_time, uuid=log.uuid,
+        os_user_id=lookups.os_users.id_of(log.os_user), printer_id=lookups.printers.id_of(log.printer_name),
         file_name=log.file_name, total_pages=log.total_pages, color_mode=log.color_mode,
-        paper_size=log.paper_size, copies=log.copies, remark=log.remark, print_status=status
+        paper_size=log.paper_size, copies=log.copies, remark=remark, print_status=status,
+        pricing_version=version_id, duplex=log.duplex, job_key=log.job_key or None
     )
     new_log.calculated_price = price 
     db.add(new_log)
-    db.commit()
-    db.refresh(new_log) 
+    with span("db.query"):
+        db.flush()
+        if ledger.is_billable(status):
+            ledger.apply(db, new_log)
+        if status == approvals.WAITING_STATUS:
+            approvals.open_request(db, new_log)
+    with span("db.commit"):
+        db.commit()
+    with span("db.query"):
+        db.refresh(new_log) 
+    if status == approvals.WAITING_STATUS:
+        approvals.pending.add(new_log, new_log.log_time, log.os_user, log.printer_name)
     
     # 🌟 [신규] 인쇄 수신 시 로그 기록
-    logger.info(f"🖨️ [인쇄 수신] ID:{new_log.id} | 사용자:{log.os_user} | 문서:{log.file_name} ({log.total_pages}장) | 상태:{status}")
-    return {"status": "success", "log_id": new_log.id, "price": price}
+    with span("logging"):
+        logger.info(f"🖨️ [인쇄 수신] ID:{new_log.id} | 사용자:{log.os_user} | 문서:{log.file_name} ({log.total_pages}장) | 상태:{status}")
+    return new_log
 
-@app.post("/api/heartbeat")
-def receive_heartbeat(hb: HeartbeatSchema, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.uuid == hb.uuid).first()
+# ====================================================================
+# 🌟 [신규] 수신 저널 경유 기록 (PRINT_MONITOR_INGEST_JOURNAL=1)
+#  - 승인이 필요 없는 로그는 요금만 계산해 저널에 확정하고 바로 응답하며, DB 기록은 저널 반영기가 모아서 합니다.
+#  - 재반영 시 중복을 거르기 위해 작업 키가 없는 로그에는 서버가 키를 붙입니다.
+# ====================================================================
+JOURNAL_FIELDS = ("uuid", "os_user", "printer_name", "file_name", "total_pages", "color_mode", "paper_size", "copies", "duplex", "job_key")
+
+def journal_print_log(log: PrintLogSchema, status: str, remark: str):
+    """저널에 기록하고 (과금액, 새로 기록했는지 여부). 같은 작업이 아직 반영 전이면 그 레코드의 과금액과 False"""
+    log_time = timeutil.now_ms()
+    with span("calculate_price"):
+        price, version_id = calculator.price_job(log.paper_size, log.color_mode, log.total_pages, log.copies, log_time, log.duplex)
+    record = {f: getattr(log, f) for f in JOURNAL_FIELDS}
+    record.update(
+        job_key=log.job_key or f"journal-{uuid_lib.uuid4().hex}", log_time=log_time,
+        calculated_price=price, pricing_version=version_id, print_status=status, remark=remark
+    )
+    with span("journal.append"):
+        stored = ingest_journal.append(record)
+    return stored["calculated_price"], stored is record
+
+def apply_journal_batch(records: list) -> int:
+    """저널 레코드를 한 트랜잭션으로 기록합니다. 이미 기록된 (uuid, 작업 키)는 건너뜀. 반환값: 새로 기록한 건수"""
+    db = SessionLocal()
+    try:
+        keys = {r["job_key"] for r in records}
+        seen = set(db.query(PrintLog.uuid, PrintLog.job_key).filter(PrintLog.job_key.in_(keys)).all())
+        new_logs = []
+        for r in records:
+            if (r["uuid"], r["job_key"]) in seen: continue
+            seen.add((r["uuid"], r["job_key"]))
+            values = {k: v for k, v in r.items() if k not in ("log_time", "os_user", "printer_name")}
+            new_log = PrintLog(
+                **values, log_time=timeutil.coerce_ms(r["log_time"]),
+                os_user_id=lookups.os_users.id_of(r.get("os_user")), printer_id=lookups.printers.id_of(r.get("printer_name"))
+            )
+            db.add(new_log)
+            new_logs.append(new_log)
+        db.flush()
+        for new_log in new_logs:
+            if ledger.is_billable(new_log.print_status): ledger.apply(db, new_log)
+        recorded = [(l.uuid, l.job_key, l.id, l.calculated_price) for l in new_logs]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    for uuid, job_key, log_id, price in recorded:
+        idempotency.recent_jobs.remember(uuid, job_key, log_id, price, quota.ALLOW)
+        quota.counters.invalidate(uuid)
+    if new_logs:
+        logger.info(f"🧾 [저널 반영] 인쇄 로그 {len(new_logs)}건 기록 (중복 제외 {len(records) - len(new_logs)}건)")
+    return len(new_logs)
+
+# 중복 수신된 작업은 기록된 상태로부터 처리 결과를 복원
+STATUS_DECISIONS = {"반려됨": quota.DENY, approvals.WAITING_STATUS: quota.NEEDS_APPROVAL}
+
+def find_duplicate(db: Session, log: PrintLogSchema):
+    """같은 에이전트가 같은 작업 키로 이미 기록한 작업이면 (log_id, 과금액, 처리 결과), 아니면 None"""
+    if not log.job_key: return None
+    cached = idempotency.recent_jobs.get(log.uuid, log.job_key)
+    if cached: return cached
+    with span("db.query"):
+        existing = db.query(PrintLog).filter(PrintLog.uuid == log.uuid, PrintLog.job_key == log.job_key).first()
+    if not existing: return None
+    entry = (existing.id, existing.calculated_price, STATUS_DECISIONS.get(existing.print_status, quota.ALLOW))
+    idempotency.recent_jobs.remember(log.uuid, log.job_key, *entry)
+    return entry
+
+def record_unique_print_log(db: Session, log: PrintLogSchema, status: str, remark: str, decision: str):
+    """
+    record_print_log 와 같지만, 동시에 들어온 재전송끼리 고유 인덱스에서 충돌하면 먼저 기록된 작업을 돌려줍니다.
+    반환값: (log_id, 과금액, 처리 결과, 새로 기록했는지 여부)
+    """
+    try:
+        new_log = record_print_log(db, log, status, remark)
+    except IntegrityError:
+        db.rollback()
+        duplicate = find_duplicate(db, log)
+        if not duplicate: raise
+        return (*duplicate, False)
+    if log.job_key:
+        idempotency.recent_jobs.remember(log.uuid, log.job_key, new_log.id, new_log.calculated_price, decision)
+    return new_log.id, new_log.calculated_price, decision, True
+
+# --- API 라우터 ---
+@app.get("/api/policy/control", dependencies=[Depends(admission.admitted_query(admission.POLICY))])
+def get_control_policy(uuid: str = None, db: Session = Depends(get_db)):
+    policy = resolve_control_policy(db, uuid)
+    return codec.respond({"color_limit": policy["color_limit"], "mono_limit": policy["mono_limit"], "version": quota.policy_version(policy)})
+
+@app.get("/api/print-logs")
+def list_print_logs(
+    date_from: str = Query(None, alias="from"), date_to: str = Query(None, alias="to"),
+    uuid: str = None, department: str = None, printer: str = None, status: str = None,
+    color_mode: int = None, paper_size: int = None,
+    sort: str = "log_time", order: str = "desc", cursor: str = None, limit: int = log_query.PAGE_SIZE,
+    db: Session = Depends(get_db)
+):
+    """조건별 로그 조회. 다음 페이지는 응답의 next_cursor 를 cursor 로 넘겨 요청 (from/to: YYYY-MM-DD, to 포함 / log_time: epoch 밀리초)"""
+    try:
+        start, end = timeutil.day_range_ms(date_from, date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to 는 YYYY-MM-DD 형식이어야 합니다.")
+    filters = {
+        "date_from": start, "date_to": end, "uuid": uuid, "department": department, "printer_name": printer,
+        "print_status": status, "color_mode": color_mode, "paper_size": paper_size,
+    }
+    try:
+        with span("db.query"):
+            return log_query.query_logs(db.connection(), filters, sort, order, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/print-log/search")
+def search_print_logs(q: str = "", page: int = 1, page_size: int = search.PAGE_SIZE, db: Session = Depends(get_db)):
+    """문서명·사용자·프린터명 검색 (관련도순, 페이지 단위)"""
+    with span("db.query"):
+        return search.search_logs(db.connection(), q, page, page_size)
+
+@app.get("/api/print-log/{log_id}/status", dependencies=[Depends(admission.admitted_query(admission.POLICY))])
+def get_log_status(log_id: int, db: Session = Depends(get_db)):
+    # 승인을 기다리는 에이전트가 주기적으로 묻는 경로 - 대기 중이면 메모리 대기열만으로 응답
+    if approvals.pending.contains(db, log_id): return codec.respond({"status": approvals.WAITING_STATUS})
+    with span("db.query"):
+        log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
+    if log: return codec.respond({"status": log.print_status})
+    return codec.respond({"status": "not_found"})
+
+@app.post("/api/print-log")
+def receive_print_log(log: PrintLogSchema = Depends(admission.admitted_body(admission.INGEST, PrintLogSchema)), db: Session = Depends(get_db)):
+    duplicate = find_duplicate(db, log)
+    if duplicate:
+        logger.info(f"♻️ [중복 수신] 이미 기록된 작업입니다. ID:{duplicate[0]} | 사용자:{log.os_user} | 키:{log.job_key}")
+        return codec.respond({"status": "success", "log_id": duplicate[0], "price": duplicate[1], "duplicate": True})
+    
+    status = approvals.WAITING_STATUS if "승인 대기" in log.remark else "완료"
+    if INGEST_JOURNAL and status != approvals.WAITING_STATUS:
+        # 승인 대기 건은 에이전트가 log_id 로 결재 결과를 물어야 하므로 바로 DB 에 기록
+        # 같은 작업이 아직 저널에서 반영을 기다리는 중이면 (DB 에는 아직 없음) 중복으로 응답
+        price, created = journal_print_log(log, status, log.remark)
+        if not created:
+            logger.info(f"♻️ [중복 수신] 저널에서 반영 대기 중인 작업입니다. 사용자:{log.os_user} | 키:{log.job_key}")
+        return codec.respond({"status": "success", "log_id": None, "price": price, "duplicate": not created, "queued": True})
+    log_id, price, _, created = record_unique_print_log(db, log, status, log.remark, quota.ALLOW)
+    if created: quota.counters.invalidate(log.uuid)
+    return codec.respond({"status": "success", "log_id": log_id, "price": price, "duplicate": not created})
+
+@app.post("/api/print-job/submit")
+def submit_print_job(log: PrintLogSchema = Depends(admission.admitted_body(admission.INGEST, PrintLogSchema)), db: Session = Depends(get_db)):
+    """
+    🌟 [신규] 인쇄 작업 제출 시 한도 점검·예약·기록을 한 번에 처리합니다.
+    정책 조회 → 에이전트 자체 판정 → 로그 전송의 3단계를 대체하며, 결과는 allow / deny / needs_approval 중 하나입니다.
+    """
+    duplicate = find_duplicate(db, log)
+    if duplicate:
+        logger.info(f"♻️ [중복 수신] 이미 판정된 작업입니다. ID:{duplicate[0]} | 사용자:{log.os_user} | 키:{log.job_key}")
+        return codec.respond({"decision": duplicate[2], "log_id": duplicate[0], "price": duplicate[1], "duplicate": True})
+    
+    policy = resolve_control_policy(db, log.uuid)
+    is_color = log.color_mode == 2
+    pages = ledger.actual_pages(log.total_pages, log.copies)
+    limit = policy["color_limit"] if is_color else policy["mono_limit"]
+    # 이름 사전 등록은 별도 연결의 쓰기이므로 한도 판정이 원장 행을 잠그기 전에 마침
+    lookups.os_users.id_of(log.os_user); lookups.printers.id_of(log.printer_name)
+    
+    within, used = quota.counters.reserve(db, log.uuid, policy["quota_period"], is_color, pages, limit)
+    if within:
+        decision, status, remark = quota.ALLOW, "완료", log.remark
+    elif policy["over_quota_action"] == "deny":
+        decision, status, remark = quota.DENY, "반려됨", f"{log.remark} [한도 초과 차단]".strip()
+    else:
+        decision, status, remark = quota.NEEDS_APPROVAL, approvals.WAITING_STATUS, f"{log.remark} [한도 초과 승인 대기]".strip()
+    
+    try:
+        log_id, price, decision, created = record_unique_print_log(db, log, status, remark, decision)
+    except Exception:
+        if within: quota.counters.release(log.uuid, policy["quota_period"], is_color, pages)
+        raise
+    if not created:
+        # 동시에 들어온 재전송이 먼저 기록됨 - 이번 요청의 예약분은 되돌림
+        if within: quota.counters.release(log.uuid, policy["quota_period"], is_color, pages)
+        return codec.respond({"decision": decision, "log_id": log_id, "price": price, "duplicate": True})
+    if decision == quota.NEEDS_APPROVAL:
+        # 승인 대기분도 원장에는 사용량으로 잡히므로 다음 판정 때 원장 값으로 다시 읽음
+        quota.counters.invalidate(log.uuid)
+    
+    return codec.respond({
+        "decision": decision, "log_id": log_id, "price": price, "duplicate": False,
+        "quota": {"period": policy["quota_period"], "limit": limit, "used": used, "requested": pages}
+    })
+
+def record_heartbeat(db: Session, uuid: str):
+    # 🌟 [변경] 등록된 에이전트는 메모리 레지스트리만 갱신 (DB 기록은 presence 가 주기적으로 일괄 처리)
+    if presence.registry.touch(uuid): return
+
+    with span("db.query"):
+        user = db.query(User).filter(User.uuid == uuid).first()
     
     if user:
-        user.last_heartbeat = datetime.now()
+        user.last_heartbeat = timeutil.now_ms()
         # 생존 신고는 너무 자주 발생하므로 DEBUG 레벨로 숨길 수 있지만, 현재는 모니터링을 위해 INFO로 출력합니다.
-        logger.info(f"💓 [생존 신고] 연결 유지됨: UUID({hb.uuid[:8]}...)")
+        with span("logging"):
+            logger.info(f"💓 [생존 신고] 연결 유지됨: UUID({uuid[:8]}...)")
     else:
         new_user = User(
-            uuid=hb.uuid, os_user="미등록 사용자", department="미배정", last_heartbeat=datetime.now()
+            uuid=uuid, os_user="미등록 사용자", department="미배정", last_heartbeat=timeutil.now_ms()
         )
         db.add(new_user)
-        logger.warning(f"🆕 [신규 에이전트 등록] 최초 접속 감지: UUID({hb.uuid})")
+        with span("logging"):
+            logger.warning(f"🆕 [신규 에이전트 등록] 최초 접속 감지: UUID({uuid})")
         
-    db.commit()
-    return {"status": "ok"}
+    with span("db.commit"):
+        db.commit()
+    presence.registry.register(uuid)
+
+@app.post("/api/heartbeat")
+def receive_heartbeat(hb: HeartbeatSchema = Depends(admission.admitted_body(admission.HEARTBEAT, HeartbeatSchema)), db: Session = Depends(get_db)):
+    record_heartbeat(db, hb.uuid)
+    return codec.respond({"status": "ok"})
+
+@app.post("/api/agent/sync")
+def agent_sync(req: AgentSyncSchema = Depends(admission.admitted_body(admission.HEARTBEAT, AgentSyncSchema)), db: Session = Depends(get_db)):
+    """
+    🌟 [신규] 에이전트 주기 동기화: 생존 신고 + 통제 정책 + 결재 결과를 한 번의 요청으로 처리합니다.
+    (/api/heartbeat, /api/policy/control, /api/print-log/{id}/status 를 각각 호출하던 것을 대체)
+    - 정책은 에이전트가 보낸 policy_version 과 다를 때만 본문을 담습니다.
+    - decisions 에는 waiting 중 결재가 끝난(또는 사라진) 건만 담기며, 아직 대기 중인 건은 빠집니다.
+    """
+    if len(req.waiting) > approvals.MAX_WAITING:
+        raise HTTPException(status_code=400, detail=f"waiting 은 최대 {approvals.MAX_WAITING}건까지 보낼 수 있습니다.")
+    record_heartbeat(db, req.uuid)
+
+    policy = resolve_control_policy(db, req.uuid)
+    version = quota.policy_version(policy)
+    result = {"status": "ok", "policy_version": version, "decisions": approvals.decisions(db, req.waiting)}
+    if req.policy_version != version:
+        result["policy"] = {"color_limit": policy["color_limit"], "mono_limit": policy["mono_limit"]}
+    return codec.respond(result)
+
+@app.get("/api/agents/presence")
+def get_agent_presence(limit: int = None):
+    """온라인/오프라인 수와 최근 신고 순 에이전트 목록 (경과 초). 관리자 콘솔 기기 현황 탭용"""
+    snapshot = presence.registry.snapshot(limit)
+    snapshot["agents"] = [{"uuid": uuid, "seconds_ago": None if ago is None else round(ago, 1)} for uuid, ago in snapshot["agents"]]
+    return snapshot
+
+@app.get("/api/approvals/pending", dependencies=[Depends(require_local_admin)])
+def get_pending_approvals(db: Session = Depends(get_db)):
+    """🌟 [신규] 결재 대기 목록 (요청 순). 메모리 대기열에서 바로 응답합니다."""
+    items = approvals.pending.items(db)
+    return {"count": len(items), "items": items}
+
+@app.post("/api/approvals/{log_id}/decide", dependencies=[Depends(require_local_admin)])
+def decide_approval(log_id: int, decision: ApprovalDecisionSchema, db: Session = Depends(get_db)):
+    """🌟 [신규] 승인/반려. 대기 중인 요청만 바꾸는 조건부 UPDATE 로 처리하므로 중복 결재는 409 로 거절됩니다."""
+    try:
+        with span("db.commit"):
+            log = approvals.decide(db, log_id, decision.approve, decision.reason, decision.actor)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except approvals.AlreadyDecided as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    quota.counters.invalidate(log.uuid)
+    with span("logging"):
+        logger.info(f"✅ [결재] ID:{log_id} ➔ {log.print_status} (사유: {decision.reason})")
+    return {"status": log.print_status}
 
 @app.post("/api/print-log/status-update")
-def update_status(update: StatusUpdateSchema, db: Session = Depends(get_db)):
-    log = db.query(PrintLog).filter(PrintLog.id == update.log_id).first()
+def update_status(update: StatusUpdateSchema, request: Request, db: Session = Depends(get_db)):
+    # 승인/반려는 대기열의 조건부 결재로 처리 (대기열에 없는 로그만 아래의 일반 상태 변경으로 진행)
+    if update.status in approvals.LOG_STATUSES.values():
+        require_local_admin(request)  # 결재 API 와 같은 권한 확인 (에이전트의 자기 승인 방지)
+        try:
+            decide_approval(update.log_id, ApprovalDecisionSchema(approve=update.status == "승인 완료", reason=update.reason, actor=update.actor), db)
+            return {"status": "updated"}
+        except HTTPException as e:
+            if e.status_code != 404: raise
+    with span("db.query"):
+        log = db.query(PrintLog).filter(PrintLog.id == update.log_id).first()
     if not log: return {"status": "error", "message": "Log not found"}
         
-    new_remark = log.remark if log.remark else ""
-    if update.reason: new_remark = f"{new_remark} [{update.reason}]".strip()
-        
+    # 🌟 [변경] 사유는 비고에 덧붙이지 않고 변경 이력에 기록
+    old_status = log.print_status
+    was_billable = ledger.is_billable(old_status)
     log.print_status = update.status
-    log.remark = new_remark
-    db.commit()
+    audit.record(db, log.id, audit.STATUS, update.actor, update.reason, old_status, update.status, log.calculated_price, log.calculated_price)
+    if was_billable != ledger.is_billable(update.status):
+        ledger.apply(db, log, sign=-1 if was_billable else 1)
+        cache_sync.bump(db, "usage")
+        quota.counters.invalidate(log.uuid)
+    with span("db.commit"):
+        db.commit()
     
-    logger.info(f"✅ [상태 변경] ID:{update.log_id} ➔ {update.status} (사유: {update.reason})")
+    with span("logging"):
+        logger.info(f"✅ [상태 변경] ID:{update.log_id} ➔ {update.status} (사유: {update.reason})")
     return {"status": "updated"}
 
+# 🌟 [신규] 로그 한 건의 변경 이력 (콘솔에서 로그를 열 때 조회, 삭제된 로그의 이력도 남아 있음)
+@app.get("/api/print-log/{log_id}/events")
+def get_log_events(log_id: int, db: Session = Depends(get_db)):
+    with span("db.query"):
+        items = audit.history(db, log_id)
+    return {"log_id": log_id, "items": items}
+
 @app.post("/api/print-log/{log_id}/refund")
 def manual_price_adjustment(log_id: int, req: RefundRequestSchema, db: Session = Depends(get_db)):
-    log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
+    with span("db.query"):
+        log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
     if not log: raise HTTPException(status_code=404, detail="해당 인쇄 기록을 찾을 수 없습니다.")
     
-    log.calculated_price = req.new_price
+    old_status, old_price = log.print_status, log.calculated_price
+    if ledger.is_billable(log.print_status):
+        ledger.apply(db, log, price_delta=req.new_price - (log.calculated_price or 0))
+        log.calculated_price = req.new_price
+    else:
+        log.calculated_price = req.new_price
+        ledger.apply(db, log)
+        quota.counters.invalidate(log.uuid)
+    cache_sync.bump(db, "usage")
     log.print_status = "환불/조정됨" if req.new_price == 0 else "단가 조정됨"
-    log.remark = f"{log.remark} [관리자 조정: {req.reason}]".strip()
-    db.commit()
+    audit.record(db, log_id, audit.PRICE, req.actor, req.reason, old_status, log.print_status, old_price, req.new_price)
+    with span("db.commit"):
+        db.commit()
     
-    logger.info(f"💰 [단가 조정] ID:{log_id} ➔ {req.new_price}원 (사유: {req.reason})")
+    with span("logging"):
+        logger.info(f"💰 [단가 조정] ID:{log_id} ➔ {req.new_price}원 (사유: {req.reason})")
     return {"status": "success", "adjusted_price": req.new_price}
 
+@app.delete("/api/print-log/{log_id}", dependencies=[Depends(require_local_admin)])
+def delete_print_log(log_id: int, actor: str = None, db: Session = Depends(get_db)):
+    log = db.query(PrintLog).filter(PrintLog.id == log_id).first()
+    if not log: raise HTTPException(status_code=404, detail="해당 인쇄 기록을 찾을 수 없습니다.")
+    
+    if ledger.is_billable(log.print_status):
+        ledger.apply(db, log, sign=-1)
+        cache_sync.bump(db, "usage")
+        quota.counters.invalidate(log.uuid)
+    # 이력은 로그가 지워진 뒤에도 남김 (삭제 자체도 한 줄로 기록)
+    audit.record(db, log_id, audit.DELETE, actor, old_status=log.print_status, old_price=log.calculated_price)
+    db.delete(log)
+    db.commit()
+    idempotency.recent_jobs.forget_log(log_id)
+    
+    logger.info(f"🗑️ [로그 삭제] ID:{log_id} | 사용자:{lookups.os_users.name_of(log.os_user_id)} | 문서:{log.file_name}")
+    return {"status": "deleted"}
+
+@app.get("/api/ledger")
+def get_ledger(period: str = None, scope: str = "user", key: str = None, db: Session = Depends(get_db)):
+    """기간("2026-10" 또는 "2026-10-19", 생략 시 이번 달)별 사용자/부서 누적 사용량"""
+    if scope not in ("user", "dept"):
+        raise HTTPException(status_code=400, detail="scope 는 user 또는 dept 여야 합니다.")
+    period = period or datetime.now().strftime("%Y-%m")
+    
+    query = db.query(UsageLedger).filter(UsageLedger.scope == scope, UsageLedger.period == period)
+    if key is not None: query = query.filter(UsageLedger.key == key)
+    
+    return {"period": period, "scope": scope, "items": [
+        {"key": row.key, "mono_pages": row.mono_pages, "color_pages": row.color_pages,
+         "total_pages": row.mono_pages + row.color_pages, "total_price": row.total_price, "job_count": row.job_count}
+        for row in query.all()
+    ]}
+
+@app.get("/api/export/print-logs")
+def export_print_logs(date_from: str = Query(..., alias="from"), date_to: str = Query(..., alias="to"), format: str = "csv"):
+    try:
+        start, end = timeutil.day_range_ms(date_from, date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to 는 YYYY-MM-DD 형식이어야 합니다.")
+    if retention.exceeds_attach_limit(start, end - 1):
+        # 일부 연도만 붙여 내보내면 정산 파일이 조용히 빠지므로 거절
+        raise HTTPException(status_code=400, detail=f"보관(아카이브) 연도가 {retention.MAX_ATTACHED_ARCHIVES}개를 넘는 기간입니다. 기간을 나눠 내보내세요.")
+    if format not in exporter.FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다. ({', '.join(exporter.FORMATS)})")
+    if format == "parquet" and not exporter.parquet_available():
+        raise HTTPException(status_code=400, detail="서버에 pyarrow가 설치되어 있지 않아 Parquet 내보내기를 사용할 수 없습니다.")
+
+    media_type, ext = exporter.FORMATS[format]
+    filename = f"print_logs_{date_from}_{date_to}.{ext}"
+    logger.info(f"📤 [로그 내보내기] {date_from} ~ {date_to} ({format})")
+    return StreamingResponse(
+        exporter.STREAMERS[format](engine, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.post("/api/admin/reprice", dependencies=[Depends(require_local_admin)])
+def reprice_period(req: RepriceRequestSchema, db: Session = Depends(get_db)):
+    try:
+        start, end = timeutil.day_range_ms(req.date_from, req.date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date_from/date_to 는 YYYY-MM-DD 형식이어야 합니다.")
+    
+    departments = repricing.preview(db, start, end)
+    updated = 0
+    if not req.dry_run:
+        updated = repricing.apply(db, start, end)
+        if updated: cache_sync.bump(db, "usage")
+        db.commit()
+        logger.info(f"🔁 [요금 재계산] {req.date_from} ~ {req.date_to} | {updated}건 변경 | 차액 {sum(d['delta'] for d in departments):,}원")
+    
+    return {"status": "preview" if req.dry_run else "applied", "updated_rows": updated, "departments": departments}
+
+@app.post("/api/admin/retention/run", dependencies=[Depends(require_local_admin)])
+def trigger_retention():
+    return {"status": "success", **run_retention()}
+
+@app.post("/api/admin/profile", dependencies=[Depends(require_local_admin)])
+def start_profiling(seconds: int = PROFILE_SECONDS):
+    seconds = max(1, min(seconds, 600))
+    if not profiler.start(seconds, LOG_DIR):
+        raise HTTPException(status_code=409, detail="이미 프로파일링이 진행 중입니다.")
+    logger.info(f"🔬 [성능 진단] {seconds}초간 샘플링 프로파일링을 시작합니다. (결과: {LOG_DIR})")
+    return {"status": "started", "seconds": seconds, "output_dir": LOG_DIR}
+
 # --- 백그라운드 구동 ---
 def run_fastapi_server():
     uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)
 
+def run_headless(workers: int, host: str, port: int):
+    """
+    🌟 [신규] 트레이 아이콘 없이 여러 워커 프로세스로 서버를 실행합니다. (서버 전용 PC의 모든 코어 활용)
+    DB 초기화와 로그 보관 작업은 이 프로세스에서 한 번만 하고, 워커들은 요청 처리만 합니다.
+    """
+    init_database()
+    start_background_jobs()
+    os.environ[SUPERVISED_ENV] = "1"  # 워커 프로세스에 상속됨
+    logger.info(f"🧵 [다중 워커] {workers}개 워커로 {host}:{port} 에서 요청을 처리합니다.")
+    # 워커마다 이 모듈을 새로 import 해야 하므로 앱 객체 대신 import 경로를 전달
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    uvicorn.run("server:app", host=host, port=port, workers=workers, access_log=False)
+
 def create_server_image():
+    from PIL import Image, ImageDraw
     image = Image.new('RGB', (64, 64), color=(255, 255, 255))
     dc = ImageDraw.Draw(image)
     dc.rectangle((16, 16, 48, 48), fill=(0, 100, 255)) 
     return image
 
+def start_profiling_from_tray(icon, item):
+    if profiler.start(PROFILE_SECONDS, LOG_DIR):
+        logger.info(f"🔬 [성능 진단] 트레이 메뉴에서 {PROFILE_SECONDS}초간 프로파일링을 시작합니다. (결과: {LOG_DIR})")
+    else:
+        logger.warning("🔬 [성능 진단] 이미 프로파일링이 진행 중입니다.")
+
 def exit_server(icon, item):
     icon.stop()
     os._exit(0)
@@ -202,7 +753,24 @@ def setup_and_start(icon):
     server_thread = threading.Thread(target=run_fastapi_server, daemon=True)
     server_thread.start()
 
-if __name__ == "__main__":
-    menu = pystray.Menu(pystray.MenuItem("🛑 중앙 서버 완전 종료", exit_server))
+def run_tray():
+    import pystray
+    menu = pystray.Menu(
+        pystray.MenuItem(f"🔬 성능 프로파일링 ({PROFILE_SECONDS}초)", start_profiling_from_tray),
+        pystray.MenuItem("🛑 중앙 서버 완전 종료", exit_server)
+    )
     icon = pystray.Icon("PrintServer", create_server_image(), "프린트 중앙 서버 (작동 중)", menu)
-    icon.run(setup=setup_and_start)
\ No newline at end of file
+    icon.run(setup=setup_and_start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="프린트 중앙 과금 서버")
+    parser.add_argument("--headless", action="store_true", help="트레이 아이콘 없이 실행 (서비스/서버 전용 PC용)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="--headless 일 때 워커 프로세스 수")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    
+    if args.headless:
+        run_headless(max(1, args.workers), args.host, args.port)
+    else:
+        run_tray()
\ No newline at end of file
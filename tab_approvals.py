@@ -0,0 +1,154 @@
+# Manager_Console/tab_approvals.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QMessageBox, QInputDialog, QLabel, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QTimer, Signal, QSettings
+from PySide6.QtGui import QFont
+from constants import paper_size_name, CONSOLE_ACTOR
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 결재 대기함
+#  - 서버의 승인 대기열(/api/approvals/pending)만 보여주므로, 전체 로그를 훑지 않고 대기 건만 처리할 수 있습니다.
+#  - 여러 건을 골라 한 번에 승인/반려할 수 있으며, 다른 관리자가 먼저 처리한 건은 건너뛰고 알려줍니다.
+# ====================================================================
+SERVER_URL = "http://127.0.0.1:8000"
+
+class ApprovalsTab(QWidget):
+    refresh_requested = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.settings = QSettings("MyPrintMonitor", "ManagerConsole_Approvals")
+        self.init_ui()
+        self.load_data()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.load_data)
+        self.refresh_timer.start(10000)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        # --- 상단 컨트롤 패널 ---
+        top_layout = QHBoxLayout()
+        title_label = QLabel("📝 결재 대기함 (한도 초과 인쇄)")
+        title_font = QFont()
+        title_font.setBold(True)
+        title_font.setPointSize(14)
+        title_label.setFont(title_font)
+
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("font-size: 13px; color: #555; margin-right: 10px;")
+
+        approve_btn = QPushButton("✅ 선택 승인")
+        reject_btn = QPushButton("❌ 선택 반려")
+        btn_refresh = QPushButton("🔄 새로고침")
+        for btn, color in ((approve_btn, "#e8f5e9"), (reject_btn, "#ffebee"), (btn_refresh, "#e0f7fa")):
+            btn.setFixedSize(120, 40)
+            btn.setStyleSheet(f"font-weight: bold; font-size: 13px; background-color: {color}; border-radius: 5px;")
+        approve_btn.clicked.connect(lambda: self.decide_selected(True))
+        reject_btn.clicked.connect(lambda: self.decide_selected(False))
+        btn_refresh.clicked.connect(self.load_data)
+
+        top_layout.addWidget(title_label)
+        top_layout.addStretch()
+        top_layout.addWidget(self.count_label)
+        top_layout.addWidget(approve_btn)
+        top_layout.addWidget(reject_btn)
+        top_layout.addWidget(btn_refresh)
+        layout.addLayout(top_layout)
+
+        # --- 대기 목록 ---
+        self.table = QTableWidget()
+        self.table.setColumnCount(8)
+        self.table.setHorizontalHeaderLabels(["요청 시각", "사용자", "문서명", "프린터", "매수", "색상/용지", "예상 요금", "비고"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setAlternatingRowColors(True)
+
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        saved_state = self.settings.value("approvals_header_state")
+        if saved_state:
+            header.restoreState(saved_state)
+        else:
+            self.table.setColumnWidth(0, 150)
+            self.table.setColumnWidth(2, 260)
+            self.table.setColumnWidth(3, 160)
+        layout.addWidget(self.table)
+
+    def load_data(self):
+        import requests
+        try:
+            res = requests.get(f"{SERVER_URL}/api/approvals/pending", timeout=3)
+            if res.status_code == 403:
+                self.count_label.setText("🔒 서버 PC에서만 결재할 수 있습니다")
+                return
+            res.raise_for_status()
+            data = res.json()
+        except requests.exceptions.RequestException:
+            self.count_label.setText("⚪ 서버 연결 불가")
+            return
+
+        selected = {self.table.item(i.row(), 0).data(Qt.UserRole) for i in self.table.selectionModel().selectedRows()}
+        self.count_label.setText(f"대기 {data['count']:,}건")
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(data["items"]))
+        for row, item in enumerate(data["items"]):
+            pages = (item["total_pages"] or 0) * (item["copies"] or 1)
+            color_str = "컬러" if item["color_mode"] == 2 else "흑백"
+            cells = [
+                timeutil.format_ms(item["request_time"]), item["os_user"] or "", item["file_name"] or "",
+                item["printer_name"] or "", f"{pages:,}장", f"{color_str} / {paper_size_name(item['paper_size'])}",
+                f"{item['calculated_price'] or 0:,}원", item["remark"] or "",
+            ]
+            for col, text in enumerate(cells):
+                cell = QTableWidgetItem(text)
+                if col in (4, 6): cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, cell)
+            self.table.item(row, 0).setData(Qt.UserRole, item["log_id"])
+            if item["log_id"] in selected: self.table.selectRow(row)
+
+    def decide_selected(self, approve: bool):
+        import requests
+        log_ids = [self.table.item(i.row(), 0).data(Qt.UserRole) for i in self.table.selectionModel().selectedRows()]
+        if not log_ids:
+            QMessageBox.information(self, "알림", "처리할 항목을 선택하세요.")
+            return
+
+        action = "승인" if approve else "반려"
+        if approve:
+            if QMessageBox.question(self, "승인 확인", f"선택한 {len(log_ids)}건의 인쇄를 승인하시겠습니까?", QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+                return
+            reason = "관리자 승인"
+        else:
+            reason, ok = QInputDialog.getText(self, "반려 사유", f"선택한 {len(log_ids)}건의 반려 사유를 입력하세요:", text="관리자 반려")
+            if not ok: return
+
+        done, skipped = 0, []
+        try:
+            for log_id in log_ids:
+                res = requests.post(f"{SERVER_URL}/api/approvals/{log_id}/decide", json={"approve": approve, "reason": reason, "actor": CONSOLE_ACTOR}, timeout=3)
+                if res.status_code == 200: done += 1
+                elif res.status_code == 403:
+                    # 결재는 서버 PC(127.0.0.1)에서 실행한 콘솔에서만 허용됨 - 나머지 건도 같은 결과이므로 중단
+                    QMessageBox.warning(self, "권한 없음", res.json().get("detail", "서버 PC에서만 결재할 수 있습니다."))
+                    break
+                else: skipped.append(f"ID {log_id}: {res.json().get('detail', res.status_code)}")
+        except requests.exceptions.RequestException as e:
+            QMessageBox.critical(self, "통신 오류", f"중앙 서버(FastAPI)와 연결할 수 없습니다.\n{e}")
+
+        if skipped:
+            QMessageBox.warning(self, "일부 건너뜀", f"{done}건 {action} 완료.\n다음 항목은 이미 처리되었거나 찾을 수 없습니다:\n" + "\n".join(skipped))
+        elif done:
+            QMessageBox.information(self, "성공", f"{done}건을 {action} 처리했습니다.")
+        if done or skipped:
+            self.refresh_requested.emit()  # 로그/통계 탭도 함께 갱신
+
+    def closeEvent(self, event):
+        self.settings.setValue("approvals_header_state", self.table.horizontalHeader().saveState())
+        super().closeEvent(event)
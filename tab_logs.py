@@ -1,15 +1,73 @@
 # Manager_Console/tab_logs.py
-import os
-import sqlite3
-import requests
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, 
     QTableWidgetItem, QHeaderView, QMenu, QMessageBox, QInputDialog, QLabel,
-    QAbstractItemView
+    QAbstractItemView, QLineEdit, QDialog
 )
 from PySide6.QtCore import Qt, QTimer, Signal, QSettings
 from PySide6.QtGui import QColor, QBrush, QFont
-from constants import DB_PATH
+from constants import paper_size_name, CONSOLE_ACTOR
+import audit
+import database
+import timeutil
+
+# ====================================================================
+# 🌟 [신규] 로그 변경 이력 창 - 열릴 때 서버에서 해당 로그의 이력만 읽어 옴
+# ====================================================================
+class LogHistoryDialog(QDialog):
+    def __init__(self, log_id, file_name, parent=None):
+        super().__init__(parent)
+        self.log_id = log_id
+        self.setWindowTitle(f"변경 이력 - LogID {log_id}")
+        self.resize(760, 320)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"📄 {file_name}"))
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels(["시각", "처리자", "작업", "상태", "요금", "사유"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        btn_close = QPushButton("닫기")
+        btn_close.clicked.connect(self.accept)
+        layout.addWidget(btn_close, alignment=Qt.AlignRight)
+
+    def load(self) -> bool:
+        import requests
+        try:
+            res = requests.get(f"http://127.0.0.1:8000/api/print-log/{self.log_id}/events", timeout=3)
+            if res.status_code != 200:
+                QMessageBox.warning(self.parent(), "실패", f"변경 이력을 불러오지 못했습니다: {res.text}")
+                return False
+        except requests.exceptions.RequestException as e:
+            QMessageBox.critical(self.parent(), "통신 오류", f"중앙 서버(FastAPI)와 연결할 수 없습니다.\n{e}")
+            return False
+
+        items = res.json().get("items", [])
+        self.table.setRowCount(max(len(items), 1))
+        if not items:
+            self.table.setSpan(0, 0, 1, 6)
+            self.table.setItem(0, 0, QTableWidgetItem("변경 이력이 없습니다."))
+            return True
+        for row, e in enumerate(items):
+            status = " → ".join(v for v in (e["old_status"], e["new_status"]) if v)
+            if e["old_price"] is None or e["old_price"] == e["new_price"]:
+                price = "" if e["new_price"] is None else f"{e['new_price']:,}원"
+            else:
+                price = f"{e['old_price']:,}원" + ("" if e["new_price"] is None else f" → {e['new_price']:,}원")
+            values = [timeutil.format_ms(e["event_time"]), e["actor"], audit.ACTIONS.get(e["action"], e["action"]),
+                      status, price, e["reason"] or ""]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        return True
+
+# 표에 그리는 행의 컬럼 순서 (DB 조회·서버 API 결과 공통)
+ROW_COLUMNS = ("id", "log_time", "os_user", "file_name", "printer_name", "total_pages", "remark",
+               "color_mode", "paper_size", "calculated_price", "print_status", "uuid")
 
 class TabLogs(QWidget):
     # 🌟 [복구] 메인 윈도우에 새로고침 신호를 전달할 전역 시그널
@@ -20,6 +78,16 @@ class TabLogs(QWidget):
         # 🌟 [UX 향상] 컬럼 너비 상태 저장을 위한 QSettings 객체 초기화
         self.settings = QSettings("MyPrintMonitor", "ManagerConsole_Logs")
         self.is_edit_mode = False # 🌟 [복구] 수정 모드 상태 변수
+        self.search_page = 1
+        # 🌟 [신규] 사용자/프린터별 모아보기 상태 (None 이면 최신 로그 보기)
+        self.drill = None          # {"label": 표시 이름, "params": 서버 조회 조건}
+        self.drill_cursors = [None]  # 지금까지 지나온 페이지들의 시작 커서 (이전 페이지 이동용)
+        self.drill_next = None
+        # 🌟 [신규] 검색어 입력이 멈춘 뒤에만 서버에 검색 요청 (타이핑 중 매 글자마다 조회하지 않음)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.start_search)
         self.init_ui()
         
         self.refresh_timer = QTimer(self)
@@ -49,8 +117,35 @@ class TabLogs(QWidget):
         # 단일 탭 새로고침이 아닌, 메인 윈도우 전체 새로고침 시그널 발송
         btn_refresh.clicked.connect(self.refresh_requested.emit) 
         
+        # 🌟 [신규] 문서명·사용자·프린터 검색창 (비우면 최신 500건 보기로 돌아감)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("🔍 문서명 / 사용자 / 프린터 검색")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedSize(280, 34)
+        self.search_box.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_box.returnPressed.connect(self.start_search)
+
+        self.prev_btn = QPushButton("◀")
+        self.next_btn = QPushButton("▶")
+        for btn in (self.prev_btn, self.next_btn):
+            btn.setFixedSize(34, 34)
+            btn.setVisible(False)
+        self.prev_btn.clicked.connect(lambda: self.change_page(-1))
+        self.next_btn.clicked.connect(lambda: self.change_page(1))
+        self.clear_drill_btn = QPushButton("✖ 모아보기 해제")
+        self.clear_drill_btn.setFixedHeight(34)
+        self.clear_drill_btn.setVisible(False)
+        self.clear_drill_btn.clicked.connect(lambda: self.set_drill(None))
+        self.search_label = QLabel("")
+        self.search_label.setStyleSheet("font-size: 12px; color: #555;")
+
         top_layout.addWidget(title_label)
         top_layout.addStretch()
+        top_layout.addWidget(self.search_label)
+        top_layout.addWidget(self.prev_btn)
+        top_layout.addWidget(self.next_btn)
+        top_layout.addWidget(self.clear_drill_btn)
+        top_layout.addWidget(self.search_box)
         top_layout.addWidget(self.edit_btn)
         top_layout.addWidget(btn_refresh)
         layout.addLayout(top_layout)
@@ -65,6 +160,7 @@ class TabLogs(QWidget):
         
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
+        self.table.cellDoubleClicked.connect(self.open_history) # 🌟 [신규] 행을 열면 변경 이력 표시
         
         # 🌟 [핵심 변경 사항: 컬럼 리사이즈 및 캐싱 로직]
         header = self.table.horizontalHeader()
@@ -102,80 +198,149 @@ class TabLogs(QWidget):
             self.edit_btn.setStyleSheet("background-color: #f0f0f0; font-weight: bold; font-size: 13px; border-radius: 5px;")
         self.load_data()
 
+    def start_search(self):
+        self.search_timer.stop()
+        self.search_page = 1
+        self.load_data()
+
+    def change_page(self, step: int):
+        if self.search_box.text().strip():
+            self.search_page = max(1, self.search_page + step)
+        elif self.drill:
+            if step > 0 and self.drill_next: self.drill_cursors.append(self.drill_next)
+            elif step < 0 and len(self.drill_cursors) > 1: self.drill_cursors.pop()
+        self.load_data()
+
+    def set_drill(self, drill):
+        self.drill, self.drill_cursors, self.drill_next = drill, [None], None
+        self.clear_drill_btn.setVisible(drill is not None)
+        self.load_data()
+
     def load_data(self):
-        if not os.path.exists(DB_PATH): return
+        if self.search_box.text().strip():
+            return self.load_search_results()
+        if self.drill:
+            return self.load_drill_results()
+        for widget in (self.prev_btn, self.next_btn): widget.setVisible(False)
+        self.search_label.setText("")
+        if not database.is_available(): return
             
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("""
+            rows = database.fetch_all("""
                 SELECT id, log_time, os_user, file_name, printer_name, 
                        total_pages, remark, color_mode, paper_size, 
-                       calculated_price, print_status 
-                FROM PrintLogs 
+                       calculated_price, print_status, uuid 
+                FROM PrintLogsView 
                 ORDER BY log_time DESC LIMIT 500
             """)
-            rows = cursor.fetchall()
-            conn.close()
+            self.render_rows(rows)
+        except Exception as e:
+            QMessageBox.critical(self, "데이터 로드 오류", f"데이터베이스를 불러오는 중 문제가 발생했습니다.\n{e}")
 
-            self.table.setRowCount(0)
+    # 🌟 [신규] 서버 전문 검색 결과 (관련도순, 페이지 단위)
+    def load_search_results(self):
+        import requests
+        query = self.search_box.text().strip()
+        try:
+            res = requests.get("http://127.0.0.1:8000/api/print-log/search", params={"q": query, "page": self.search_page}, timeout=5)
+            res.raise_for_status()
+            result = res.json()
+        except requests.exceptions.RequestException as e:
+            self.search_label.setText(f"⚠️ 검색 실패 ({e.__class__.__name__}) - 서버 상태를 확인하세요.")
+            return
+
+        self.render_rows([tuple(item[c] for c in ROW_COLUMNS) for item in result["items"]])
+        self.prev_btn.setVisible(True); self.next_btn.setVisible(True)
+        self.prev_btn.setEnabled(result["page"] > 1)
+        self.next_btn.setEnabled(result["has_more"])
+        first = (result["page"] - 1) * result["page_size"]
+        if result["items"]:
+            self.search_label.setText(f"검색 결과 {first + 1:,}~{first + len(result['items']):,}건{' (더 있음)' if result['has_more'] else ''}")
+        else:
+            self.search_label.setText("검색 결과 없음")
+
+    # 🌟 [신규] 사용자/프린터별 모아보기 (서버 조건 조회 API, 커서 기반 페이지)
+    def load_drill_results(self):
+        import requests
+        params = dict(self.drill["params"], limit=500)
+        if self.drill_cursors[-1]: params["cursor"] = self.drill_cursors[-1]
+        try:
+            res = requests.get("http://127.0.0.1:8000/api/print-logs", params=params, timeout=5)
+            res.raise_for_status()
+            result = res.json()
+        except requests.exceptions.RequestException as e:
+            self.search_label.setText(f"⚠️ 조회 실패 ({e.__class__.__name__}) - 서버 상태를 확인하세요.")
+            return
+
+        self.drill_next = result["next_cursor"]
+        self.render_rows([tuple(item[c] for c in ROW_COLUMNS) for item in result["items"]])
+        self.prev_btn.setVisible(True); self.next_btn.setVisible(True)
+        self.prev_btn.setEnabled(len(self.drill_cursors) > 1)
+        self.next_btn.setEnabled(self.drill_next is not None)
+        self.search_label.setText(f"{self.drill['label']} - {len(self.drill_cursors)}페이지")
+
+    def render_rows(self, rows):
+        self.table.setRowCount(0)
+        
+        for row_idx, row_data in enumerate(rows):
+            self.table.insertRow(row_idx)
             
-            for row_idx, row_data in enumerate(rows):
-                self.table.insertRow(row_idx)
-                
-                log_id, log_time, os_user, file_name, printer_name, total_pages, remark, color_mode, paper_size, price, status = row_data
-                color_str = "컬러" if color_mode == 2 else ("흑백" if color_mode == 1 else "알수없음")
-                paper_str = "A3" if paper_size == 8 else ("A4" if paper_size == 9 else "기타")
-                
-                # 🌟 [복구] 삭제 모드일 경우 LogID 칸에 삭제 버튼 삽입
-                if self.is_edit_mode:
-                    del_btn = QPushButton("🗑️ 삭제")
-                    del_btn.setStyleSheet("color: red; border: 1px solid red; border-radius: 3px; font-weight: bold;")
-                    del_btn.setCursor(Qt.PointingHandCursor)
-                    del_btn.clicked.connect(lambda checked=False, lid=log_id: self.delete_log(lid))
-                    self.table.setCellWidget(row_idx, 0, del_btn)
-                else:
-                    id_item = QTableWidgetItem(str(log_id))
-                    id_item.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(row_idx, 0, id_item)
-
-                items = [
-                    QTableWidgetItem(str(log_time)[:19]), QTableWidgetItem(str(os_user)),
-                    QTableWidgetItem(str(file_name)), QTableWidgetItem(str(printer_name)),
-                    QTableWidgetItem(f"{total_pages}장"), QTableWidgetItem(str(remark) if remark else "-"),
-                    QTableWidgetItem(color_str), QTableWidgetItem(paper_str),
-                    QTableWidgetItem(f"{price:,} 원" if price is not None else "0 원"), QTableWidgetItem(str(status))
-                ]
-                
-                for col_idx, item in enumerate(items, start=1): # 0번(LogID)은 제외하고 매핑
-                    item.setTextAlignment(Qt.AlignCenter)
-                    if status and "승인 대기" in status:
-                        item.setForeground(QBrush(QColor("darkorange")))
-                        font = item.font(); font.setBold(True); item.setFont(font)
-                    elif status and ("반려" in status or "취소" in status):
-                        item.setForeground(QBrush(QColor("red")))
-                    elif status and ("조정" in status or "환불" in status):
-                        item.setForeground(QBrush(QColor("blue")))
-                        
-                    self.table.setItem(row_idx, col_idx, item)
+            log_id, log_time, os_user, file_name, printer_name, total_pages, remark, color_mode, paper_size, price, status, uuid = row_data
+            color_str = "컬러" if color_mode == 2 else ("흑백" if color_mode == 1 else "알수없음")
+            paper_str = paper_size_name(paper_size)
+            
+            # 🌟 [복구] 삭제 모드일 경우 LogID 칸에 삭제 버튼 삽입
+            if self.is_edit_mode:
+                del_btn = QPushButton("🗑️ 삭제")
+                del_btn.setStyleSheet("color: red; border: 1px solid red; border-radius: 3px; font-weight: bold;")
+                del_btn.setCursor(Qt.PointingHandCursor)
+                del_btn.clicked.connect(lambda checked=False, lid=log_id: self.delete_log(lid))
+                self.table.setCellWidget(row_idx, 0, del_btn)
+            else:
+                id_item = QTableWidgetItem(str(log_id))
+                id_item.setTextAlignment(Qt.AlignCenter)
+                self.table.setItem(row_idx, 0, id_item)
 
-        except Exception as e:
-            QMessageBox.critical(self, "데이터 로드 오류", f"데이터베이스를 불러오는 중 문제가 발생했습니다.\n{e}")
+            items = [
+                QTableWidgetItem(timeutil.format_ms(log_time)), QTableWidgetItem(str(os_user)),
+                QTableWidgetItem(str(file_name)), QTableWidgetItem(str(printer_name)),
+                QTableWidgetItem(f"{total_pages}장"), QTableWidgetItem(str(remark) if remark else "-"),
+                QTableWidgetItem(color_str), QTableWidgetItem(paper_str),
+                QTableWidgetItem(f"{price:,} 원" if price is not None else "0 원"), QTableWidgetItem(str(status))
+            ]
+            
+            items[1].setData(Qt.UserRole, uuid)  # 사용자별 모아보기용
+            
+            for col_idx, item in enumerate(items, start=1): # 0번(LogID)은 제외하고 매핑
+                item.setTextAlignment(Qt.AlignCenter)
+                if status and "승인 대기" in status:
+                    item.setForeground(QBrush(QColor("darkorange")))
+                    font = item.font(); font.setBold(True); item.setFont(font)
+                elif status and ("반려" in status or "취소" in status):
+                    item.setForeground(QBrush(QColor("red")))
+                elif status and ("조정" in status or "환불" in status):
+                    item.setForeground(QBrush(QColor("blue")))
+                    
+                self.table.setItem(row_idx, col_idx, item)
 
     # 🌟 [복구] 개별 데이터 영구 삭제 로직
     def delete_log(self, log_id):
+        import requests  # 콘솔 기동 속도를 위해 서버 호출 시점에 로드
         reply = QMessageBox.question(self, "삭제 확인", f"LogID {log_id} 데이터를 완전히 삭제하시겠습니까?\n이 작업은 되돌릴 수 없으며 과금 통계에서도 제외됩니다.", QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
+            # 🌟 [변경] 과금 원장도 함께 차감되도록 서버 API를 통해 삭제
             try:
-                conn = sqlite3.connect(DB_PATH)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM PrintLogs WHERE id=?", (log_id,))
-                conn.commit()
-                conn.close()
-                QMessageBox.information(self, "삭제 완료", "데이터가 영구적으로 삭제되었습니다.")
-                self.refresh_requested.emit() # 전체 화면 갱신 시그널
-            except Exception as e:
-                QMessageBox.critical(self, "오류", f"데이터 삭제 실패: {e}")
+                res = requests.delete(f"http://127.0.0.1:8000/api/print-log/{log_id}", params={"actor": CONSOLE_ACTOR}, timeout=3)
+                if res.status_code == 200:
+                    QMessageBox.information(self, "삭제 완료", "데이터가 영구적으로 삭제되었습니다.")
+                    self.refresh_requested.emit() # 전체 화면 갱신 시그널
+                elif res.status_code == 403:
+                    # 삭제는 서버 PC(127.0.0.1)에서 실행한 콘솔에서만 허용됨
+                    QMessageBox.warning(self, "권한 없음", res.json().get("detail", "서버 PC에서만 삭제할 수 있습니다."))
+                else:
+                    QMessageBox.warning(self, "실패", f"데이터 삭제 실패: {res.text}")
+            except requests.exceptions.RequestException as e:
+                QMessageBox.critical(self, "통신 오류", f"중앙 서버(FastAPI)와 연결할 수 없습니다.\n{e}")
 
     def show_context_menu(self, position):
         if self.is_edit_mode: return # 수정 모드일 때는 우클릭 방지
@@ -192,6 +357,7 @@ class TabLogs(QWidget):
         file_name_item = self.table.item(row, 3)
         current_status = status_item.text()
         file_name = file_name_item.text()
+        user_item, printer_item = self.table.item(row, 2), self.table.item(row, 4)
 
         menu = QMenu()
         if "승인 대기" in current_status:
@@ -199,6 +365,10 @@ class TabLogs(QWidget):
             action_reject = menu.addAction("❌ 인쇄 반려 (대기열 파기)")
         else:
             action_refund = menu.addAction("💰 과금 단가 수동 조정 (환불/할인)")
+        menu.addAction("📜 변경 이력 보기")
+        menu.addSeparator()
+        menu.addAction("👤 이 사용자의 로그만 보기")
+        menu.addAction("🖨️ 이 프린터의 로그만 보기")
 
         action = menu.exec(self.table.viewport().mapToGlobal(position))
         if action:
@@ -210,42 +380,50 @@ class TabLogs(QWidget):
                     self.update_print_status(log_id, "반려됨", "관리자 반려")
             elif action.text() == "💰 과금 단가 수동 조정 (환불/할인)":
                 self.handle_refund(log_id)
+            elif action.text() == "📜 변경 이력 보기":
+                self.open_history(row)
+            elif action.text() == "👤 이 사용자의 로그만 보기":
+                self.search_box.clear()
+                self.set_drill({"label": f"👤 {user_item.text()} 의 로그", "params": {"uuid": user_item.data(Qt.UserRole)}})
+            elif action.text() == "🖨️ 이 프린터의 로그만 보기":
+                self.search_box.clear()
+                self.set_drill({"label": f"🖨️ {printer_item.text()} 의 로그", "params": {"printer": printer_item.text()}})
 
-    def update_print_status(self, log_id, status, reason):
-        # 🌟 [복구] Double Action 방어 로직: DB를 한 번 더 체크하여 중복 승인 방지
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("SELECT print_status FROM PrintLogs WHERE id=?", (log_id,))
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row and row[0] != "승인 대기" and status in ["승인 완료", "반려됨"]:
-                QMessageBox.warning(self, "경고", "해당 인쇄물은 이미 승인되거나 처리된 항목입니다.")
-                self.refresh_requested.emit()
-                return
-        except Exception as e:
-            pass # DB 체크 실패 시에도 다음 단계로 진행 (안전망)
+    def open_history(self, row, column=None):
+        if self.is_edit_mode: return
+        log_id_item, file_name_item = self.table.item(row, 0), self.table.item(row, 3)
+        if not log_id_item: return
+        dialog = LogHistoryDialog(int(log_id_item.text()), file_name_item.text() if file_name_item else "", self)
+        if dialog.load(): dialog.exec()
 
+    def update_print_status(self, log_id, status, reason):
+        import requests
+        # 🌟 [변경] 중복 결재 방어는 서버의 조건부 결재(대기 중일 때만 변경)가 담당 - 먼저 처리된 건은 409 로 거절됨
         try:
-            url = f"http://127.0.0.1:8000/api/print-log/status-update"
-            res = requests.post(url, json={"log_id": log_id, "status": status, "reason": reason}, timeout=3)
+            url = f"http://127.0.0.1:8000/api/approvals/{log_id}/decide"
+            res = requests.post(url, json={"approve": status == "승인 완료", "reason": reason, "actor": CONSOLE_ACTOR}, timeout=3)
             if res.status_code == 200:
                 QMessageBox.information(self, "성공", f"정상적으로 [{status}] 처리되었습니다.")
                 self.refresh_requested.emit() # 완료 후 전체 갱신
+            elif res.status_code in (404, 409):
+                QMessageBox.warning(self, "경고", f"해당 인쇄물은 이미 승인되거나 처리된 항목입니다.\n{res.json().get('detail', '')}")
+                self.refresh_requested.emit()
+            elif res.status_code == 403:
+                QMessageBox.warning(self, "권한 없음", res.json().get("detail", "서버 PC에서만 결재할 수 있습니다."))
             else:
                 QMessageBox.warning(self, "실패", "서버가 요청을 거부했습니다.")
         except requests.exceptions.RequestException as e:
             QMessageBox.critical(self, "통신 오류", f"중앙 서버(FastAPI)와 연결할 수 없습니다.\n{e}")
 
     def handle_refund(self, log_id):
+        import requests
         new_price, ok = QInputDialog.getInt(self, "단가 수동 조정", "변경할 최종 요금을 입력하세요 (0원=전액 환불):", 0, 0, 9999999, 10)
         if ok:
             reason, ok2 = QInputDialog.getText(self, "조정 사유", "조정 사유를 입력하세요:")
             if ok2:
                 try:
                     url = f"http://127.0.0.1:8000/api/print-log/{log_id}/refund"
-                    res = requests.post(url, json={"new_price": new_price, "reason": reason}, timeout=3)
+                    res = requests.post(url, json={"new_price": new_price, "reason": reason, "actor": CONSOLE_ACTOR}, timeout=3)
                     if res.status_code == 200:
                         QMessageBox.information(self, "성공", f"요금이 {new_price:,}원으로 변경되었습니다.")
                         self.refresh_requested.emit() # 환불 후 전체 통계 즉시 갱신
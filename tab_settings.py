@@ -1,10 +1,27 @@
 # Manager_Console/tab_settings.py
-import sqlite3
-import os
+import json
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QDate
 from PySide6.QtGui import QFont
-from constants import DB_PATH
+from sqlalchemy.exc import DBAPIError
+from constants import PAPER_SIZES, DEFAULT_PAPER_SIZE, paper_size_name
+import calculator
+import database
+import timeutil
+
+# 단가표 그리드 컬럼 (용지명 컬럼은 표시 전용)
+PRICING_COLUMNS = ["용지 코드", "용지명", "흑백 단가(원)", "컬러 단가(원)", "흑백 배수", "컬러 배수", "양면 요율(%)"]
+PRICING_FIELDS = ["paper_size", None, "base_mono_price", "base_color_price", "multiplier", "color_multiplier", "duplex_percent"]
+
+def version_rates_at(conn, when: int):
+    """when 시각(epoch 밀리초)에 유효한 요금 정책 버전의 단가 목록 (calculator.price_book.resolve 와 같은 규칙, 버전이 없으면 None)"""
+    row = conn.execute(database.sql("""
+        SELECT rates_json FROM PricingPolicyVersions WHERE effective_from <= :when
+        ORDER BY effective_from DESC, id DESC LIMIT 1
+    """), {"when": when}).first()
+    if row is None:  # 첫 버전 이전 시각은 첫 버전으로 간주
+        row = conn.execute(database.sql("SELECT rates_json FROM PricingPolicyVersions ORDER BY effective_from, id LIMIT 1")).first()
+    return json.loads(row[0]) if row else None
 
 class SettingsTab(QWidget):
     refresh_requested = Signal()
@@ -16,17 +33,40 @@ class SettingsTab(QWidget):
         # --- 1. 요금 정책 설정 영역 ---
         group_pricing = QGroupBox("💰 용지별 과금 단가 설정")
         group_pricing.setFont(QFont("Arial", 12, QFont.Bold))
-        form_pricing = QFormLayout(group_pricing)
+        pricing_layout = QVBoxLayout(group_pricing)
         
-        self.input_a4_mono = QLineEdit()
-        self.input_a4_color = QLineEdit()
-        self.input_a3_mono_multi = QLineEdit() 
-        self.input_a3_color_multi = QLineEdit() 
-
-        form_pricing.addRow("A4 흑백 기본 단가 (원):", self.input_a4_mono)
-        form_pricing.addRow("A4 컬러 기본 단가 (원):", self.input_a4_color)
-        form_pricing.addRow("A3 흑백 요금 가중치 (배수):", self.input_a3_mono_multi)
-        form_pricing.addRow("A3 컬러 요금 가중치 (배수):", self.input_a3_color_multi)
+        # 🌟 [변경] A4/A3 고정 입력칸 대신 모든 용지 코드(DEVMODE)를 편집하는 단가표 그리드
+        #  - 1장 요금 = 단가 * 배수, 양면 인쇄는 여기에 양면 요율(%)을 곱함
+        #  - 코드 0(기본) 행은 단가표에 없는 용지에 적용되며 삭제할 수 없음
+        self.table_pricing = QTableWidget()
+        self.table_pricing.setColumnCount(len(PRICING_COLUMNS))
+        self.table_pricing.setHorizontalHeaderLabels(PRICING_COLUMNS)
+        self.table_pricing.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_pricing.verticalHeader().setVisible(False)
+        self.table_pricing.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_pricing.setMinimumHeight(180)
+        pricing_layout.addWidget(self.table_pricing)
+        
+        pricing_btn_layout = QHBoxLayout()
+        btn_add_paper = QPushButton("➕ 용지 추가")
+        btn_add_paper.clicked.connect(self.add_pricing_row)
+        btn_remove_paper = QPushButton("➖ 선택 용지 삭제")
+        btn_remove_paper.clicked.connect(self.remove_pricing_row)
+        pricing_btn_layout.addWidget(btn_add_paper)
+        pricing_btn_layout.addWidget(btn_remove_paper)
+        pricing_btn_layout.addStretch()
+        pricing_layout.addLayout(pricing_btn_layout)
+        
+        form_pricing = QFormLayout()
+        pricing_layout.addLayout(form_pricing)
+        
+        # 🌟 [신규] 요금 정책은 버전으로 저장되며, 적용 시작일 이후의 인쇄부터 새 단가가 적용됨
+        self.input_effective_date = QDateEdit()
+        self.input_effective_date.setCalendarPopup(True)
+        self.input_effective_date.setDisplayFormat("yyyy-MM-dd")
+        self.input_effective_date.setMinimumDate(QDate.currentDate())
+        self.input_effective_date.setDate(QDate.currentDate())
+        form_pricing.addRow("새 단가 적용 시작일 :", self.input_effective_date)
         
         layout.addWidget(group_pricing)
 
@@ -40,12 +80,53 @@ class SettingsTab(QWidget):
         self.input_control_color = QLineEdit()
         self.input_control_color.setPlaceholderText("빈칸 시 무제한")
         
+        # 🌟 [신규] 서버 측 한도 판정 기준 (건당 / 일 누적 / 월 누적) 및 초과 시 처리 방식
+        self.combo_quota_period = QComboBox()
+        self.combo_quota_period.addItem("건당 (인쇄 1건의 페이지 수)", "job")
+        self.combo_quota_period.addItem("일 누적 (오늘 사용량 포함)", "day")
+        self.combo_quota_period.addItem("월 누적 (이번 달 사용량 포함)", "month")
+        self.combo_quota_action = QComboBox()
+        self.combo_quota_action.addItem("관리자 승인 요청", "approval")
+        self.combo_quota_action.addItem("즉시 차단", "deny")
+        
+        self.input_retention_days = QLineEdit()
+        self.input_retention_days.setPlaceholderText("기본 730일 (경과 로그는 연도별 아카이브로 이동)")
+        
         form_control.addRow("흑백 인쇄 최대 허용(장) :", self.input_control_mono)
         form_control.addRow("컬러 인쇄 최대 허용(장) :", self.input_control_color)
+        form_control.addRow("한도 적용 기준 :", self.combo_quota_period)
+        form_control.addRow("한도 초과 시 처리 :", self.combo_quota_action)
+        form_control.addRow("로그 보관 기간(일) :", self.input_retention_days)
         
         layout.addWidget(group_control)
         
-        # --- 3. 저장 버튼 영역 ---
+        # --- 3. 🌟 [신규] 기간 요금 일괄 재계산 영역 ---
+        group_reprice = QGroupBox("🔁 기간 요금 일괄 재계산 (인쇄 시점 단가 기준)")
+        group_reprice.setFont(QFont("Arial", 12, QFont.Bold))
+        reprice_layout = QHBoxLayout(group_reprice)
+        
+        self.reprice_start = QDateEdit()
+        self.reprice_start.setCalendarPopup(True)
+        self.reprice_start.setDisplayFormat("yyyy-MM-dd")
+        self.reprice_start.setDate(QDate(QDate.currentDate().year(), QDate.currentDate().month(), 1))
+        self.reprice_end = QDateEdit()
+        self.reprice_end.setCalendarPopup(True)
+        self.reprice_end.setDisplayFormat("yyyy-MM-dd")
+        self.reprice_end.setDate(QDate.currentDate())
+        
+        btn_reprice = QPushButton("🔍 변경 내역 미리보기 후 적용")
+        btn_reprice.clicked.connect(self.reprice_period)
+        
+        reprice_layout.addWidget(QLabel("재계산 기간 :"))
+        reprice_layout.addWidget(self.reprice_start)
+        reprice_layout.addWidget(QLabel("~"))
+        reprice_layout.addWidget(self.reprice_end)
+        reprice_layout.addStretch()
+        reprice_layout.addWidget(btn_reprice)
+        
+        layout.addWidget(group_reprice)
+        
+        # --- 4. 저장 버튼 영역 ---
         btn_layout = QHBoxLayout()
         btn_layout.addStretch()
         
@@ -60,64 +141,185 @@ class SettingsTab(QWidget):
         
         self.load_data()
 
+    def _set_pricing_row(self, row_idx, values):
+        for col_idx, field in enumerate(PRICING_FIELDS):
+            if field is None:
+                item = QTableWidgetItem(paper_size_name(values["paper_size"]))
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            else:
+                item = QTableWidgetItem(str(values.get(field) if values.get(field) is not None else ""))
+                if field == "paper_size": item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            item.setTextAlignment(Qt.AlignCenter)
+            self.table_pricing.setItem(row_idx, col_idx, item)
+
+    def _pricing_codes(self):
+        return [int(self.table_pricing.item(r, 0).text()) for r in range(self.table_pricing.rowCount())]
+
+    def add_pricing_row(self):
+        existing = set(self._pricing_codes())
+        choices = [f"{code} - {name}" for code, name in PAPER_SIZES.items() if code not in existing] + ["직접 입력 (사용자 정의 코드)"]
+        choice, ok = QInputDialog.getItem(self, "용지 추가", "추가할 용지를 선택하세요:", choices, 0, False)
+        if not ok: return
+        if choice.startswith("직접 입력"):
+            code, ok = QInputDialog.getInt(self, "용지 코드 입력", "DEVMODE 용지 코드(dmPaperSize)를 입력하세요:", 256, 1, 99999)
+            if not ok: return
+        else:
+            code = int(choice.split(" - ")[0])
+        if code in existing:
+            QMessageBox.warning(self, "경고", "이미 단가표에 있는 용지입니다.")
+            return
+        
+        # 새 용지는 기본 행(0)의 단가를 복사해서 시작
+        defaults = {"base_mono_price": 50, "base_color_price": 150, "multiplier": 1, "color_multiplier": 1, "duplex_percent": 100}
+        if DEFAULT_PAPER_SIZE in existing:
+            src = self._pricing_codes().index(DEFAULT_PAPER_SIZE)
+            defaults = {f: self.table_pricing.item(src, i).text() for i, f in enumerate(PRICING_FIELDS) if f and f != "paper_size"}
+        row_idx = self.table_pricing.rowCount()
+        self.table_pricing.insertRow(row_idx)
+        self._set_pricing_row(row_idx, {"paper_size": code, **defaults})
+
+    def remove_pricing_row(self):
+        row_idx = self.table_pricing.currentRow()
+        if row_idx < 0: return
+        if int(self.table_pricing.item(row_idx, 0).text()) == DEFAULT_PAPER_SIZE:
+            QMessageBox.warning(self, "경고", "기본(미등록 용지) 행은 삭제할 수 없습니다.")
+            return
+        self.table_pricing.removeRow(row_idx)
+
     def save_data(self):
-        if not os.path.exists(DB_PATH): return
+        if not database.is_available(): return
         try:
-            mono = int(self.input_a4_mono.text().strip())
-            color = int(self.input_a4_color.text().strip())
-            mono_multi = int(self.input_a3_mono_multi.text().strip())
-            color_multi = int(self.input_a3_color_multi.text().strip())
+            # 그리드의 모든 행을 검증한 뒤 한 번에 저장
+            pricing_rows = []
+            for r in range(self.table_pricing.rowCount()):
+                values = {}
+                for col_idx, field in enumerate(PRICING_FIELDS):
+                    if field is None: continue
+                    values[field] = int(self.table_pricing.item(r, col_idx).text().strip())
+                pricing_rows.append(values)
             
             # 제한 없음(빈칸) 처리 -> DB에는 999999로 저장
             c_val = self.input_control_color.text().strip()
             m_val = self.input_control_mono.text().strip()
             control_color = int(c_val) if c_val.isdigit() else 999999
             control_mono = int(m_val) if m_val.isdigit() else 999999
+            r_val = self.input_retention_days.text().strip()
+            retention_days = int(r_val) if r_val.isdigit() and int(r_val) > 0 else 730
 
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            # 🌟 새 ORM 컬럼명으로 저장 (base_mono_price, color_limit 등)
-            cursor.execute("UPDATE PricingPolicy SET base_mono_price=?, base_color_price=? WHERE paper_size=9", (mono, color))
-            cursor.execute("UPDATE PricingPolicy SET base_mono_price=?, base_color_price=?, multiplier=?, color_multiplier=? WHERE paper_size=8", (mono, color, mono_multi, color_multi))
-            
-            cursor.execute("UPDATE PrintControlPolicy SET color_limit=?, mono_limit=? WHERE id=1", (control_color, control_mono))
+            # 🌟 [신규] 요금 정책 전체를 새 버전으로 기록 (오늘이면 즉시, 이후 날짜면 그날 0시부터 적용)
+            effective_date = self.input_effective_date.date()
+            applies_now = effective_date <= QDate.currentDate()
+            if applies_now:
+                effective_from = timeutil.now_ms()
+            else:
+                effective_from = timeutil.date_ms(effective_date.toString("yyyy-MM-dd"))
             
-            conn.commit(); conn.close()
+            with database.transaction() as conn:
+                # 🌟 [변경] 적용 시점에 유효한 버전과 단가가 같으면 새 버전을 만들지 않음 (한도 등 통제 정책만 저장한 경우)
+                current = version_rates_at(conn, effective_from)
+                rates_changed = current is None or calculator.matrix_from_rates(current) != calculator.matrix_from_rates(pricing_rows)
+                if rates_changed:
+                    conn.execute(
+                        database.sql("INSERT INTO PricingPolicyVersions (effective_from, created_at, rates_json) VALUES (:effective_from, :created_at, :rates_json)"),
+                        {"effective_from": effective_from, "created_at": timeutil.now_ms(), "rates_json": json.dumps(pricing_rows)}
+                    )
+                # 현재 단가표(PricingPolicy)는 오늘부터 적용되는 경우만 교체 (예약된 단가는 적용일 전까지 버전으로만 보관)
+                if rates_changed and applies_now:
+                    fields = [f for f in PRICING_FIELDS if f]
+                    conn.execute(database.sql("DELETE FROM PricingPolicy"))
+                    conn.execute(
+                        database.sql(f"INSERT INTO PricingPolicy ({', '.join(fields)}) VALUES ({', '.join(':' + f for f in fields)})"),
+                        pricing_rows
+                    )
+                conn.execute(
+                    database.sql("""
+                        UPDATE PrintControlPolicy SET color_limit = :color_limit, mono_limit = :mono_limit, log_retention_days = :retention_days,
+                               quota_period = :quota_period, over_quota_action = :over_quota_action
+                        WHERE id = 1
+                    """),
+                    {"color_limit": control_color, "mono_limit": control_mono, "retention_days": retention_days,
+                     "quota_period": self.combo_quota_period.currentData(), "over_quota_action": self.combo_quota_action.currentData()}
+                )
             
+            if rates_changed and not applies_now:
+                QMessageBox.information(self, "예약 완료", f"새 단가는 {effective_date.toString('yyyy-MM-dd')} 0시부터 적용됩니다.\n그 전까지는 현재 단가가 유지됩니다.")
             QMessageBox.information(self, "성공", "과금 단가 및 전사 정책이 성공적으로 저장되었습니다!\n에이전트들이 통신 주기(10초)마다 변경된 정책을 자동으로 가져갑니다.")
             self.refresh_requested.emit()
-        except ValueError:
-            QMessageBox.warning(self, "오류", "단가, 배수 및 한도는 반드시 숫자로 입력해야 합니다.")
+        except (ValueError, AttributeError):
+            QMessageBox.warning(self, "오류", "단가, 배수, 양면 요율 및 한도는 반드시 숫자로 입력해야 합니다.")
+
+    def reprice_period(self):
+        import requests  # 콘솔 기동 속도를 위해 서버 호출 시점에 로드
+        url = "http://127.0.0.1:8000/api/admin/reprice"
+        payload = {
+            "date_from": self.reprice_start.date().toString("yyyy-MM-dd"),
+            "date_to": self.reprice_end.date().toString("yyyy-MM-dd"),
+        }
+        try:
+            res = requests.post(url, json={**payload, "dry_run": True}, timeout=30)
+            if res.status_code != 200:
+                QMessageBox.warning(self, "실패", f"재계산 미리보기에 실패했습니다.\n{res.text}")
+                return
+            departments = res.json()["departments"]
+            changed = sum(d["changed"] for d in departments)
+            if changed == 0:
+                QMessageBox.information(self, "안내", "인쇄 시점에 적용되던 단가와 다른 금액으로 기록된 로그가 없습니다.")
+                return
+            
+            # 금액은 과금 대상 로그 기준 (반려 등 과금 제외 로그는 건수만 따로 표시)
+            lines = [f"{d['department']}: {d['old_total']:,}원 → {d['new_total']:,}원 ({d['delta']:+,}원, {d['changed']:,}건"
+                     + (f", 과금 제외 {d['non_billable']:,}건)" if d["non_billable"] else ")") for d in departments if d["changed"]]
+            reply = QMessageBox.question(
+                self, "요금 재계산 확인",
+                f"{payload['date_from']} ~ {payload['date_to']} 기간의 {changed:,}건이 각 인쇄 시점에 적용되던 단가로 재계산됩니다.\n"
+                f"(수동 조정된 로그는 제외)\n\n" + "\n".join(lines) + "\n\n적용하시겠습니까?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes: return
+            
+            res = requests.post(url, json={**payload, "dry_run": False}, timeout=120)
+            if res.status_code == 200:
+                QMessageBox.information(self, "성공", f"{res.json()['updated_rows']:,}건의 요금이 재계산되었습니다.")
+                self.refresh_requested.emit()
+            else:
+                QMessageBox.warning(self, "실패", f"요금 재계산에 실패했습니다.\n{res.text}")
+        except requests.exceptions.RequestException as e:
+            QMessageBox.critical(self, "통신 오류", f"중앙 서버(FastAPI)와 연결할 수 없습니다.\n{e}")
 
     def load_data(self):
-        if not os.path.exists(DB_PATH): return
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        if not database.is_available(): return
         
-        # 요금 로드 (새 ORM 컬럼)
+        # 요금 로드 (새 ORM 컬럼) - 기본 행(0)을 맨 위에, 나머지는 용지 코드 순
         try:
-            cursor.execute("SELECT base_mono_price, base_color_price FROM PricingPolicy WHERE paper_size=9")
-            a4_policy = cursor.fetchone()
-            if a4_policy:
-                self.input_a4_mono.setText(str(a4_policy[0])); self.input_a4_color.setText(str(a4_policy[1]))
-                
-            cursor.execute("SELECT multiplier, color_multiplier FROM PricingPolicy WHERE paper_size=8")
-            a3_policy = cursor.fetchone()
-            if a3_policy:
-                self.input_a3_mono_multi.setText(str(a3_policy[0])); self.input_a3_color_multi.setText(str(a3_policy[1] if a3_policy[1] is not None else a3_policy[0]))
-        except sqlite3.OperationalError: pass
+            # 🌟 [변경] 지금 유효한 요금 정책 버전을 표시 (예약 단가가 적용일을 지난 경우 포함 / 버전이 없으면 현재 단가표)
+            fields = [f for f in PRICING_FIELDS if f]
+            with database.connect() as conn:
+                rates = version_rates_at(conn, timeutil.now_ms())
+            if rates is not None:
+                rows = sorted(({f: r.get(f) for f in fields} for r in rates), key=lambda r: r["paper_size"])
+            else:
+                rows = [dict(zip(fields, row)) for row in database.fetch_all(f"SELECT {', '.join(fields)} FROM PricingPolicy ORDER BY paper_size")]
+            self.table_pricing.setRowCount(0)
+            for row_idx, values in enumerate(rows):
+                if values["color_multiplier"] is None: values["color_multiplier"] = values["multiplier"]
+                if values["duplex_percent"] is None: values["duplex_percent"] = 100
+                self.table_pricing.insertRow(row_idx)
+                self._set_pricing_row(row_idx, values)
+        except DBAPIError: pass
         
         # 🌟 통제 로드 (새 ORM 컬럼)
         try:
-            cursor.execute("SELECT color_limit, mono_limit FROM PrintControlPolicy WHERE id=1")
-            control_policy = cursor.fetchone()
+            control_policy = database.fetch_one("SELECT color_limit, mono_limit FROM PrintControlPolicy WHERE id = 1")
             if control_policy:
                 # 999999(제한 없음)일 경우 빈칸으로 표시
                 c_lim = "" if control_policy[0] == 999999 else str(control_policy[0])
                 m_lim = "" if control_policy[1] == 999999 else str(control_policy[1])
                 self.input_control_color.setText(c_lim)
                 self.input_control_mono.setText(m_lim)
-        except sqlite3.OperationalError: pass
-        
-        conn.close()
\ No newline at end of file
+            
+            extra_row = database.fetch_one("SELECT log_retention_days, quota_period, over_quota_action FROM PrintControlPolicy WHERE id = 1")
+            if extra_row:
+                if extra_row[0]: self.input_retention_days.setText(str(extra_row[0]))
+                self.combo_quota_period.setCurrentIndex(max(0, self.combo_quota_period.findData(extra_row[1])))
+                self.combo_quota_action.setCurrentIndex(max(0, self.combo_quota_action.findData(extra_row[2])))
+        except DBAPIError: pass
\ No newline at end of file
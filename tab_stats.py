@@ -1,10 +1,11 @@
 # Manager_Console/tab_stats.py
-import sqlite3
-import os
 from PySide6.QtWidgets import *
 from PySide6.QtCore import Qt, Signal, QDate, QSettings
 from PySide6.QtGui import QColor, QFont, QBrush
-from constants import DB_PATH
+from constants import paper_size_name
+from retention import attach_archives, detach_archives, union_logs
+import database
+import timeutil
 
 class StatsTab(QWidget):
     refresh_requested = Signal()
@@ -165,39 +166,32 @@ class StatsTab(QWidget):
     # 🌟 새 ORM 컬럼명으로 완벽 매핑된 데이터 로드 함수
     # ====================================================================
     def load_data(self):
-        if not os.path.exists(DB_PATH): return
+        if not database.is_available(): return
         
-        start_str = self.start_date.date().toString("yyyy-MM-dd") + " 00:00:00"
-        end_str = self.end_date.date().toString("yyyy-MM-dd") + " 23:59:59"
+        start, end = timeutil.day_range_ms(self.start_date.date().toString("yyyy-MM-dd"), self.end_date.date().toString("yyyy-MM-dd"))
+        params = {"start": start, "end": end}
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        try: 
-            cursor.execute("""
-                SELECT log_time, paper_size, color_mode, total_pages, copies, calculated_price, remark, print_status 
-                FROM PrintLogs
-                WHERE log_time >= ? AND log_time <= ?
-            """, (start_str, end_str))
-        except sqlite3.OperationalError: 
-            # 구버전 스키마 대응 로직 유지 (안전망)
-            cursor.execute("""
-                SELECT PrintTime, PaperSize, ColorType, TotalPages, Copies, CalculatedPrice, Remark, '완료' 
-                FROM PrintLogs
-                WHERE PrintTime >= ? AND PrintTime <= ?
-            """, (start_str, end_str))
-            
-        self.current_rows = cursor.fetchall()
-        conn.close()
+        with database.connect() as conn:
+            # 🌟 [신규] 보관 기간이 지나 아카이브로 이동된 연도도 ATTACH 하여 함께 집계
+            schemas = attach_archives(conn, start, end - 1)
+            try: 
+                self.current_rows = database.plain_rows(conn.execute(database.sql(union_logs(
+                    schemas,
+                    "log_time, paper_size, color_mode, total_pages, copies, calculated_price, remark, print_status",
+                    "log_time >= :start AND log_time < :end"
+                )), params))
+            finally:
+                detach_archives(conn, schemas)
 
         # 데이터 로드 후, 두 탭의 화면을 각각 갱신합니다.
         self.populate_summary_tables()
         self.populate_period_table()
 
     def populate_summary_tables(self):
+        # 🌟 [변경] 용지별 집계는 A4/A3 고정이 아닌 (용지 코드, 색상) 키로 동적 집계 (A4/A3는 항상 표시)
+        by_paper = {(9, 1): {'pages': 0, 'price': 0}, (9, 2): {'pages': 0, 'price': 0},
+                    (8, 1): {'pages': 0, 'price': 0}, (8, 2): {'pages': 0, 'price': 0}}
         stats = {
-            'A4_Mono': {'pages': 0, 'price': 0}, 'A4_Color': {'pages': 0, 'price': 0},
-            'A3_Mono': {'pages': 0, 'price': 0}, 'A3_Color': {'pages': 0, 'price': 0},
             'Total_Mono': {'pages': 0, 'price': 0}, 'Total_Color': {'pages': 0, 'price': 0},
             'Total_All': {'pages': 0, 'price': 0},
             'Cancelled': {'count': 0, 'pages': 0, 'price': 0}, 'Uncertain': {'count': 0, 'pages': 0, 'price': 0}
@@ -226,25 +220,20 @@ class StatsTab(QWidget):
                 if c_type == 1: 
                     stats['Total_Mono']['pages'] += actual_pages
                     stats['Total_Mono']['price'] += price
-                    if p_size == 9: 
-                        stats['A4_Mono']['pages'] += actual_pages
-                        stats['A4_Mono']['price'] += price
-                    elif p_size == 8: 
-                        stats['A3_Mono']['pages'] += actual_pages
-                        stats['A3_Mono']['price'] += price
                 elif c_type == 2: 
                     stats['Total_Color']['pages'] += actual_pages
                     stats['Total_Color']['price'] += price
-                    if p_size == 9: 
-                        stats['A4_Color']['pages'] += actual_pages
-                        stats['A4_Color']['price'] += price
-                    elif p_size == 8: 
-                        stats['A3_Color']['pages'] += actual_pages
-                        stats['A3_Color']['price'] += price
+                if c_type in (1, 2):
+                    paper = by_paper.setdefault((p_size, c_type), {'pages': 0, 'price': 0})
+                    paper['pages'] += actual_pages
+                    paper['price'] += price
 
+        # A4, A3 를 먼저, 나머지 용지는 코드 순으로 표시
+        paper_order = lambda key: ({9: 0, 8: 1}.get(key[0], 2), key[0] or 0, key[1])
         billing_display_data = [
-            ("A4 흑백", stats['A4_Mono']), ("A4 컬러", stats['A4_Color']),
-            ("A3 흑백", stats['A3_Mono']), ("A3 컬러", stats['A3_Color']),
+            (f"{paper_size_name(p_size)} {'컬러' if c_type == 2 else '흑백'}", by_paper[(p_size, c_type)])
+            for p_size, c_type in sorted(by_paper, key=paper_order)
+        ] + [
             ("◼️ 흑백 전체 합계", stats['Total_Mono']), ("🎨 컬러 전체 합계", stats['Total_Color']),
             ("👑 전체 총계", stats['Total_All'])
         ]
@@ -279,15 +268,16 @@ class StatsTab(QWidget):
     def populate_period_table(self):
         period_type = self.combo_period.currentIndex()
         
-        char_length = 10
-        if period_type == 1: char_length = 7
-        elif period_type == 2: char_length = 4
+        # 🌟 [변경] 구간 키는 정수 시각의 일 번호로 계산 (같은 날의 로그는 날짜 변환을 한 번만 수행)
+        key_of = timeutil.day_key
+        if period_type == 1: key_of = timeutil.month_key
+        elif period_type == 2: key_of = timeutil.year_key
 
         aggregated = {}
 
         for row in self.current_rows:
             p_time, p_size, c_type, t_pages, copies, price, remark, status = row
-            date_key = p_time[:char_length]
+            date_key = key_of(timeutil.day_number(p_time))
             
             if date_key not in aggregated:
                 aggregated[date_key] = {'total_pages': 0, 'total_price': 0, 'mono_pages': 0, 'color_pages': 0, 'cancel': 0, 'warn': 0}
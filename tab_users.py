@@ -1,11 +1,9 @@
 # Manager_Console/tab_users.py
-import sqlite3
-import os
-from datetime import datetime, timedelta
 from PySide6.QtWidgets import *
 from PySide6.QtCore import Qt, Signal, QSettings
 from PySide6.QtGui import QColor, QFont
-from constants import DB_PATH
+import database
+import timeutil
 
 class UserMappingDialog(QDialog):
     def __init__(self, uuid, current_name, current_dept, c_limit, m_limit, parent=None):
@@ -76,8 +74,13 @@ class UsersTab(QWidget):
         btn_refresh.setStyleSheet("font-weight: bold; font-size: 13px; background-color: #e0f7fa; border-radius: 5px;")
         btn_refresh.clicked.connect(self.load_data)
         
+        # 🌟 [신규] 서버 접속 현황 요약 (온라인/전체)
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("font-size: 13px; color: #555; margin-right: 10px;")
+        
         top_layout.addWidget(title_label)
         top_layout.addStretch()
+        top_layout.addWidget(self.summary_label)
         top_layout.addWidget(btn_refresh)
         layout.addLayout(top_layout)
 
@@ -124,15 +127,11 @@ class UsersTab(QWidget):
             if new_name:
                 new_dept = new_dept if new_dept else "미배정"
                 try:
-                    conn = sqlite3.connect(DB_PATH)
-                    cursor = conn.cursor()
-                    cursor.execute("""
+                    database.execute("""
                         UPDATE Users 
-                        SET os_user=?, department=?, color_limit=?, mono_limit=? 
-                        WHERE uuid=?
-                    """, (new_name, new_dept, new_c, new_m, uuid))
-                    conn.commit()
-                    conn.close()
+                        SET os_user = :name, department = :dept, color_limit = :color_limit, mono_limit = :mono_limit 
+                        WHERE uuid = :uuid
+                    """, {"name": new_name, "dept": new_dept, "color_limit": new_c, "mono_limit": new_m, "uuid": uuid})
                     QMessageBox.information(self, "성공", f"[{new_name}] 님의 정보가 저장되었습니다!")
                     self.load_data() 
                 except Exception as e:
@@ -144,51 +143,46 @@ class UsersTab(QWidget):
     # 🌟 [불도저 로직] 어떤 에러가 나도 화면이 하얗게 멈추지 않도록 극도로 견고하게 설계
     # ====================================================================
     def load_data(self):
-        if not os.path.exists(DB_PATH): 
+        if not database.is_available(): 
             print("⚠️ [UI] DB 파일을 찾을 수 없습니다.")
             return
             
         try:
-            conn = sqlite3.connect(DB_PATH)
-            # 데이터를 가져올 때 Dict 형태로 반환되도록 하여 인덱스 에러 방지
-            conn.row_factory = sqlite3.Row 
-            cursor = conn.cursor()
-            
-            # 먼저 새 스키마(os_user, color_limit 등)로 시도
-            try:
-                cursor.execute("SELECT * FROM Users ORDER BY last_heartbeat DESC")
-                users = cursor.fetchall()
-            except sqlite3.OperationalError:
-                # 새 스키마가 없으면 옛날 스키마(UserName, ColorLimit 등)로 재시도
-                cursor.execute("SELECT * FROM Users ORDER BY LastHeartbeat DESC")
-                users = cursor.fetchall()
+            # 구버전 컬럼명(UserName, LastHeartbeat 등)은 서버 기동 시 마이그레이션에서 변환됨
+            users = database.fetch_dicts("""
+                SELECT uuid, os_user, department, last_heartbeat, color_limit, mono_limit
+                FROM Users ORDER BY last_heartbeat DESC
+            """)
+
+            # 🌟 [변경] 온라인 여부와 경과 시간은 서버의 접속 현황 레지스트리에서 받음 (행마다 일시 문자열을 해석하지 않음)
+            presence = self.fetch_presence()
+            if presence:
+                order = {a["uuid"]: i for i, a in enumerate(presence["agents"])}
+                ago_map = {a["uuid"]: a["seconds_ago"] for a in presence["agents"]}
+                users.sort(key=lambda u: order.get(u['uuid'], len(order)))
+                self.summary_label.setText(f"🟢 온라인 {presence['online']}대 / 전체 {presence['total']}대")
+            else:
+                self.summary_label.setText("⚪ 서버 연결 안 됨 (접속 상태 확인 불가)")
 
             self.table_users.setRowCount(0)
-            now = datetime.now()
+            now = timeutil.now_ms()
             
             for row_idx, row_data in enumerate(users):
                 self.table_users.insertRow(row_idx)
                 
-                # 딕셔너리처럼 접근하여 대소문자나 옛날/새 컬럼명 모두 유연하게 처리
-                row_dict = dict(row_data)
+                uuid = row_data['uuid'] or '알수없음'
+                name = row_data['os_user'] or '미등록 사용자'
+                dept = row_data['department'] or '미배정'
+                hb = row_data['last_heartbeat']
+                c_lim, m_lim = row_data['color_limit'], row_data['mono_limit']
                 
-                uuid = row_dict.get('uuid') or row_dict.get('UUID', '알수없음')
-                name = row_dict.get('os_user') or row_dict.get('UserName', '미등록 사용자')
-                dept = row_dict.get('department') or row_dict.get('Department', '미배정')
-                hb = row_dict.get('last_heartbeat') or row_dict.get('LastHeartbeat')
-                c_lim = row_dict.get('color_limit') or row_dict.get('ColorLimit')
-                m_lim = row_dict.get('mono_limit') or row_dict.get('MonoLimit')
-                
-                status = "🔴 오프라인"
-                hb_str = "-"
-                
-                if hb:
-                    try:
-                        hb_time = datetime.strptime(str(hb)[:19], "%Y-%m-%d %H:%M:%S")
-                        if now - hb_time < timedelta(minutes=5):
-                            status = "🟢 온라인"
-                        hb_str = str(hb)[:19]
-                    except: pass
+                if presence:
+                    ago = ago_map.get(uuid)
+                    status = "🟢 온라인" if ago is not None and ago < presence["online_sec"] else "🔴 오프라인"
+                    hb_str = timeutil.format_ms(now - round(ago * 1000)) if ago is not None else (timeutil.format_ms(hb) if hb else "-")
+                else:
+                    status = "⚪ 확인 불가"
+                    hb_str = timeutil.format_ms(hb) if hb else "-"
                 
                 pol_texts = []
                 if c_lim is not None: pol_texts.append(f"컬러:{'무제한' if c_lim>=999999 else str(c_lim)+'장'}")
@@ -213,8 +207,15 @@ class UsersTab(QWidget):
                     
         except Exception as e:
             QMessageBox.critical(self, "데이터 로드 실패", f"기기 목록을 불러오는 중 오류가 발생했습니다.\n{e}")
-        finally:
-            if 'conn' in locals(): conn.close()
+
+    def fetch_presence(self):
+        """서버의 에이전트 접속 현황 (서버가 꺼져 있으면 None)"""
+        import requests
+        try:
+            res = requests.get("http://127.0.0.1:8000/api/agents/presence", timeout=2)
+            return res.json() if res.status_code == 200 else None
+        except requests.exceptions.RequestException:
+            return None
 
     # 🌟 [보안/UX] 프로그램 종료 시 테이블 헤더 상태 저장
     def closeEvent(self, event):
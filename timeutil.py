@@ -0,0 +1,100 @@
+# Manager_Console/timeutil.py
+import time
+from datetime import datetime
+from functools import lru_cache
+
+# ====================================================================
+# 🌟 [신규] 정수 시각 (epoch 밀리초) 도우미
+#  - PrintLogs.log_time, Users.last_heartbeat 는 1970-01-01 UTC 부터의 밀리초(정수)로 저장합니다.
+#    문자열 일시(26바이트)보다 행과 색인이 작고, 범위 조회·정렬·집계가 정수 비교로 끝납니다.
+#  - 일/월/연 구간 키는 문자열을 자르지 않고 "현지 시각 기준 일 번호"((ms + 오프셋) // DAY_MS)로 계산합니다.
+#    같은 날의 로그는 일 번호가 같으므로, 날짜 변환은 일 번호마다 한 번만 수행됩니다. (lru_cache)
+#  - 현지 시각 오프셋은 기동 시 한 번 정해 둡니다. (운영 환경 KST 는 일광 절약 시간이 없음)
+# ====================================================================
+DAY_MS = 86_400_000
+LOCAL_OFFSET_MS = round(datetime.now().astimezone().utcoffset().total_seconds()) * 1000
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+def to_ms(when: datetime) -> int:
+    """현지 시각 datetime -> epoch 밀리초"""
+    return round(when.timestamp() * 1000)
+
+def from_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000)
+
+def coerce_ms(value):
+    """정수 시각은 그대로, 변환 이전 형식(datetime / ISO 문자열)은 밀리초로 바꿉니다. (구버전 저널 등)"""
+    if value is None or isinstance(value, int): return value
+    if isinstance(value, str): value = datetime.fromisoformat(value)
+    return to_ms(value)
+
+def day_number(ms: int) -> int:
+    """현지 날짜 기준 1970-01-01 부터의 일 수"""
+    return (ms + LOCAL_OFFSET_MS) // DAY_MS
+
+def day_expr(column: str) -> str:
+    """SQL 에서 정수 시각 컬럼의 일 번호 (SQLite / PostgreSQL 모두 정수 나눗셈)"""
+    return f"(({column} + {LOCAL_OFFSET_MS}) / {DAY_MS})"
+
+@lru_cache(maxsize=4096)
+def civil_date(days: int) -> tuple:
+    """일 번호 -> (연, 월, 일) - 그레고리력 산술 변환 (datetime 생성 없이)"""
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+def days_from_civil(year: int, month: int, day: int) -> int:
+    """(연, 월, 일) -> 일 번호 (civil_date 의 역변환)"""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def day_start_ms(days: int) -> int:
+    """일 번호의 현지 자정 시각 (ms)"""
+    return days * DAY_MS - LOCAL_OFFSET_MS
+
+def date_ms(text: str) -> int:
+    """"YYYY-MM-DD" 의 현지 자정 시각 (ms). 형식이 틀리면 ValueError"""
+    date = datetime.strptime(text, "%Y-%m-%d")
+    return day_start_ms(days_from_civil(date.year, date.month, date.day))
+
+def day_range_ms(date_from: str, date_to: str) -> tuple:
+    """"YYYY-MM-DD" 기간(끝 날짜 포함) -> [시작, 끝) ms. 비어 있는 쪽은 None"""
+    start = date_ms(date_from) if date_from else None
+    end = date_ms(date_to) + DAY_MS if date_to else None
+    return start, end
+
+def year_start_ms(year: int) -> int:
+    return day_start_ms(days_from_civil(year, 1, 1))
+
+# 일 번호 -> 구간 키 ("2026-10-19" / "2026-10" / "2026")
+def day_key(days: int) -> str:
+    return "%04d-%02d-%02d" % civil_date(days)
+
+def month_key(days: int) -> str:
+    return "%04d-%02d" % civil_date(days)[:2]
+
+def year_key(days: int) -> str:
+    return "%04d" % civil_date(days)[0]
+
+def year_of(ms: int) -> int:
+    return civil_date(day_number(ms))[0]
+
+def format_ms(ms) -> str:
+    """표시용 "YYYY-MM-DD HH:MM:SS" (값이 없으면 빈 문자열)"""
+    if ms is None or ms == "": return ""
+    if not isinstance(ms, int): return str(ms)[:19]
+    local = ms + LOCAL_OFFSET_MS
+    seconds = local % DAY_MS // 1000
+    return "%s %02d:%02d:%02d" % (day_key(local // DAY_MS), seconds // 3600, seconds % 3600 // 60, seconds % 60)